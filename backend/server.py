@@ -1,5 +1,6 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional
@@ -7,17 +8,37 @@ import yt_dlp
 import os
 import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError, OperationFailure
 import uuid
 import re
-import subprocess
-import tempfile
+import functools
+import collections
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import contextlib
 import instaloader
+import gallery_dl.config
+import gallery_dl.exception
+import gallery_dl.extractor.message
+import gallery_dl.job
+import gallery_dl.output
 import praw
-from urllib.parse import urlparse
-import requests
+from urllib.parse import urlparse, parse_qsl, urlencode, quote
+from email.utils import formatdate, parsedate_to_datetime
+import httpx
 import json
+import time
+import hashlib
+import io
+import zipfile
+import sqlite3
+import base64
+import math
+import random
+import unicodedata
 
 # Environment variables
 import os
@@ -31,6 +52,102 @@ REDDIT_CLIENT_SECRET = os.environ.get('REDDIT_CLIENT_SECRET', '')
 REDDIT_USERNAME = os.environ.get('REDDIT_USERNAME', '')
 REDDIT_PASSWORD = os.environ.get('REDDIT_PASSWORD', '')
 
+# "local" runs downloads in this process; "remote" leaves them to worker.py processes
+DOWNLOAD_MODE = os.environ.get('DOWNLOAD_MODE', 'local')
+
+# Download scheduler settings
+MAX_CONCURRENT_DOWNLOADS = int(os.environ.get('MAX_CONCURRENT_DOWNLOADS', '4'))
+PLATFORM_CONCURRENCY_LIMITS = {
+    'youtube': int(os.environ.get('MAX_CONCURRENT_YOUTUBE', '2')),
+    'reddit': int(os.environ.get('MAX_CONCURRENT_REDDIT', '2')),
+    'instagram': int(os.environ.get('MAX_CONCURRENT_INSTAGRAM', '1')),
+    'gallery': int(os.environ.get('MAX_CONCURRENT_GALLERY', '2'))
+}
+
+# Automatic retries of failed downloads, with exponential backoff and jitter (seconds)
+DOWNLOAD_MAX_RETRIES = int(os.environ.get('DOWNLOAD_MAX_RETRIES', '3'))
+RETRY_BASE_DELAY = float(os.environ.get('RETRY_BASE_DELAY', '10'))
+RETRY_MAX_DELAY = float(os.environ.get('RETRY_MAX_DELAY', '600'))
+
+# Per-platform circuit breakers; "defer" holds jobs while a platform is down, "fail" rejects them
+CIRCUIT_BREAKER_THRESHOLD = int(os.environ.get('CIRCUIT_BREAKER_THRESHOLD', '5'))
+CIRCUIT_BREAKER_RESET_TIMEOUT = float(os.environ.get('CIRCUIT_BREAKER_RESET_TIMEOUT', '60'))
+CIRCUIT_BREAKER_MAX_RESET_TIMEOUT = float(os.environ.get('CIRCUIT_BREAKER_MAX_RESET_TIMEOUT', '900'))
+CIRCUIT_BREAKER_MODE = os.environ.get('CIRCUIT_BREAKER_MODE', 'defer')
+
+# Shared HTTP client settings
+HTTP_USER_AGENT = os.environ.get('HTTP_USER_AGENT', 'Mozilla/5.0 (compatible; MediaDownloader/1.0)')
+HTTP_TIMEOUT = float(os.environ.get('HTTP_TIMEOUT', '15'))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_MAX_CONNECTIONS = int(os.environ.get('HTTP_MAX_CONNECTIONS', '20'))
+# Per-host pacing of every outbound request; hosts are grouped by registrable domain
+RATE_LIMIT_RPS = float(os.environ.get('RATE_LIMIT_RPS', '8'))
+RATE_LIMIT_BURST = int(os.environ.get('RATE_LIMIT_BURST', '16'))
+RATE_LIMIT_CONCURRENCY = int(os.environ.get('RATE_LIMIT_CONCURRENCY', '8'))
+RATE_LIMIT_DECREASE = float(os.environ.get('RATE_LIMIT_DECREASE', '0.5'))
+RATE_LIMIT_MAX_WAIT = float(os.environ.get('RATE_LIMIT_MAX_WAIT', '120'))
+# "host=requests per second" overrides, comma separated
+RATE_LIMIT_HOSTS = os.environ.get('RATE_LIMIT_HOSTS', 'reddit.com=1,instagram.com=0.5')
+# Media CDNs serving the fragments and files of every running download; they skip the request
+# budget (a 429 still makes them back off), comma separated
+RATE_LIMIT_EXEMPT_HOSTS = os.environ.get('RATE_LIMIT_EXEMPT_HOSTS', 'googlevideo.com,cdninstagram.com,fbcdn.net,redd.it')
+try:
+    import h2  # noqa: F401 - httpx only negotiates HTTP/2 when h2 is installed
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Cosplay search deadlines (seconds); slower platforms are reported as timed out
+COSPLAY_SEARCH_DEADLINE = float(os.environ.get('COSPLAY_SEARCH_DEADLINE', '8'))
+COSPLAY_SUBREDDIT_DEADLINE = float(os.environ.get('COSPLAY_SUBREDDIT_DEADLINE', '6'))
+
+# Cosplay search result cache settings
+COSPLAY_CACHE_TTL = float(os.environ.get('COSPLAY_CACHE_TTL', '3600'))
+COSPLAY_CACHE_MAX_BYTES = int(os.environ.get('COSPLAY_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+
+# Query-level cosplay search cache: fresh answers are served as-is, stale ones while refreshing
+COSPLAY_QUERY_CACHE_SIZE = int(os.environ.get('COSPLAY_QUERY_CACHE_SIZE', '256'))
+COSPLAY_QUERY_FRESH_TTL = float(os.environ.get('COSPLAY_QUERY_FRESH_TTL', '120'))
+COSPLAY_QUERY_STALE_TTL = float(os.environ.get('COSPLAY_QUERY_STALE_TTL', '1800'))
+
+# Progress is kept in memory and written to MongoDB in one batch per interval
+PROGRESS_FLUSH_INTERVAL_MS = int(os.environ.get('PROGRESS_FLUSH_INTERVAL_MS', '500'))
+
+# Push channel: per-client event buffer and idle keepalive for /api/events
+EVENT_QUEUE_SIZE = int(os.environ.get('EVENT_QUEUE_SIZE', '256'))
+EVENT_KEEPALIVE = float(os.environ.get('EVENT_KEEPALIVE', '15'))
+
+# Download counters are kept incrementally and rebuilt from the collection on this interval
+STATS_RECONCILE_INTERVAL = float(os.environ.get('STATS_RECONCILE_INTERVAL', '300'))
+
+# Cosplay autocomplete: terms kept per trie node, popularity half-life and vocabulary bound
+SUGGESTION_TOP_K = int(os.environ.get('SUGGESTION_TOP_K', '10'))
+SUGGESTION_HALF_LIFE = float(os.environ.get('SUGGESTION_HALF_LIFE', str(7 * 24 * 3600)))
+# Each term costs roughly 40 trie nodes / 12 KB when its words share no prefixes (about 60 MB at the default)
+SUGGESTION_MAX_TERMS = int(os.environ.get('SUGGESTION_MAX_TERMS', '5000'))
+SUGGESTION_MAX_TERM_LENGTH = 60
+SUGGESTION_MAX_DEPTH = 20  # characters indexed from each word start; longer queries are checked against the terms
+SUGGESTION_QUERY_WEIGHT = 1.0
+SUGGESTION_TITLE_WEIGHT = 0.2
+SUGGESTION_SEED_WEIGHT = 0.5
+
+# Media metadata cache settings (set METADATA_CACHE_DIR to keep entries across restarts)
+METADATA_CACHE_SIZE = int(os.environ.get('METADATA_CACHE_SIZE', '512'))
+METADATA_CACHE_TTL = float(os.environ.get('METADATA_CACHE_TTL', '900'))
+METADATA_CACHE_DIR = os.environ.get('METADATA_CACHE_DIR', '')
+
+# Instagram session pool settings
+INSTAGRAM_SESSION_POOL_SIZE = int(os.environ.get('INSTAGRAM_SESSION_POOL_SIZE', '2'))
+INSTAGRAM_SESSION_DIR = os.environ.get('INSTAGRAM_SESSION_DIR', 'sessions')
+
+# In-process gallery-dl engine settings
+GALLERY_DL_POOL_SIZE = int(os.environ.get('GALLERY_DL_POOL_SIZE', '4'))
+GALLERY_DL_TIMEOUT = float(os.environ.get('GALLERY_DL_TIMEOUT', '1800'))
+GALLERY_DL_STDERR_TAIL_LINES = 40
+
+# Thread pool size for blocking yt-dlp / Instaloader calls
+EXTRACTOR_POOL_SIZE = int(os.environ.get('EXTRACTOR_POOL_SIZE', '8'))
+
 app = FastAPI()
 
 # CORS middleware
@@ -40,16 +157,375 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # MongoDB setup
 client = AsyncIOMotorClient(MONGO_URL)
 db = client.youtube_downloader
 
-# Download directory structure
-DOWNLOAD_BASE_DIR = "downloads"
+# Every record lookup goes through "id"; history listings filter on status or platform and
+# page newest first on (created_at, id), so the sort and the keyset bound are served by the index
+# Built on its own: existing duplicate ids make it fail without holding back the query indexes
+DOWNLOAD_ID_INDEX = IndexModel([("id", ASCENDING)], name="id_unique", unique=True)
+DOWNLOAD_INDEXES = [
+    IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="status_created_at_id"),
+    IndexModel([("platform", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="platform_created_at_id"),
+    IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+    IndexModel([("cosplay_batch_id", ASCENDING)], name="cosplay_batch_id", sparse=True),
+    IndexModel([("content_hashes", ASCENDING)], name="content_hashes", sparse=True),
+    IndexModel([("archive_keys", ASCENDING)], name="archive_keys", sparse=True)
+]
+
+@app.on_event("startup")
+async def ensure_indexes():
+    """Create the downloads indexes; a no-op when they already exist"""
+    try:
+        await db.downloads.create_indexes([DOWNLOAD_ID_INDEX])
+    except (DuplicateKeyError, OperationFailure) as e:
+        duplicates = await db.downloads.aggregate([
+            {"$group": {"_id": "$id", "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+            {"$limit": 20}
+        ]).to_list(20)
+        logging.error(f"Failed to create the unique downloads id index, duplicate ids: {[entry['_id'] for entry in duplicates]}: {str(e)}")
+    except Exception as e:
+        logging.error(f"Failed to create the unique downloads id index: {str(e)}")
+    
+    try:
+        await db.downloads.create_indexes(DOWNLOAD_INDEXES)
+    except Exception as e:
+        logging.error(f"Failed to create downloads indexes: {str(e)}")
+
+def rate_limit_host(url: str) -> str:
+    """Registrable domain of a URL, so that www., oauth. and other subdomains share one budget"""
+    host = (urlparse(url).hostname or url).lower()
+    labels = host.split('.')
+    if len(labels) <= 2 or host.replace('.', '').isdigit():
+        return host
+    # Keep one more label for second-level registries such as co.uk
+    keep = 3 if len(labels[-1]) == 2 and len(labels[-2]) <= 3 else 2
+    return '.'.join(labels[-keep:])
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header given as delay-seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+class RateLimitExceeded(Exception):
+    """Raised when a host asked us to back off for longer than RATE_LIMIT_MAX_WAIT"""
+
+class HostBudget:
+    """Token bucket and AIMD concurrency limit of one host"""
+
+    def __init__(self, rate: float, burst: int, max_concurrency: int):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+class HostRateLimiter:
+    """Per-host token buckets whose rate and concurrency back off on 429/503 and recover additively"""
+
+    THROTTLE_STATUSES = (429, 503)
+
+    def __init__(self, rate: float, burst: int, max_concurrency: int, host_rates: dict, decrease: float, max_wait: float,
+                 exempt_hosts: frozenset = frozenset()):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.host_rates = host_rates
+        self.exempt_hosts = exempt_hosts
+        self.decrease = decrease
+        self.max_wait = max_wait
+        self.budgets = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def parse_host_rates(spec: str) -> dict:
+        rates = {}
+        for entry in spec.split(','):
+            host, _, rate = entry.partition('=')
+            if host.strip() and rate.strip():
+                rates[host.strip().lower()] = float(rate)
+        return rates
+
+    @staticmethod
+    def parse_hosts(spec: str) -> frozenset:
+        return frozenset(host.strip().lower() for host in spec.split(',') if host.strip())
+
+    def _budget(self, host: str) -> HostBudget:
+        budget = self.budgets.get(host)
+        if budget is None:
+            rate = self.host_rates.get(host, self.rate)
+            # Slow hosts get a burst of a few seconds' worth of requests, not the global burst
+            burst = max(1, min(self.burst, int(rate * 4)))
+            budget = self.budgets[host] = HostBudget(rate, burst, self.max_concurrency)
+        return budget
+
+    def _try_acquire(self, host: str) -> float:
+        """Take a token and a concurrency slot, or return how long to wait before trying again"""
+        with self.lock:
+            budget = self._budget(host)
+            now = time.monotonic()
+            budget.refill(now)
+            if budget.blocked_until > now:
+                return budget.blocked_until - now
+            if host in self.exempt_hosts:
+                # Concurrent downloads each stream many fragments from these; one shared budget would stall them
+                budget.in_flight += 1
+                budget.requests += 1
+                return 0.0
+            if budget.in_flight >= int(budget.limit):
+                return 0.05
+            if budget.tokens < 1:
+                return (1 - budget.tokens) / budget.rate
+            budget.tokens -= 1
+            budget.in_flight += 1
+            budget.requests += 1
+            return 0.0
+
+    def _check_deadline(self, host: str, wait: float, deadline: float):
+        if time.monotonic() + wait > deadline:
+            raise RateLimitExceeded(f"{host} is rate limiting requests, retry in {int(wait) + 1}s")
+
+    async def acquire(self, url: str) -> str:
+        host = rate_limit_host(url)
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            wait = self._try_acquire(host)
+            if not wait:
+                return host
+            self._check_deadline(host, wait, deadline)
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self, url: str) -> str:
+        """Blocking acquire for the extractor threads (yt-dlp, instaloader, gallery-dl)"""
+        host = rate_limit_host(url)
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            wait = self._try_acquire(host)
+            if not wait:
+                return host
+            self._check_deadline(host, wait, deadline)
+            time.sleep(wait)
+
+    def release(self, host: str, status: Optional[int] = None, retry_after: Optional[str] = None):
+        """Give back the concurrency slot and adapt the budget to the response status (None if there was none)"""
+        with self.lock:
+            budget = self._budget(host)
+            budget.in_flight -= 1
+            self._adjust(budget, status, retry_after)
+
+    def record(self, host: str, status: int, retry_after: Optional[str] = None):
+        """Adapt the budget to a response that was not fetched through acquire()"""
+        with self.lock:
+            self._adjust(self._budget(rate_limit_host(host)), status, retry_after)
+
+    def _adjust(self, budget: HostBudget, status: Optional[int], retry_after: Optional[str]):
+        if status in self.THROTTLE_STATUSES or (retry_after and status and status >= 400):
+            budget.throttled += 1
+            budget.limit = max(1.0, budget.limit * self.decrease)
+            budget.rate = max(budget.base_rate / 20, budget.rate * self.decrease)
+            delay = parse_retry_after(retry_after)
+            if delay is None:
+                delay = 1 / budget.rate
+            budget.blocked_until = max(budget.blocked_until, time.monotonic() + delay)
+            budget.tokens = min(budget.tokens, 0.0)
+        elif status is not None and status < 400:
+            budget.limit = min(float(budget.max_concurrency), budget.limit + 1 / budget.limit)
+            budget.rate = min(budget.base_rate, budget.rate + budget.base_rate / 20)
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self.lock:
+            return {
+                host: {
+                    "rate": round(budget.rate, 3),
+                    "base_rate": budget.base_rate,
+                    "tokens": round(min(budget.burst, budget.tokens + (now - budget.updated) * budget.rate), 2),
+                    "concurrency": round(budget.limit, 2),
+                    "in_flight": budget.in_flight,
+                    "blocked_for": round(max(budget.blocked_until - now, 0.0), 1),
+                    "requests": budget.requests,
+                    "throttled": budget.throttled,
+                    "exempt": host in self.exempt_hosts
+                }
+                for host, budget in self.budgets.items()
+            }
+
+host_rate_limiter = HostRateLimiter(
+    RATE_LIMIT_RPS,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_CONCURRENCY,
+    HostRateLimiter.parse_host_rates(RATE_LIMIT_HOSTS),
+    RATE_LIMIT_DECREASE,
+    RATE_LIMIT_MAX_WAIT,
+    HostRateLimiter.parse_hosts(RATE_LIMIT_EXEMPT_HOSTS)
+)
+
+def rate_limited_send(send):
+    """Wrap a requests Session.send so that every request goes through the host limiter"""
+    if getattr(send, "rate_limited", False):
+        return send
+    
+    def limited_send(request, **kwargs):
+        host = host_rate_limiter.acquire_sync(request.url)
+        status = retry_after = None
+        try:
+            response = send(request, **kwargs)
+            status, retry_after = response.status_code, response.headers.get("Retry-After")
+            return response
+        finally:
+            host_rate_limiter.release(host, status, retry_after)
+    
+    limited_send.rate_limited = True
+    return limited_send
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """httpx transport that paces requests, redirects included, through the host limiter"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = await host_rate_limiter.acquire(str(request.url))
+        status = retry_after = None
+        try:
+            response = await self.transport.handle_async_request(request)
+            status, retry_after = response.status_code, response.headers.get("Retry-After")
+            return response
+        finally:
+            host_rate_limiter.release(host, status, retry_after)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+class RateLimitedYoutubeDL(yt_dlp.YoutubeDL):
+    """YoutubeDL whose requests (extraction, downloads and fragments) go through the host limiter"""
+
+    def urlopen(self, req):
+        host = host_rate_limiter.acquire_sync(req if isinstance(req, str) else getattr(req, 'url', None) or req.full_url)
+        status = retry_after = None
+        try:
+            response = super().urlopen(req)
+            status = response.status
+            return response
+        except yt_dlp.networking.exceptions.HTTPError as e:
+            status, retry_after = e.status, e.response.headers.get('Retry-After')
+            raise
+        finally:
+            host_rate_limiter.release(host, status, retry_after)
+
+# Shared async HTTP client for JSON APIs (created lazily on the running loop)
+http_client = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the application-wide pooled HTTP client"""
+    global http_client
+    if http_client is None:
+        http_client = httpx.AsyncClient(
+            transport=RateLimitedTransport(httpx.AsyncHTTPTransport(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+                    keepalive_expiry=60
+                )
+            )),
+            timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            headers={'User-Agent': HTTP_USER_AGENT},
+            follow_redirects=True
+        )
+    return http_client
+
+@app.on_event("shutdown")
+async def close_http_client():
+    global http_client
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+
+# Download directory structure (each worker node can use its own)
+DOWNLOAD_BASE_DIR = os.environ.get('DOWNLOAD_BASE_DIR', 'downloads')
+FILE_CHUNK_SIZE = 1024 * 1024  # read size when serving files without sendfile
+
+# Items already fetched by yt-dlp or gallery-dl, kept across restarts (empty disables the archive)
+DOWNLOAD_ARCHIVE_PATH = os.environ.get('DOWNLOAD_ARCHIVE_PATH', os.path.join(DOWNLOAD_BASE_DIR, '.archive.sqlite3'))
+
+# Content-addressed blob store; must be on the same filesystem as the downloads for hardlinks
+BLOB_STORE_DIR = os.environ.get('BLOB_STORE_DIR', os.path.join(DOWNLOAD_BASE_DIR, '.blobs'))
+
+# Already-compressed media is stored as-is in exported archives
+ARCHIVE_STORED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.mp4', '.webm', '.mkv', '.mov', '.mp3', '.m4a', '.zip')
+CBZ_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif')
 os.makedirs(DOWNLOAD_BASE_DIR, exist_ok=True)
 
+class ExtractorExecutor:
+    """Dedicated thread pool that keeps blocking extractor and download calls off the event loop"""
+
+    def __init__(self, max_workers: int, name: str = "extractor"):
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_calls = 0
+
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking callable in the pool and await its result"""
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        self.total_calls += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+        finally:
+            self.in_flight -= 1
+
+    async def run_cancellable(self, cancel_event: threading.Event, func, *args, **kwargs):
+        """Like run(), but cancelling sets cancel_event and waits for the thread to stop before re-raising"""
+        call = asyncio.ensure_future(self.run(func, *args, **kwargs))
+        try:
+            return await asyncio.shield(call)
+        except asyncio.CancelledError:
+            # The thread checks cancel_event on its next progress callback; keep the caller's slot until it has returned
+            cancel_event.set()
+            with contextlib.suppress(Exception):
+                await call
+            raise
+
+    def snapshot(self) -> dict:
+        """Pool usage; saturation above 1.0 means calls are waiting for a thread"""
+        return {
+            "pool_size": self.max_workers,
+            "running": min(self.in_flight, self.max_workers),
+            "waiting": max(self.in_flight - self.max_workers, 0),
+            "saturation": self.in_flight / self.max_workers,
+            "peak_in_flight": self.peak_in_flight,
+            "total_calls": self.total_calls
+        }
+
+extractor_executor = ExtractorExecutor(EXTRACTOR_POOL_SIZE)
+
 class DownloadRequest(BaseModel):
     url: str
     quality: str = "best"
@@ -74,6 +550,12 @@ class CosplayResult(BaseModel):
 class CosplayDownloadRequest(BaseModel):
     cosplay_results: List[str]  # List of selected result IDs
     quality: str = "best"
+    search_id: Optional[str] = None  # search the results came from, when known
+
+class ExportRequest(BaseModel):
+    download_ids: List[str] = []
+    batch_id: Optional[str] = None  # every download of one cosplay download request
+    format: str = "zip"  # zip or cbz
 
 class AuthConfig(BaseModel):
     platform: str
@@ -94,109 +576,533 @@ class MediaInfo(BaseModel):
     media_type: str = "video"  # video, image, gallery
     media_count: int = 1
 
-# Global auth storage (in production, use secure database)
+# Global auth storage, mirrored in db.auth so that worker nodes share it
 auth_storage = {}
+auth_revisions = {}  # platform -> revision of the stored credentials last loaded
 
-# Global cosplay search results cache
-cosplay_search_cache = {}
-
-async def search_cosplay_galleries(query: str, platforms: List[str] = ["all"], limit: int = 10) -> List[CosplayResult]:
-    """Search for cosplay galleries across multiple platforms"""
-    results = []
-    search_id = str(uuid.uuid4())
-    
-    # Platforms that support cosplay content
-    cosplay_platforms = ["luscious", "cosplaytele", "nhentai", "reddit"]
-    
-    if platforms == ["all"]:
-        platforms = cosplay_platforms
+async def load_auth_storage():
+    """Replace the in-memory credentials with the ones stored in MongoDB"""
+    stored = {}
+    async for credentials in db.auth.find():
+        stored[credentials.pop("_id")] = credentials
+    changed = {platform for platform in set(stored) | set(auth_storage) if stored.get(platform) != auth_storage.get(platform)}
+    # Only changed platforms are touched: jobs in other threads keep reading the rest undisturbed
+    for platform in changed:
+        if platform in stored:
+            auth_storage[platform] = stored[platform]
+        else:
+            auth_storage.pop(platform, None)
+    auth_revisions.clear()
+    auth_revisions.update({platform: credentials.get("revision") for platform, credentials in stored.items()})
     
+    # Clients built from the previous credentials are rebuilt on next use
+    if "reddit" in changed and gallery_dl_engine.configured:
+        gallery_dl_engine.load_config()
+    if "instagram" in changed:
+        instagram_sessions.reset()
+
+async def refresh_auth_storage():
+    """Reload the credentials only when another node changed them since the last load"""
+    revisions = {credentials["_id"]: credentials.get("revision") async for credentials in db.auth.find({}, {"revision": 1})}
+    if revisions != auth_revisions:
+        await load_auth_storage()
+
+@app.on_event("startup")
+async def restore_auth_storage():
     try:
-        # Search on each platform
-        for platform in platforms:
-            if platform in cosplay_platforms:
-                platform_results = await search_platform_cosplay(query, platform, limit)
-                results.extend(platform_results)
-        
-        # Store results in cache for later download
-        cosplay_search_cache[search_id] = {
+        await load_auth_storage()
+    except Exception as e:
+        logging.error(f"Failed to load stored authentication: {str(e)}")
+
+class CosplaySearchCache:
+    """Cosplay search results indexed by result ID, evicted by sliding TTL and LRU under a memory cap"""
+
+    def __init__(self, ttl: float, max_bytes: int):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # search_id -> entry; a sliding TTL keeps LRU order and expiry order identical
+        self.searches = collections.OrderedDict()
+        self.results = {}  # result_id -> CosplayResult
+        self.result_refs = {}  # result_id -> number of cached searches containing it
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _estimate_size(result: CosplayResult) -> int:
+        # Rough per-result footprint: string payload plus model/dict overhead
+        return 256 + sum(len(value) for value in result.__dict__.values() if isinstance(value, str))
+
+    def put(self, search_id: str, query: str, results: List[CosplayResult]):
+        """Store a search and index its results"""
+        size = sum(self._estimate_size(result) for result in results)
+        result_ids = []
+        for result in results:
+            if result.id not in result_ids:
+                result_ids.append(result.id)
+                self.results[result.id] = result
+                self.result_refs[result.id] = self.result_refs.get(result.id, 0) + 1
+        
+        self.searches[search_id] = {
             "query": query,
-            "results": results,
-            "timestamp": datetime.utcnow()
+            "result_ids": result_ids,
+            "timestamp": datetime.utcnow(),
+            "expires_at": time.monotonic() + self.ttl,
+            "size": size
         }
+        self.size += size
+        self._evict()
+
+    def get_search(self, search_id: str) -> Optional[dict]:
+        entry = self.searches.get(search_id)
+        if entry is None or entry["expires_at"] <= time.monotonic():
+            self._evict()
+            return None
+        self._touch(search_id, entry)
+        return entry
+
+    def get_result(self, result_id: str, search_id: Optional[str] = None) -> Optional[CosplayResult]:
+        """O(1) lookup of a result, preferring the given search when it is still cached"""
+        self._evict()
+        result = self.results.get(result_id)
+        if result is None:
+            self.misses += 1
+            return None
+        
+        entry = self.searches.get(search_id) if search_id else None
+        if entry is not None and result_id in entry["result_ids"]:
+            self._touch(search_id, entry)
+        self.hits += 1
+        return result
+
+    def snapshot(self) -> dict:
+        return {
+            "searches": len(self.searches),
+            "results": len(self.results),
+            "approx_bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+    def _touch(self, search_id: str, entry: dict):
+        entry["expires_at"] = time.monotonic() + self.ttl
+        self.searches.move_to_end(search_id)
+
+    def _evict(self):
+        now = time.monotonic()
+        while self.searches:
+            search_id, entry = next(iter(self.searches.items()))
+            if entry["expires_at"] <= now:
+                self.expirations += 1
+            elif self.size > self.max_bytes and len(self.searches) > 1:
+                self.evictions += 1
+            else:
+                break
+            self._remove(search_id)
+
+    def _remove(self, search_id: str):
+        entry = self.searches.pop(search_id)
+        self.size -= entry["size"]
+        for result_id in entry["result_ids"]:
+            self.result_refs[result_id] -= 1
+            if not self.result_refs[result_id]:
+                del self.result_refs[result_id]
+                del self.results[result_id]
+
+# Global cosplay search results cache
+cosplay_search_cache = CosplaySearchCache(COSPLAY_CACHE_TTL, COSPLAY_CACHE_MAX_BYTES)
+
+class SuggestionNode:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children = {}
+        self.top = []  # best terms in this subtree, highest score first
+
+class SuggestionIndex:
+    """Prefix trie over cosplay terms with typo-tolerant lookup, ranked by forward-decayed popularity"""
+
+    def __init__(self, top_k: int, half_life: float, max_terms: int):
+        self.top_k = top_k
+        self.decay = math.log(2) / half_life
+        self.max_terms = max_terms
+        # Forward decay: weights grow with time since the landmark, so scores only ever increase
+        # and each node's top list stays valid without rescanning its subtree
+        self.landmark = time.time()
+        self.root = SuggestionNode()
+        self.terms = {}  # normalized term -> {"text", "score"}
+        self.nodes = 1
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+        return " ".join(re.sub(r"[^\w]+", " ", text).split())
+
+    def record(self, text: str, weight: float = SUGGESTION_QUERY_WEIGHT):
+        """Count one use of a term, indexing it under every word so mid-phrase prefixes match"""
+        key = self.normalize(text)
+        if not key or len(key) > SUGGESTION_MAX_TERM_LENGTH:
+            return
         
-        return results[:limit]
+        exponent = self.decay * (time.time() - self.landmark)
+        if exponent > 50:
+            self._rebase()
+            exponent = 0.0
         
-    except Exception as e:
-        logging.error(f"Cosplay search failed: {str(e)}")
-        return []
+        term = self.terms.get(key)
+        if term is None:
+            term = self.terms[key] = {"text": " ".join(text.split()), "score": 0.0}
+        term["score"] += weight * math.exp(exponent)
+        
+        starts = [0] + [match.end() for match in re.finditer(" ", key)]
+        for start in starts:
+            self._index(key, key[start:])
+        
+        if len(self.terms) > self.max_terms:
+            self._prune()
+
+    def lookup(self, query: str, limit: int = 10) -> List[str]:
+        """Best terms with a prefix within a small edit distance of the query"""
+        query = self.normalize(query)
+        if not query:
+            return []
+        
+        # Exact prefix first: its node already holds the best terms of the whole subtree
+        node = self.root
+        for char in query[:SUGGESTION_MAX_DEPTH]:
+            node = node.children.get(char)
+            if node is None:
+                break
+        matches = [key for key in node.top if self._has_prefix(key, query)] if node else []
+        distances = dict.fromkeys(matches, 0)
+        # Nodes keep at most top_k terms, so that many exact matches is as good as it gets
+        max_edits = 0 if len(query) <= 3 else 1 if len(query) <= 8 else 2
+        if len(distances) >= min(limit, self.top_k) or not max_edits or query[0] not in self.root.children:
+            return self._ranked(distances, limit)
+        query = query[:SUGGESTION_MAX_DEPTH]
+        
+        # Levenshtein rows carried down the trie, anchored on the first character (typos
+        # rarely land there); a node matches when the whole query aligns with its path,
+        # and a branch is abandoned once no alignment can stay within budget or improve
+        first_row = [1]
+        for i, query_char in enumerate(query, 1):
+            first_row.append(min(first_row[i - 1] + 1, i + 1, i - 1 + (query_char != query[0])))
+        stack = [(self.root.children[query[0]], first_row)]
+        while stack:
+            node, row = stack.pop()
+            best = min(row)
+            if row[-1] <= max_edits:
+                for key in node.top:
+                    distances[key] = min(distances.get(key, row[-1]), row[-1])
+                if best >= row[-1]:
+                    continue
+            if best > max_edits:
+                continue
+            for char, child in node.children.items():
+                next_row = [row[0] + 1]
+                for i, query_char in enumerate(query, 1):
+                    next_row.append(min(next_row[i - 1] + 1, row[i] + 1, row[i - 1] + (query_char != char)))
+                stack.append((child, next_row))
+        return self._ranked(distances, limit)
+
+    def snapshot(self) -> dict:
+        return {
+            "terms": len(self.terms),
+            "max_terms": self.max_terms,
+            "nodes": self.nodes,
+            "top_k": self.top_k
+        }
+
+    def _ranked(self, distances: dict, limit: int) -> List[str]:
+        ranked = sorted(distances, key=lambda key: (distances[key], -self.terms[key]["score"]))
+        return [self.terms[key]["text"] for key in ranked[:limit]]
+
+    @staticmethod
+    def _has_prefix(key: str, query: str) -> bool:
+        """Whether query starts key or one of its words; only needed past the indexed depth"""
+        return len(query) <= SUGGESTION_MAX_DEPTH or key.startswith(query) or f" {query}" in key
+
+    def _index(self, key: str, path: str):
+        node = self.root
+        for char in path[:SUGGESTION_MAX_DEPTH]:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = SuggestionNode()
+                self.nodes += 1
+            node = child
+            if key not in node.top:
+                node.top.append(key)
+            node.top.sort(key=lambda term: self.terms[term]["score"], reverse=True)
+            del node.top[self.top_k:]
+
+    def _rebase(self):
+        """Move the landmark to now; uniform rescaling keeps every ranking intact"""
+        now = time.time()
+        factor = math.exp(-self.decay * (now - self.landmark))
+        for term in self.terms.values():
+            term["score"] *= factor
+        self.landmark = now
+
+    def _prune(self):
+        """Drop the least popular tenth of the vocabulary and rebuild the trie"""
+        keep = sorted(self.terms, key=lambda key: self.terms[key]["score"], reverse=True)
+        self.terms = {key: self.terms[key] for key in keep[:int(self.max_terms * 0.9)]}
+        self.root = SuggestionNode()
+        self.nodes = 1
+        for key in self.terms:
+            for start in [0] + [match.end() for match in re.finditer(" ", key)]:
+                self._index(key, key[start:])
+
+suggestion_index = SuggestionIndex(SUGGESTION_TOP_K, SUGGESTION_HALF_LIFE, SUGGESTION_MAX_TERMS)
+
+# Popular cosplay characters/series, so autocomplete is useful before any searches
+for seed in [
+    "Dva Overwatch", "Harley Quinn", "Chun Li", "Tifa Lockheart",
+    "Power Chainsaw Man", "Makima", "Nezuko", "Marin Kitagawa",
+    "Ahri League of Legends", "Jinx Arcane", "Widowmaker", "Mercy",
+    "Hinata Naruto", "Sakura", "Tsunade", "Boa Hancock",
+    "Android 18", "Bulma", "Chi Chi", "Videl",
+    "Rem Re Zero", "Ram", "Emilia", "Aqua Konosuba"
+]:
+    suggestion_index.record(seed, SUGGESTION_SEED_WEIGHT)
+
+# Platforms that support cosplay content
+COSPLAY_PLATFORMS = ["luscious", "cosplaytele", "nhentai", "reddit"]
+
+def normalize_cosplay_platforms(platforms: List[str]) -> List[str]:
+    """Resolve a requested platform list to the cosplay platforms actually searched, in a stable order"""
+    if "all" in platforms:
+        return list(COSPLAY_PLATFORMS)
+    return [platform for platform in COSPLAY_PLATFORMS if platform in platforms]
+
+class SearchQueryCache:
+    """Cosplay search outcomes per normalized query, served stale while a background refresh runs"""
+
+    def __init__(self, max_entries: int, fresh_ttl: float, stale_ttl: float):
+        self.max_entries = max_entries
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.entries = collections.OrderedDict()  # key -> {"outcome", "fetched_at", "complete"}
+        self.refreshing = {}  # key -> asyncio.Task fetching a new outcome
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+
+    @staticmethod
+    def make_key(query: str, platforms: List[str], limit: int) -> tuple:
+        return (" ".join(query.lower().split()), tuple(normalize_cosplay_platforms(platforms)), limit)
+
+    async def get(self, query: str, platforms: List[str], limit: int) -> dict:
+        """Return a cached outcome, refreshing it in the background once it is no longer fresh"""
+        key = self.make_key(query, platforms, limit)
+        entry = self.entries.get(key)
+        age = time.monotonic() - entry["fetched_at"] if entry else None
+        
+        if entry and age < self.fresh_ttl and entry["complete"]:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self._serve(entry, "hit")
+        
+        if entry and age < self.stale_ttl:
+            # Serve instantly; partial outcomes (a platform timed out) are always revalidated
+            self.stale_hits += 1
+            self.entries.move_to_end(key)
+            self._refresh(key, query, platforms, limit)
+            return self._serve(entry, "stale")
+        
+        if entry:
+            del self.entries[key]
+        if key in self.refreshing:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+        await asyncio.shield(self._refresh(key, query, platforms, limit))
+        return self._serve(self.entries[key], "miss")
+
+    def snapshot(self) -> dict:
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "fresh_ttl": self.fresh_ttl,
+            "stale_ttl": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "refreshing": len(self.refreshing)
+        }
+
+    def _serve(self, entry: dict, cache_status: str) -> dict:
+        outcome = entry["outcome"]
+        # Downloads resolve result IDs through the result cache, which may have evicted this search
+        if cosplay_search_cache.get_search(outcome["search_id"]) is None:
+            cosplay_search_cache.put(outcome["search_id"], outcome["query"], outcome["results"])
+        return {**outcome, "cache": cache_status}
+
+    def _refresh(self, key: tuple, query: str, platforms: List[str], limit: int) -> asyncio.Task:
+        task = self.refreshing.get(key)
+        if task is None:
+            self.refreshes += 1
+            task = asyncio.create_task(self._fetch(key, query, platforms, limit))
+            self.refreshing[key] = task
+        return task
+
+    async def _fetch(self, key: tuple, query: str, platforms: List[str], limit: int):
+        try:
+            outcome = await fetch_cosplay_galleries(query, platforms, limit)
+            statuses = [status["status"] for status in outcome["platforms"].values()]
+            complete = all(status == "ok" for status in statuses)
+            # Keep serving the previous outcome rather than replacing it with a total failure
+            if "ok" in statuses or key not in self.entries:
+                self.entries[key] = {"outcome": outcome, "fetched_at": time.monotonic(), "complete": complete}
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        except Exception as e:
+            logging.error(f"Cosplay search refresh failed for '{query}': {str(e)}")
+            if key not in self.entries:
+                raise
+        finally:
+            del self.refreshing[key]
+
+search_query_cache = SearchQueryCache(COSPLAY_QUERY_CACHE_SIZE, COSPLAY_QUERY_FRESH_TTL, COSPLAY_QUERY_STALE_TTL)
+
+async def search_cosplay_galleries(query: str, platforms: List[str] = ["all"], limit: int = 10) -> dict:
+    """Search for cosplay galleries, answering repeated queries from the query cache"""
+    suggestion_index.record(query, SUGGESTION_QUERY_WEIGHT)
+    return await search_query_cache.get(query, platforms, limit)
+
+async def fetch_cosplay_galleries(query: str, platforms: List[str] = ["all"], limit: int = 10) -> dict:
+    """Search for cosplay galleries across multiple platforms concurrently"""
+    search_id = str(uuid.uuid4())
+    
+    platforms = normalize_cosplay_platforms(platforms)
+    
+    async def timed_search(platform: str):
+        started = time.monotonic()
+        try:
+            platform_results = await asyncio.wait_for(
+                search_platform_cosplay(query, platform, limit),
+                COSPLAY_SEARCH_DEADLINE
+            )
+            status = {"status": "ok", "count": len(platform_results)}
+        except asyncio.TimeoutError:
+            logging.warning(f"Cosplay search on {platform} exceeded {COSPLAY_SEARCH_DEADLINE:g}s deadline")
+            platform_results, status = [], {"status": "timeout", "count": 0}
+        except Exception as e:
+            logging.error(f"Platform search failed for {platform}: {str(e)}")
+            platform_results, status = [], {"status": "error", "count": 0, "error": str(e)}
+        status["elapsed_ms"] = round((time.monotonic() - started) * 1000, 1)
+        return platform_results, status
+    
+    # Search every platform at once; a slow platform only costs its own deadline
+    outcomes = await asyncio.gather(*[timed_search(platform) for platform in platforms])
+    
+    results = []
+    platform_status = {}
+    for platform, (platform_results, status) in zip(platforms, outcomes):
+        results.extend(platform_results)
+        platform_status[platform] = status
+    
+    # Store results in cache for later download
+    cosplay_search_cache.put(search_id, query, results)
+    
+    return {
+        "search_id": search_id,
+        "query": query,
+        "results": results[:limit],
+        "platforms": platform_status
+    }
 
 async def search_platform_cosplay(query: str, platform: str, limit: int) -> List[CosplayResult]:
     """Search for cosplay content on a specific platform"""
     results = []
     
-    try:
-        if platform == "reddit":
-            # Search Reddit for cosplay subreddits
-            reddit_results = await search_reddit_cosplay(query, limit)
-            results.extend(reddit_results)
-        
-        elif platform in ["luscious", "cosplaytele", "nhentai"]:
-            # Use gallery-dl to search these platforms
-            gallery_results = await search_gallery_cosplay(query, platform, limit)
-            results.extend(gallery_results)
+    if platform == "reddit":
+        # Search Reddit for cosplay subreddits
+        reddit_results = await search_reddit_cosplay(query, limit)
+        results.extend(reddit_results)
     
-    except Exception as e:
-        logging.error(f"Platform search failed for {platform}: {str(e)}")
+    elif platform in ["luscious", "cosplaytele", "nhentai"]:
+        # Use gallery-dl to search these platforms
+        gallery_results = await search_gallery_cosplay(query, platform, limit)
+        results.extend(gallery_results)
     
     return results
 
-async def search_reddit_cosplay(query: str, limit: int) -> List[CosplayResult]:
-    """Search Reddit for cosplay content"""
-    results = []
+async def search_reddit_cosplay(query: str, limit: int, deadline: Optional[float] = None) -> List[CosplayResult]:
+    """Search Reddit cosplay subreddits concurrently, keeping whatever arrives before the deadline"""
+    # Search relevant cosplay subreddits
+    cosplay_subreddits = ["cosplay", "cosplaygirls", "cosplayers", "cosplaybabes"]
+    if deadline is None:
+        deadline = COSPLAY_SUBREDDIT_DEADLINE
     
-    try:
-        # Search relevant cosplay subreddits
-        cosplay_subreddits = ["cosplay", "cosplaygirls", "cosplayers", "cosplaybabes"]
+    async def search_subreddit(subreddit: str) -> List[CosplayResult]:
+        # Use Reddit JSON API to search
+        search_url = f"https://www.reddit.com/r/{subreddit}/search.json"
+        params = {
+            "q": query,
+            "restrict_sr": "1",
+            "limit": limit // len(cosplay_subreddits),
+            "sort": "top"
+        }
+        # The deadline bounds each request as well as the wait for all subreddits below
+        response = await get_http_client().get(search_url, params=params, timeout=deadline)
+        response.raise_for_status()
+        data = response.json()
         
-        for subreddit in cosplay_subreddits:
-            try:
-                # Use Reddit JSON API to search
-                search_url = f"https://www.reddit.com/r/{subreddit}/search.json"
-                params = {
-                    "q": query,
-                    "restrict_sr": "1",
-                    "limit": limit // len(cosplay_subreddits),
-                    "sort": "top"
-                }
-                headers = {'User-Agent': 'CosplaySearchBot/1.0'}
-                
-                response = requests.get(search_url, params=params, headers=headers)
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    for post in data.get("data", {}).get("children", []):
-                        post_data = post["data"]
-                        
-                        # Check if post has media
-                        if post_data.get("url") and any(ext in post_data["url"].lower() for ext in ['.jpg', '.png', '.gif', 'imgur', 'reddit']):
-                            result = CosplayResult(
-                                id=f"reddit_{post_data['id']}",
-                                name=f"{query} - {post_data['title'][:50]}...",
-                                platform="reddit",
-                                url=f"https://reddit.com{post_data['permalink']}",
-                                thumbnail=post_data.get("thumbnail"),
-                                gallery_count=1,
-                                description=f"r/{subreddit} - {post_data.get('score', 0)} upvotes"
-                            )
-                            results.append(result)
-                
-            except Exception as e:
-                logging.warning(f"Reddit subreddit search failed for r/{subreddit}: {str(e)}")
-                continue
+        subreddit_results = []
+        for post in data.get("data", {}).get("children", []):
+            post_data = post["data"]
+            
+            # Check if post has media
+            if post_data.get("url") and any(ext in post_data["url"].lower() for ext in ['.jpg', '.png', '.gif', 'imgur', 'reddit']):
+                suggestion_index.record(post_data["title"], SUGGESTION_TITLE_WEIGHT)
+                result = CosplayResult(
+                    id=f"reddit_{post_data['id']}",
+                    name=f"{query} - {post_data['title'][:50]}...",
+                    platform="reddit",
+                    url=f"https://reddit.com{post_data['permalink']}",
+                    thumbnail=post_data.get("thumbnail"),
+                    gallery_count=1,
+                    description=f"r/{subreddit} - {post_data.get('score', 0)} upvotes"
+                )
+                subreddit_results.append(result)
+        return subreddit_results
     
-    except Exception as e:
-        logging.error(f"Reddit cosplay search failed: {str(e)}")
+    tasks = [asyncio.create_task(search_subreddit(subreddit)) for subreddit in cosplay_subreddits]
+    try:
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+    finally:
+        for task in tasks:
+            task.cancel()
+    
+    results = []
+    errors = []
+    for subreddit, task in zip(cosplay_subreddits, tasks):
+        if task in pending:
+            logging.warning(f"Reddit subreddit search timed out for r/{subreddit}")
+        elif task.exception():
+            logging.warning(f"Reddit subreddit search failed for r/{subreddit}: {str(task.exception())}")
+            errors.append(task.exception())
+        else:
+            results.extend(task.result())
+    
+    # Only report the platform as failed when no subreddit answered at all
+    if not results and errors and len(errors) == len(tasks):
+        raise errors[0]
+    if not results and pending:
+        raise asyncio.TimeoutError()
     
     return results
 
@@ -232,43 +1138,63 @@ async def search_gallery_cosplay(query: str, platform: str, limit: int) -> List[
     
     return results
 
-async def download_cosplay_galleries(result_ids: List[str], quality: str = "best"):
+async def download_cosplay_galleries(result_ids: List[str], quality: str = "best", search_id: Optional[str] = None,
+                                     batch_id: Optional[str] = None):
     """Download selected cosplay galleries"""
     downloaded_galleries = []
     
     try:
-        # Find results in cache
-        for cache_key, cache_data in cosplay_search_cache.items():
-            for result in cache_data["results"]:
-                if result.id in result_ids:
-                    # Start download for this gallery
-                    download_id = str(uuid.uuid4())
-                    
-                    # Create download record
-                    download_record = {
-                        "id": download_id,
-                        "url": result.url,
-                        "status": "pending",
-                        "progress": 0.0,
-                        "created_at": datetime.utcnow(),
-                        "platform": result.platform,
-                        "title": result.name,
-                        "uploader": result.platform.title(),
-                        "cosplay_query": True
-                    }
-                    
-                    await db.downloads.insert_one(download_record)
-                    
-                    # Start background download
-                    if result.platform == "reddit":
-                        asyncio.create_task(download_reddit_task(download_id, result.url, quality))
-                    else:
-                        asyncio.create_task(download_gallery_site_task(download_id, result.url, quality, result.platform))
-                    
-                    downloaded_galleries.append({
-                        "download_id": download_id,
-                        "result": result
-                    })
+        for result_id in dict.fromkeys(result_ids):
+            # Find result in cache
+            result = cosplay_search_cache.get_result(result_id, search_id)
+            if result is None:
+                logging.warning(f"Cosplay result {result_id} is no longer cached")
+                continue
+            
+            # Start download for this gallery, unless the same gallery is already queued or running
+            download_id = str(uuid.uuid4())
+            in_flight_id = download_scheduler.claim(
+                media_job_key(result.url, result.platform, quality, False, "mp4"),
+                download_id
+            )
+            if in_flight_id is not None:
+                downloaded_galleries.append({
+                    "download_id": in_flight_id,
+                    "result": result,
+                    "coalesced": True
+                })
+                continue
+            
+            # Create download record
+            download_record = {
+                "id": download_id,
+                "url": result.url,
+                "status": "pending",
+                "progress": 0.0,
+                "created_at": datetime.utcnow(),
+                "platform": result.platform,
+                "title": result.name,
+                "uploader": result.platform.title(),
+                "quality": quality,
+                "audio_only": False,
+                "output_format": "mp4",
+                "cosplay_query": True,
+                "cosplay_batch_id": batch_id
+            }
+            
+            try:
+                await create_download(download_record)
+            except Exception:
+                download_scheduler.release(download_id)
+                raise
+            
+            # Queue the download behind the platform concurrency limits
+            await download_scheduler.submit(download_id, result.platform, download_job_factory(download_record))
+            
+            downloaded_galleries.append({
+                "download_id": download_id,
+                "result": result
+            })
     
     except Exception as e:
         logging.error(f"Cosplay galleries download failed: {str(e)}")
@@ -287,6 +1213,22 @@ class DownloadStatus(BaseModel):
     completed_at: Optional[datetime] = None
     title: Optional[str] = None
     uploader: Optional[str] = None
+    queue_position: Optional[int] = None
+    downloaded_bytes: Optional[int] = None
+    total_bytes: Optional[int] = None
+    speed: Optional[float] = None  # bytes per second
+    eta: Optional[int] = None  # seconds
+    items_done: Optional[int] = None  # gallery files saved
+    items_total: Optional[int] = None
+    items_failed: Optional[int] = None
+    duplicate_files: Optional[int] = None  # files whose content was already stored by another download
+    duplicate_bytes: Optional[int] = None
+    worker: Optional[str] = None  # worker node holding the files in remote mode
+    retry_count: Optional[int] = None  # automatic retries used so far
+    next_retry_at: Optional[datetime] = None
+
+# Only the fields DownloadStatus exposes are read back for listings
+DOWNLOAD_STATUS_PROJECTION = {"_id": 0, **{field: 1 for field in DownloadStatus.model_fields if field != "queue_position"}}
 
 def sanitize_filename(filename):
     """Sanitize filename for filesystem compatibility"""
@@ -313,7 +1255,7 @@ def get_video_info(url: str):
         }
     }
     
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+    with RateLimitedYoutubeDL(ydl_opts) as ydl:
         try:
             info = ydl.extract_info(url, download=False)
             return {
@@ -369,21 +1311,220 @@ def detect_platform(url: str) -> str:
     else:
         return 'unknown'
 
-def get_instagram_info(url: str) -> dict:
-    """Extract Instagram post/story information"""
-    try:
-        # Create Instaloader instance with authentication if available
-        L = instaloader.Instaloader()
+class SharedRateController(instaloader.RateController):
+    """Instaloader's query pacing, plus the host limiter shared with the rest of the backend"""
+
+    def wait_before_query(self, query_type: str):
+        super().wait_before_query(query_type)
+        host = host_rate_limiter.acquire_sync("https://www.instagram.com/")
+        host_rate_limiter.release(host)
+
+    def handle_429(self, query_type: str):
+        host_rate_limiter.record("instagram.com", 429)
+        super().handle_429(query_type)
+
+class RecordingInstaloader(instaloader.Instaloader):
+    """Instaloader that remembers the path of every media file a download saves or already had"""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('rate_controller', SharedRateController)
+        super().__init__(*args, **kwargs)
+        self.saved_files = []
+        self.cancel_event = None
+        # write_raw receives the final name, including the extension taken from Content-Type
+        write_raw = self.context.write_raw
+        
+        def record_write(resp, filename):
+            write_raw(resp, filename)
+            self.saved_files.append(filename)
         
-        # Try to login using stored credentials
+        self.context.write_raw = record_write
+
+    def download_pic(self, filename, url, mtime, filename_suffix=None, _attempt=1):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise instaloader.exceptions.InstaloaderException("Download cancelled")
+        # Media comes from the CDN hosts, which instaloader's rate controller does not pace
+        host = host_rate_limiter.acquire_sync(url)
+        try:
+            downloaded = super().download_pic(filename, url, mtime, filename_suffix, _attempt)
+        finally:
+            host_rate_limiter.release(host)
+        if not downloaded:
+            # Skipped as already present: recover the name instaloader checked
+            if filename_suffix is not None:
+                filename += '_' + filename_suffix
+            urlmatch = re.search('\\.[a-z0-9]*\\?', url)
+            nominal_filename = filename + '.' + (url[-3:] if urlmatch is None else urlmatch.group(0)[1:-1])
+            if os.path.isfile(nominal_filename):
+                self.saved_files.append(nominal_filename)
+        return downloaded
+
+class InstagramSessionPool:
+    """Pool of warm Instaloader instances sharing one saved Instagram login session"""
+
+    def __init__(self, size: int, session_dir: str):
+        self.size = size
+        self.session_dir = session_dir
+        self.idle = []
+        self.lock = threading.Lock()
+        self.login_lock = threading.Lock()
+        # Callers wait for a loader on the event loop, so no pool thread blocks while the pool is busy
+        self.available = None
+        self.available_loop = None
+        self.in_use = 0
+        self.generation = 0  # bumped when credentials change, so stale loaders get dropped
+        self.session_version = 0  # bumped on every fresh login
+        self.logins = 0
+        self.session_loads = 0
+        self.reauths = 0
+        self.last_login = None
+        self.last_error = None
+        os.makedirs(session_dir, exist_ok=True)
+
+    def _credentials(self):
         instagram_auth = auth_storage.get("instagram", {})
-        if instagram_auth.get("username") and instagram_auth.get("password"):
+        return instagram_auth.get("username"), instagram_auth.get("password")
+
+    def _session_file(self, username: str) -> str:
+        return os.path.join(self.session_dir, f"instagram-{sanitize_filename(username)}.session")
+
+    def _new_loader(self):
+        L = RecordingInstaloader(
+            quiet=True,
+            download_videos=True,
+            download_video_thumbnails=False,
+            download_geotags=False,
+            download_comments=False,
+            save_metadata=False
+        )
+        L.pool_generation = self.generation
+        L.session_version = 0
+        self._authenticate(L)
+        return L
+
+    def _authenticate(self, L, force_login: bool = False, raise_errors: bool = False):
+        """Attach the shared session to L, logging in only when no usable session exists"""
+        username, password = self._credentials()
+        if not (username and password):
+            return
+        
+        with self.login_lock:
+            session_file = self._session_file(username)
+            # Another thread may already have refreshed the session we were about to replace
+            stale = L.session_version < self.session_version
+            if os.path.exists(session_file) and (not force_login or stale):
+                try:
+                    L.load_session_from_file(username, session_file)
+                    L.session_version = self.session_version
+                    self.session_loads += 1
+                    return
+                except Exception as e:
+                    logging.warning(f"Instagram session file could not be loaded: {str(e)}")
+            
             try:
-                L.login(instagram_auth["username"], instagram_auth["password"])
+                L.login(username, password)
+                L.save_session_to_file(session_file)
+                self.session_version += 1
+                L.session_version = self.session_version
+                self.logins += 1
+                self.last_login = datetime.utcnow()
+                self.last_error = None
+                logging.info("Instagram login successful")
             except Exception as login_error:
-                # Continue without login, but note the limitation
+                self.last_error = str(login_error)
+                if raise_errors:
+                    raise
+                # Continue without login for public posts
                 logging.warning(f"Instagram login failed: {str(login_error)}")
-        
+
+    def _slots(self) -> asyncio.Semaphore:
+        """Loader slots, created in the running loop: on Python 3.9 a semaphore binds to the loop current at creation"""
+        loop = asyncio.get_running_loop()
+        if self.available_loop is not loop:
+            self.available = asyncio.Semaphore(self.size)
+            self.available_loop = loop
+        return self.available
+
+    @contextlib.contextmanager
+    def session(self):
+        """Check out an Instaloader instance for exclusive use by the calling thread; callers hold a slot from run()"""
+        L = None
+        try:
+            with self.lock:
+                while self.idle and L is None:
+                    L = self.idle.pop()
+                    if L.pool_generation != self.generation:
+                        L.close()
+                        L = None
+                self.in_use += 1
+            if L is None:
+                L = self._new_loader()
+            yield L
+        finally:
+            with self.lock:
+                self.in_use -= 1
+                if L is not None and L.pool_generation == self.generation:
+                    self.idle.append(L)
+
+    async def run(self, func, cancel_event: Optional[threading.Event] = None):
+        """Wait for a free loader slot, then run call(func) in the extractor pool"""
+        async with self._slots():
+            if cancel_event is None:
+                return await extractor_executor.run(self.call, func)
+            return await extractor_executor.run_cancellable(cancel_event, self.call, func)
+
+    def call(self, func):
+        """Run func(L) with a pooled loader, re-authenticating once if Instagram answers 401"""
+        with self.session() as L:
+            try:
+                return func(L)
+            except Exception as e:
+                username, password = self._credentials()
+                auth_error = isinstance(e, instaloader.exceptions.LoginRequiredException) or "401" in str(e)
+                if not (auth_error and username and password):
+                    raise
+                self.reauths += 1
+                self._authenticate(L, force_login=True)
+                return func(L)
+
+    def reset(self):
+        """Drop all pooled loaders, e.g. after the stored credentials changed"""
+        with self.lock:
+            self.generation += 1
+            for L in self.idle:
+                L.close()
+            self.idle = []
+            self.last_error = None
+
+    async def verify(self):
+        """Log in with the stored credentials and save a fresh session file"""
+        self.reset()
+        async with self._slots():
+            await extractor_executor.run(self._verify)
+
+    def _verify(self):
+        with self.session() as L:
+            self._authenticate(L, force_login=True, raise_errors=True)
+
+    def health(self) -> dict:
+        username, password = self._credentials()
+        return {
+            "session_saved": bool(username) and os.path.exists(self._session_file(username)),
+            "last_login": self.last_login,
+            "last_error": self.last_error,
+            "logins": self.logins,
+            "session_loads": self.session_loads,
+            "reauthentications": self.reauths,
+            "pool_size": self.size,
+            "idle": len(self.idle),
+            "in_use": self.in_use
+        }
+
+instagram_sessions = InstagramSessionPool(INSTAGRAM_SESSION_POOL_SIZE, INSTAGRAM_SESSION_DIR)
+
+async def get_instagram_info(url: str) -> dict:
+    """Extract Instagram post/story information"""
+    try:
         # Extract shortcode from URL
         if '/p/' in url:
             shortcode = url.split('/p/')[1].split('/')[0]
@@ -392,19 +1533,22 @@ def get_instagram_info(url: str) -> dict:
         else:
             raise ValueError("Unsupported Instagram URL format")
         
-        # Get post information
-        post = instaloader.Post.from_shortcode(L.context, shortcode)
+        # Get post information with a pooled, already authenticated loader
+        def fetch_info(L):
+            post = instaloader.Post.from_shortcode(L.context, shortcode)
+            
+            return {
+                'title': post.caption[:100] + '...' if post.caption and len(post.caption) > 100 else post.caption or 'Instagram Post',
+                'platform': 'instagram',
+                'uploader': post.owner_username,
+                'upload_date': post.date_utc.strftime('%Y%m%d'),
+                'media_type': 'video' if post.is_video else 'image',
+                'media_count': 1 if not post.typename == 'GraphSidecar' else len(list(post.get_sidecar_nodes())),
+                'view_count': post.video_view_count if post.is_video else post.likes,
+                'thumbnail': post.url
+            }
         
-        return {
-            'title': post.caption[:100] + '...' if post.caption and len(post.caption) > 100 else post.caption or 'Instagram Post',
-            'platform': 'instagram',
-            'uploader': post.owner_username,
-            'upload_date': post.date_utc.strftime('%Y%m%d'),
-            'media_type': 'video' if post.is_video else 'image',
-            'media_count': 1 if not post.typename == 'GraphSidecar' else len(list(post.get_sidecar_nodes())),
-            'view_count': post.video_view_count if post.is_video else post.likes,
-            'thumbnail': post.url
-        }
+        return await instagram_sessions.run(fetch_info)
     except Exception as e:
         # If authentication fails, provide helpful error message
         if "401" in str(e) or "login" in str(e).lower():
@@ -414,7 +1558,7 @@ def get_instagram_info(url: str) -> dict:
             )
         raise HTTPException(status_code=400, detail=f"Failed to extract Instagram info: {str(e)}")
 
-def get_reddit_info(url: str) -> dict:
+async def get_reddit_info(url: str) -> dict:
     """Extract Reddit post information"""
     try:
         # First try the simple JSON approach (no auth required)
@@ -423,11 +1567,10 @@ def get_reddit_info(url: str) -> dict:
         else:
             raise ValueError("Unsupported Reddit URL format")
         
-        # Use requests to get Reddit JSON (no auth needed for public posts)
+        # Use the shared HTTP client to get Reddit JSON (no auth needed for public posts)
         json_url = f"https://www.reddit.com/comments/{submission_id}.json"
-        headers = {'User-Agent': 'Mozilla/5.0 (compatible; gallery-dl-bot/1.0)'}
         
-        response = requests.get(json_url, headers=headers)
+        response = await get_http_client().get(json_url)
         response.raise_for_status()
         
         data = response.json()
@@ -452,67 +1595,696 @@ def get_reddit_info(url: str) -> dict:
             'view_count': post_data.get('score', 0),
             'thumbnail': post_data.get('thumbnail') if post_data.get('thumbnail') != 'self' else None
         }
+    except RateLimitExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         # If we can't get basic info, suggest authentication setup
-        if "403" in str(e) or "429" in str(e):
+        if "403" in str(e):
             raise HTTPException(
                 status_code=400, 
                 detail=f"Reddit access limited. Please configure your Reddit API credentials in the Settings panel. Error: {str(e)}"
             )
         raise HTTPException(status_code=400, detail=f"Failed to extract Reddit info: {str(e)}")
 
-def get_media_info(url: str) -> dict:
+async def get_media_info(url: str) -> dict:
     """Get media information based on platform"""
     platform = detect_platform(url)
     
     if platform == 'youtube':
-        return get_video_info(url)
+        return await extractor_executor.run(get_video_info, url)
     elif platform == 'instagram':
-        return get_instagram_info(url)
+        return await get_instagram_info(url)
     elif platform == 'reddit':
-        return get_reddit_info(url)
+        return await get_reddit_info(url)
     else:
         # Try with yt-dlp for other platforms
         try:
-            return get_video_info(url)
-        except:
+            return await extractor_executor.run(get_video_info, url)
+        except Exception:
             raise HTTPException(status_code=400, detail=f"Unsupported platform or invalid URL: {platform}")
 
-class DownloadProgress:
-    def __init__(self, download_id: str):
-        self.download_id = download_id
-        self.progress = 0.0
-        
-    def progress_hook(self, d):
-        if d['status'] == 'downloading':
-            if 'total_bytes' in d:
-                self.progress = (d['downloaded_bytes'] / d['total_bytes']) * 100
-            elif 'total_bytes_estimate' in d:
-                self.progress = (d['downloaded_bytes'] / d['total_bytes_estimate']) * 100
-            
-            # Update progress in database asynchronously
-            asyncio.create_task(self.update_progress_db())
-    
-    async def update_progress_db(self):
-        try:
-            await db.downloads.update_one(
-                {"id": self.download_id},
-                {"$set": {"progress": self.progress}}
-            )
-        except Exception as e:
-            logging.error(f"Failed to update progress for {self.download_id}: {str(e)}")
+# Query parameters that never change which media a URL points to
+TRACKING_QUERY_PARAMS = {'si', 'feature', 'fbclid', 'gclid', 'igshid', 'igsh', 'ref', 'ref_source', 'share_id', 'context', 'pp'}
+
+def normalize_media_url(url: str) -> str:
+    """Normalize a media URL so that equivalent links share one cache key"""
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+    for prefix in ('www.', 'm.', 'mobile.', 'old.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    path = parsed.path.rstrip('/')
+    params = [
+        (key, value) for key, value in parse_qsl(parsed.query)
+        if key not in TRACKING_QUERY_PARAMS and not key.startswith('utm_')
+    ]
+    
+    # Collapse the different YouTube link styles onto watch?v=<id>
+    if host == 'youtu.be' and path:
+        params = [('v', path.lstrip('/'))] + params
+        host, path = 'youtube.com', '/watch'
+    elif host == 'youtube.com' and path.startswith(('/shorts/', '/live/')):
+        params = [('v', path.split('/')[2])] + params
+        path = '/watch'
+    if host == 'youtube.com' and path == '/watch':
+        params = [(key, value) for key, value in params if key == 'v']
+    
+    query = urlencode(sorted(params))
+    return f"https://{host}{path}" + (f"?{query}" if query else "")
+
+def media_job_key(url: str, platform: str, quality: str, audio_only: bool, output_format: str) -> tuple:
+    """Identify downloads that would fetch the same thing into the same output"""
+    return (normalize_media_url(url), platform, quality, audio_only, output_format)
+
+class MediaInfoCache:
+    """LRU + TTL cache for media metadata with an optional on-disk tier and in-flight coalescing"""
+
+    def __init__(self, max_entries: int, ttl: float, disk_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.entries = collections.OrderedDict()  # key -> (expires_at, info)
+        self.in_flight = {}  # key -> extraction task shared by concurrent lookups
+        self.waiters = {}  # extraction task -> number of lookups awaiting it
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    async def get(self, url: str) -> dict:
+        """Return metadata for url, extracting it at most once for concurrent identical lookups"""
+        key = normalize_media_url(url)
+        
+        entry = self.entries.get(key)
+        if entry and entry[0] > time.time():
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+        
+        task = self.in_flight.get(key)
+        if task:
+            self.coalesced += 1
+        else:
+            task = self.in_flight[key] = asyncio.create_task(self._extract(key, url))
+        
+        # Each lookup waits on a shield, so one cancelled caller does not cancel the others
+        self.waiters[task] = self.waiters.get(task, 0) + 1
+        try:
+            return dict(await asyncio.shield(task))
+        finally:
+            self.waiters[task] -= 1
+            if not self.waiters[task]:
+                del self.waiters[task]
+                if not task.done():
+                    # Every caller gave up: stop the extraction and let the next lookup start afresh
+                    task.cancel()
+                    if self.in_flight.get(key) is task:
+                        del self.in_flight[key]
+
+    async def _extract(self, key: str, url: str) -> dict:
+        """Load metadata from disk or the extractor; errors reach the waiting lookups but are never cached"""
+        try:
+            info = await self._load_disk(key)
+            if info is None:
+                self.misses += 1
+                info = await get_media_info(url)
+                await self._store_disk(key, info)
+            else:
+                self.disk_hits += 1
+            self._store_memory(key, info)
+            return info
+        finally:
+            if self.in_flight.get(key) is asyncio.current_task():
+                del self.in_flight[key]
+
+    def invalidate(self, url: str):
+        key = normalize_media_url(url)
+        self.entries.pop(key, None)
+        if self.disk_dir:
+            try:
+                os.remove(self._disk_path(key))
+            except FileNotFoundError:
+                pass
+
+    def snapshot(self) -> dict:
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "disk_enabled": bool(self.disk_dir),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "in_flight": len(self.in_flight)
+        }
+
+    def _store_memory(self, key: str, info: dict):
+        self.entries[key] = (time.time() + self.ttl, info)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    async def _load_disk(self, key: str) -> Optional[dict]:
+        if not self.disk_dir:
+            return None
+        
+        def load():
+            path = self._disk_path(key)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (FileNotFoundError, ValueError):
+                return None
+            if entry.get("expires_at", 0) <= time.time():
+                os.remove(path)
+                return None
+            return entry["info"]
+        
+        try:
+            return await asyncio.to_thread(load)
+        except Exception as e:
+            logging.warning(f"Metadata disk cache read failed: {str(e)}")
+            return None
+
+    async def _store_disk(self, key: str, info: dict):
+        if not self.disk_dir:
+            return
+        
+        def store():
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"url": key, "expires_at": time.time() + self.ttl, "info": info}, f)
+            os.replace(tmp_path, path)
+        
+        try:
+            await asyncio.to_thread(store)
+        except Exception as e:
+            logging.warning(f"Metadata disk cache write failed: {str(e)}")
+
+media_info_cache = MediaInfoCache(METADATA_CACHE_SIZE, METADATA_CACHE_TTL, METADATA_CACHE_DIR or None)
+
+class EventBroker:
+    """Fans download events out to every connected /api/events client"""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.published = 0
+        self.overflows = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+
+    def publish(self, event: dict):
+        """Queue an event for every subscriber; must be called on the event loop"""
+        data = json.dumps(jsonable_encoder(event))
+        self.published += 1
+        for queue in self.subscribers:
+            if queue.full():
+                # A client that cannot keep up is told to refetch instead of receiving a gapped stream
+                self.overflows += 1
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(json.dumps({"type": "resync"}))
+            else:
+                queue.put_nowait(data)
+
+    def snapshot(self) -> dict:
+        return {
+            "subscribers": len(self.subscribers),
+            "published": self.published,
+            "overflows": self.overflows
+        }
+
+event_broker = EventBroker(EVENT_QUEUE_SIZE)
+
+class DownloadStats:
+    """Per-status and per-platform download counters kept in one stats document"""
+
+    def __init__(self, reconcile_interval: float):
+        self.reconcile_interval = reconcile_interval
+        self.reconcile_task = None
+        self.reconciled_at = None
+
+    async def record_transition(self, platform: str, old_status: Optional[str], new_status: Optional[str]):
+        """Move one download between status counters; None means created or deleted"""
+        if old_status == new_status:
+            return
+        platform = platform or "unknown"
+        increments = {}
+        if old_status is None:
+            increments["total"] = 1
+            increments[f"platforms.{platform}.total"] = 1
+        else:
+            increments[f"status.{old_status}"] = -1
+            increments[f"platforms.{platform}.{old_status}"] = -1
+        if new_status is None:
+            increments["total"] = -1
+            increments[f"platforms.{platform}.total"] = -1
+        else:
+            increments[f"status.{new_status}"] = 1
+            increments[f"platforms.{platform}.{new_status}"] = 1
+        try:
+            await db.stats.update_one({"_id": "downloads"}, {"$inc": increments}, upsert=True)
+        except Exception as e:
+            logging.error(f"Failed to update download counters: {str(e)}")
+
+    async def record_retry(self, platform: str):
+        platform = platform or "unknown"
+        try:
+            await db.stats.update_one({"_id": "downloads"}, {"$inc": {"retries": 1, f"platforms.{platform}.retries": 1}}, upsert=True)
+        except Exception as e:
+            logging.error(f"Failed to update download counters: {str(e)}")
+
+    async def read(self) -> dict:
+        counters = await db.stats.find_one({"_id": "downloads"})
+        if counters is None:
+            counters = await self.reconcile()
+        return counters
+
+    async def reconcile(self) -> dict:
+        """Rebuild the counters from the downloads collection with a single aggregation"""
+        pipeline = [{"$group": {
+            "_id": {"status": "$status", "platform": "$platform"},
+            "count": {"$sum": 1},
+            "retries": {"$sum": {"$ifNull": ["$retry_count", 0]}}
+        }}]
+        counters = {"_id": "downloads", "total": 0, "retries": 0, "status": {}, "platforms": {}}
+        async for group in db.downloads.aggregate(pipeline):
+            status = group["_id"].get("status") or "unknown"
+            platform = group["_id"].get("platform") or "unknown"
+            count = group["count"]
+            platform_counters = counters["platforms"].setdefault(platform, {"total": 0, "retries": 0})
+            counters["total"] += count
+            counters["retries"] += group["retries"]
+            platform_counters["retries"] += group["retries"]
+            counters["status"][status] = counters["status"].get(status, 0) + count
+            platform_counters["total"] += count
+            platform_counters[status] = platform_counters.get(status, 0) + count
+        counters["reconciled_at"] = datetime.utcnow()
+        
+        # Transitions landing between the aggregation and this write are corrected next round
+        await db.stats.replace_one({"_id": "downloads"}, counters, upsert=True)
+        self.reconciled_at = counters["reconciled_at"]
+        return counters
+
+    def start(self):
+        if self.reconcile_task is None:
+            self.reconcile_task = asyncio.create_task(self._reconcile_loop())
+
+    async def stop(self):
+        if self.reconcile_task is not None:
+            self.reconcile_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.reconcile_task
+            self.reconcile_task = None
+
+    async def _reconcile_loop(self):
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logging.error(f"Failed to reconcile download counters: {str(e)}")
+            await asyncio.sleep(self.reconcile_interval)
+
+download_stats = DownloadStats(STATS_RECONCILE_INTERVAL)
+
+@app.on_event("startup")
+async def start_download_stats():
+    download_stats.start()
+
+@app.on_event("shutdown")
+async def stop_download_stats():
+    await download_stats.stop()
+
+async def create_download(record: dict):
+    """Insert a new download record and announce it to subscribers"""
+    await db.downloads.insert_one(record)
+    await download_stats.record_transition(record.get("platform"), None, record["status"])
+    event_broker.publish({"type": "created", "download": {key: value for key, value in record.items() if key != "_id"}})
+
+async def update_download(download_id: str, fields: dict):
+    """Apply a state change to a download record and announce it to subscribers"""
+    if "status" in fields:
+        # The previous state tells which counters the transition moves between
+        previous = await db.downloads.find_one_and_update(
+            {"id": download_id},
+            {"$set": fields},
+            projection={"status": 1, "platform": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous:
+            await download_stats.record_transition(previous.get("platform"), previous.get("status"), fields["status"])
+    else:
+        await db.downloads.update_one({"id": download_id}, {"$set": fields})
+    # Manifests and path lists stay server-side; clients fetch them on demand
+    event_broker.publish({
+        "type": "updated",
+        "id": download_id,
+        **{key: value for key, value in fields.items() if key not in ("items", "files", "gallery_options")}
+    })
+
+async def remove_download(download_id: str):
+    """Delete a download record and announce it to subscribers"""
+    removed = await db.downloads.find_one_and_delete({"id": download_id}, projection={"status": 1, "platform": 1})
+    if removed:
+        await download_stats.record_transition(removed.get("platform"), removed.get("status"), None)
+    event_broker.publish({"type": "deleted", "id": download_id})
+
+class ProgressAggregator:
+    """Collects progress from any thread and flushes the latest value per download in one bulk write"""
+
+    def __init__(self, flush_interval_ms: int):
+        self.flush_interval = flush_interval_ms / 1000
+        self.lock = threading.Lock()
+        self.jobs = {}  # download_id -> latest progress fields and rate estimates
+        self.dirty = set()
+        self.flush_task = None
+        self.flushes = 0
+        self.writes = 0
+        self.records = 0
+
+    def record(self, download_id: str, progress: float, downloaded_bytes: Optional[int] = None,
+               total_bytes: Optional[int] = None, speed: Optional[float] = None, eta: Optional[float] = None,
+               items_done: Optional[int] = None, items_total: Optional[int] = None):
+        """Note the latest progress; speed and ETA are estimated when the source does not provide them"""
+        now = time.monotonic()
+        with self.lock:
+            self.records += 1
+            job = self.jobs.get(download_id)
+            if job is None:
+                job = self.jobs[download_id] = {"started": now, "at": now, "progress": 0.0, "bytes": 0, "rate": None}
+            
+            elapsed = now - job["at"]
+            if speed is None and downloaded_bytes is not None and elapsed > 0:
+                sample = max(downloaded_bytes - job["bytes"], 0) / elapsed
+                speed = sample if job["rate"] is None else 0.3 * sample + 0.7 * job["rate"]
+            if speed is not None:
+                job["rate"] = speed
+            if eta is None:
+                if speed and total_bytes and downloaded_bytes is not None:
+                    eta = max(total_bytes - downloaded_bytes, 0) / speed
+                elif progress > 0 and now > job["started"]:
+                    # No byte counts (galleries): extrapolate from the average rate of progress
+                    eta = (100.0 - progress) / (progress / (now - job["started"]))
+            
+            job.update(at=now, progress=progress, bytes=downloaded_bytes or 0)
+            job["fields"] = {
+                "progress": round(progress, 1),
+                "downloaded_bytes": downloaded_bytes,
+                "total_bytes": total_bytes,
+                "speed": round(speed, 1) if speed is not None else None,
+                "eta": int(eta) if eta is not None else None
+            }
+            if items_done is not None:
+                job["fields"].update(items_done=items_done, items_total=items_total)
+            self.dirty.add(download_id)
+
+    def yt_dlp_hook(self, download_id: str, cancel_event: Optional[threading.Event] = None):
+        """Build a yt-dlp progress hook; it runs on the download thread for every chunk and aborts it once cancel_event is set"""
+        def hook(d):
+            if cancel_event is not None and cancel_event.is_set():
+                raise yt_dlp.utils.DownloadCancelled(f"Download {download_id} cancelled")
+            if d['status'] != 'downloading':
+                return
+            total = d.get('total_bytes') or d.get('total_bytes_estimate')
+            downloaded = d.get('downloaded_bytes') or 0
+            self.record(
+                download_id,
+                downloaded / total * 100 if total else 0.0,
+                downloaded_bytes=downloaded,
+                total_bytes=int(total) if total else None,
+                speed=d.get('speed'),
+                eta=d.get('eta')
+            )
+        return hook
+
+    def finish(self, download_id: str):
+        """Forget a download once it leaves the downloading state"""
+        with self.lock:
+            self.jobs.pop(download_id, None)
+            self.dirty.discard(download_id)
+
+    def start(self):
+        if self.flush_task is None:
+            self.flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.flush_task
+            self.flush_task = None
+        await self.flush()
+
+    async def flush(self):
+        with self.lock:
+            updates = [(download_id, self.jobs[download_id]["fields"]) for download_id in self.dirty]
+            self.dirty.clear()
+        if not updates:
+            return
+        
+        # Matching on status keeps a late flush from overwriting a finished or failed record
+        operations = [
+            UpdateOne({"id": download_id, "status": "downloading"}, {"$set": fields})
+            for download_id, fields in updates
+        ]
+        try:
+            await db.downloads.bulk_write(operations, ordered=False)
+            self.flushes += 1
+            self.writes += len(operations)
+            for download_id, fields in updates:
+                event_broker.publish({"type": "progress", "id": download_id, **fields})
+        except Exception as e:
+            logging.error(f"Failed to flush progress for {len(operations)} downloads: {str(e)}")
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "tracked": len(self.jobs),
+                "pending": len(self.dirty),
+                "flush_interval_ms": int(self.flush_interval * 1000),
+                "flushes": self.flushes,
+                "writes": self.writes,
+                "records": self.records
+            }
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+progress_aggregator = ProgressAggregator(PROGRESS_FLUSH_INTERVAL_MS)
+
+@app.on_event("startup")
+async def start_progress_aggregator():
+    progress_aggregator.start()
+
+@app.on_event("shutdown")
+async def stop_progress_aggregator():
+    await progress_aggregator.stop()
+
+class DownloadArchive:
+    """Persistent set of finished items in gallery-dl's SQLite archive schema, also used by yt-dlp"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = None
+        self.hits = 0
+
+    def _connect(self):
+        if self.connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.connection = sqlite3.connect(self.path, timeout=60, check_same_thread=False, isolation_level=None)
+            # WAL lets gallery-dl's own connections read while another job writes
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS archive (entry TEXT PRIMARY KEY) WITHOUT ROWID")
+        return self.connection
+
+    def __contains__(self, entry: str) -> bool:
+        with self.lock:
+            found = self._connect().execute("SELECT 1 FROM archive WHERE entry=? LIMIT 1", (entry,)).fetchone()
+            if found:
+                self.hits += 1
+            return found is not None
+
+    def add(self, entry: str):
+        with self.lock:
+            self._connect().execute("INSERT OR IGNORE INTO archive (entry) VALUES (?)", (entry,))
+
+    def remove(self, entries: List[str]):
+        """Forget items so that downloading them again fetches them"""
+        with self.lock:
+            self._connect().executemany("DELETE FROM archive WHERE entry=?", [(entry,) for entry in entries])
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM archive").fetchone()[0]
+        return {"path": self.path, "entries": entries, "hits": self.hits}
+
+class ArchiveVariant:
+    """View of a DownloadArchive that suffixes entries with the requested format, so other formats still download"""
+
+    def __init__(self, archive: DownloadArchive, variant: str):
+        self.archive = archive
+        self.variant = variant
+
+    def key(self, entry: str) -> str:
+        return f"{entry} {self.variant}"
+
+    def __contains__(self, entry: str) -> bool:
+        return self.key(entry) in self.archive
+
+    def add(self, entry: str):
+        self.archive.add(self.key(entry))
+
+def video_archive_variant(quality: str, audio_only: bool, output_format: str) -> str:
+    """Archive suffix for the options that change what a yt-dlp download produces"""
+    return "audio:mp3" if audio_only else f"{quality}:{output_format}"
+
+fetch_archive = DownloadArchive(DOWNLOAD_ARCHIVE_PATH) if DOWNLOAD_ARCHIVE_PATH else None
+
+async def mark_download_archived(download_id: str, archive_keys: List[str]):
+    """Finish a download whose items were all fetched by an earlier download"""
+    cursor = db.downloads.find(
+        {"archive_keys": {"$in": archive_keys}, "id": {"$ne": download_id}},
+        {"_id": 0, "id": 1}
+    ).limit(20)
+    await update_download(download_id, {
+        "status": "skipped",
+        "progress": 100.0,
+        "archive_keys": archive_keys,
+        "duplicate_of": [download["id"] async for download in cursor],
+        "error_message": "Already downloaded earlier (found in the download archive)",
+        "completed_at": datetime.utcnow()
+    })
+
+class BlobStore:
+    """Content-addressed file store; downloads keep their readable paths as hardlinks to one blob"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.lock = threading.Lock()
+        self.stored = 0
+        self.duplicates = 0
+        self.bytes_saved = 0
+        self.link_errors = 0
+        os.makedirs(root, exist_ok=True)
+
+    def blob_path(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def ingest(self, path: str) -> dict:
+        """Hash a finished file and link it to its blob, replacing it when the content is already stored"""
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(FILE_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+        size = os.path.getsize(path)
+        blob = self.blob_path(sha256)
+        
+        with self.lock:
+            try:
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                if not os.path.exists(blob):
+                    os.link(path, blob)
+                    self.stored += 1
+                    return {"sha256": sha256, "size": size, "duplicate": False}
+                if os.path.samefile(path, blob):
+                    return {"sha256": sha256, "size": size, "duplicate": False}
+                
+                # Same content stored before: swap the new copy for a link to the existing blob
+                temp_path = f"{path}.{uuid.uuid4().hex}.link"
+                os.link(blob, temp_path)
+                os.replace(temp_path, path)
+                self.duplicates += 1
+                self.bytes_saved += size
+                return {"sha256": sha256, "size": size, "duplicate": True}
+            except OSError as e:
+                # Hardlinks unsupported (other filesystem, permissions): keep the plain file
+                self.link_errors += 1
+                logging.error(f"Failed to link {path} into the blob store: {str(e)}")
+                return {"sha256": sha256, "size": size, "duplicate": False}
+
+    def release(self, sha256: str):
+        """Drop a blob once no download path links to it any more"""
+        blob = self.blob_path(sha256)
+        with self.lock:
+            try:
+                if os.stat(blob).st_nlink <= 1:
+                    os.remove(blob)
+            except FileNotFoundError:
+                pass
+
+    def snapshot(self) -> dict:
+        return {
+            "root": self.root,
+            "stored": self.stored,
+            "duplicates": self.duplicates,
+            "bytes_saved": self.bytes_saved,
+            "link_errors": self.link_errors
+        }
+
+blob_store = BlobStore(BLOB_STORE_DIR)
+
+async def store_download_content(download_id: str, paths: List[str], items: Optional[List[dict]] = None) -> dict:
+    """Move a download's files into the blob store and describe the duplicates it turned out to have"""
+    hashes = {}
+    duplicate_files = duplicate_bytes = 0
+    for path in dict.fromkeys(paths):
+        try:
+            stored = await asyncio.to_thread(blob_store.ingest, path)
+        except OSError as e:
+            logging.error(f"Failed to hash {path}: {str(e)}")
+            continue
+        hashes[path] = stored["sha256"]
+        if stored["duplicate"]:
+            duplicate_files += 1
+            duplicate_bytes += stored["size"]
+    
+    for item in items or []:
+        if item.get("path") in hashes:
+            item["sha256"] = hashes[item["path"]]
+    
+    content_hashes = list(dict.fromkeys(hashes.values()))
+    duplicate_of = []
+    if duplicate_files:
+        cursor = db.downloads.find(
+            {"content_hashes": {"$in": content_hashes}, "id": {"$ne": download_id}},
+            {"_id": 0, "id": 1}
+        ).limit(20)
+        duplicate_of = [download["id"] async for download in cursor]
+    
+    return {
+        "content_hashes": content_hashes,
+        "duplicate_files": duplicate_files,
+        "duplicate_bytes": duplicate_bytes,
+        "duplicate_of": duplicate_of
+    }
 
 async def download_video_task(download_id: str, url: str, quality: str, audio_only: bool, output_format: str):
     """Download video using yt-dlp"""
     try:
         # Update status to downloading
-        await db.downloads.update_one(
-            {"id": download_id},
-            {"$set": {"status": "downloading"}}
-        )
+        await update_download(download_id, {"status": "downloading"})
         
         # Get video info
-        video_info = get_video_info(url)
+        video_info = await media_info_cache.get(url)
         safe_title = sanitize_filename(video_info['title'])
         safe_uploader = sanitize_filename(video_info['uploader'])
         
@@ -520,14 +2292,15 @@ async def download_video_task(download_id: str, url: str, quality: str, audio_on
         uploader_dir = os.path.join(DOWNLOAD_BASE_DIR, safe_uploader)
         os.makedirs(uploader_dir, exist_ok=True)
         
-        progress_tracker = DownloadProgress(download_id)
-        
-        # Configure yt-dlp options
+        # Configure yt-dlp options; cancelling the task stops the download thread at its next chunk
+        cancel_event = threading.Event()
         ydl_opts = {
             'format': 'bestaudio/best' if audio_only else quality,
             'outtmpl': os.path.join(uploader_dir, f'{safe_title}.%(ext)s'),
-            'progress_hooks': [progress_tracker.progress_hook],
+            'progress_hooks': [progress_aggregator.yt_dlp_hook(download_id, cancel_event)],
             'noplaylist': True,
+            # Resume from the .part file when a download interrupted by a restart is requeued
+            'continuedl': True,
             'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'extractor_args': {
                 'youtube': {
@@ -549,62 +2322,67 @@ async def download_video_task(download_id: str, url: str, quality: str, audio_on
                 'preferedformat': output_format,
             }]
         
-        # Download the video
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
-        
-        # Find the downloaded file
+        # Download the video; post hooks receive each final path after postprocessing
         downloaded_files = []
-        for file in os.listdir(uploader_dir):
-            if safe_title in file:
-                downloaded_files.append(file)
+        ydl_opts['post_hooks'] = [downloaded_files.append]
+        # Archive entries carry the format, so an mp3 or another quality of an archived video is still fetched
+        variant = video_archive_variant(quality, audio_only, output_format)
+        if fetch_archive is not None:
+            # yt-dlp accepts any set-like archive: membership checks and add() hit the SQLite table
+            ydl_opts['download_archive'] = ArchiveVariant(fetch_archive, variant)
         
-        if downloaded_files:
-            filename = downloaded_files[0]
-            filepath = os.path.join(uploader_dir, filename)
+        def run_ydl():
+            with RateLimitedYoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(url, download=True)
+            if info is None:
+                # yt-dlp stops before extracting when the id in the URL is already archived
+                ie = next((ie for ie in yt_dlp.extractor.gen_extractor_classes() if ie.suitable(url)), None)
+                temp_id = ie.get_temp_id(url) if ie else None
+                return [f"{yt_dlp.utils.make_archive_id(ie.ie_key(), temp_id)} {variant}"] if temp_id else []
+            if not downloaded_files:
+                downloaded_files.extend(d['filepath'] for d in info.get('requested_downloads', []) if d.get('filepath'))
+            return [f"{yt_dlp.utils.make_archive_id(info['extractor_key'], info['id'])} {variant}"] if info.get('id') else []
+        
+        archive_keys = await extractor_executor.run_cancellable(cancel_event, run_ydl)
+        
+        if not downloaded_files and fetch_archive is not None and archive_keys and archive_keys[0] in fetch_archive:
+            await mark_download_archived(download_id, archive_keys)
+        elif downloaded_files:
+            filepath = downloaded_files[-1]
             file_size = os.path.getsize(filepath)
             
             # Update completion status
-            await db.downloads.update_one(
-                {"id": download_id},
-                {
-                    "$set": {
-                        "status": "completed",
-                        "progress": 100.0,
-                        "filename": filename,
-                        "file_size": file_size,
-                        "completed_at": datetime.utcnow(),
-                        "title": video_info['title'],
-                        "uploader": video_info['uploader']
-                    }
-                }
-            )
+            await update_download(download_id, {
+                "status": "completed",
+                "progress": 100.0,
+                "filename": os.path.basename(filepath),
+                "filepath": filepath,
+                "files": downloaded_files,
+                "file_size": file_size,
+                **await store_download_content(download_id, downloaded_files),
+                "archive_keys": archive_keys,
+                "completed_at": datetime.utcnow(),
+                "title": video_info['title'],
+                "uploader": video_info['uploader']
+            })
         else:
             raise Exception("Downloaded file not found")
             
     except Exception as e:
         # Update error status
-        await db.downloads.update_one(
-            {"id": download_id},
-            {
-                "$set": {
-                    "status": "failed",
-                    "error_message": str(e)
-                }
-            }
-        )
+        await update_download(download_id, {
+            "status": "failed",
+            "error_message": str(e)
+        })
         logging.error(f"Download failed for {download_id}: {str(e)}")
 
 async def download_instagram_task(download_id: str, url: str, quality: str):
     """Download Instagram media"""
     try:
-        await db.downloads.update_one(
-            {"id": download_id},
-            {"$set": {"status": "downloading", "progress": 10.0}}
-        )
+        await update_download(download_id, {"status": "downloading", "progress": 10.0})
         
         # Get media info
-        media_info = get_instagram_info(url)
+        media_info = await media_info_cache.get(url)
         safe_title = sanitize_filename(media_info['title'])
         safe_uploader = sanitize_filename(media_info['uploader'])
         
@@ -612,27 +2390,6 @@ async def download_instagram_task(download_id: str, url: str, quality: str):
         platform_dir = os.path.join(DOWNLOAD_BASE_DIR, "Instagram", safe_uploader)
         os.makedirs(platform_dir, exist_ok=True)
         
-        # Use Instaloader to download with authentication
-        L = instaloader.Instaloader(
-            dirname_pattern=platform_dir,
-            filename_pattern="{shortcode}_{date_utc}",
-            download_videos=True,
-            download_video_thumbnails=False,
-            download_geotags=False,
-            download_comments=False,
-            save_metadata=False
-        )
-        
-        # Try to login using stored credentials
-        instagram_auth = auth_storage.get("instagram", {})
-        if instagram_auth.get("username") and instagram_auth.get("password"):
-            try:
-                L.login(instagram_auth["username"], instagram_auth["password"])
-                logging.info("Instagram login successful")
-            except Exception as login_error:
-                logging.warning(f"Instagram login failed: {str(login_error)}")
-                # Continue without login for public posts
-        
         # Extract shortcode from URL
         if '/p/' in url:
             shortcode = url.split('/p/')[1].split('/')[0]
@@ -642,41 +2399,42 @@ async def download_instagram_task(download_id: str, url: str, quality: str):
             raise ValueError("Unsupported Instagram URL format")
         
         # Progress update
-        await db.downloads.update_one(
-            {"id": download_id},
-            {"$set": {"progress": 50.0}}
-        )
+        await update_download(download_id, {"progress": 50.0})
         
-        # Download the post
-        post = instaloader.Post.from_shortcode(L.context, shortcode)
-        L.download_post(post, target="")
+        # Download the post in the extractor pool with a warm, logged-in session
+        cancel_event = threading.Event()
         
-        # Find downloaded files
-        downloaded_files = []
-        for file in os.listdir(platform_dir):
-            if shortcode in file and not file.endswith('.json.xz'):  # Skip metadata files
-                downloaded_files.append(file)
+        def fetch_post(L):
+            L.dirname_pattern = platform_dir
+            L.filename_pattern = "{shortcode}_{date_utc}"
+            L.saved_files = []
+            L.cancel_event = cancel_event
+            try:
+                post = instaloader.Post.from_shortcode(L.context, shortcode)
+                L.download_post(post, target="")
+            finally:
+                L.cancel_event = None
+            return list(L.saved_files)
+        
+        downloaded_files = await instagram_sessions.run(fetch_post, cancel_event)
         
         if downloaded_files:
             # Take the first media file (usually the main content)
-            filename = downloaded_files[0]
-            filepath = os.path.join(platform_dir, filename)
+            filepath = downloaded_files[0]
             file_size = os.path.getsize(filepath)
             
-            await db.downloads.update_one(
-                {"id": download_id},
-                {
-                    "$set": {
-                        "status": "completed",
-                        "progress": 100.0,
-                        "filename": filename,
-                        "file_size": file_size,
-                        "completed_at": datetime.utcnow(),
-                        "title": media_info['title'],
-                        "uploader": media_info['uploader']
-                    }
-                }
-            )
+            await update_download(download_id, {
+                "status": "completed",
+                "progress": 100.0,
+                "filename": os.path.basename(filepath),
+                "filepath": filepath,
+                "files": downloaded_files,
+                "file_size": file_size,
+                **await store_download_content(download_id, downloaded_files),
+                "completed_at": datetime.utcnow(),
+                "title": media_info['title'],
+                "uploader": media_info['uploader']
+            })
         else:
             raise Exception("Downloaded file not found")
             
@@ -685,139 +2443,266 @@ async def download_instagram_task(download_id: str, url: str, quality: str):
         if "401" in error_msg or "login" in error_msg.lower():
             error_msg = f"Instagram authentication required. Please configure your Instagram credentials in the Settings panel. {error_msg}"
         
-        await db.downloads.update_one(
-            {"id": download_id},
-            {
-                "$set": {
-                    "status": "failed",
-                    "error_message": error_msg
-                }
-            }
-        )
+        await update_download(download_id, {
+            "status": "failed",
+            "error_message": error_msg
+        })
         logging.error(f"Instagram download failed for {download_id}: {error_msg}")
 
-async def download_reddit_task(download_id: str, url: str, quality: str):
-    """Download Reddit media using gallery-dl"""
-    try:
-        await db.downloads.update_one(
-            {"id": download_id},
-            {"$set": {"status": "downloading", "progress": 10.0}}
-        )
+class GalleryDLOutput(gallery_dl.output.NullOutput):
+    """gallery-dl output that reports finished files to the engine instead of printing them"""
+
+    def __init__(self, job):
+        self.job = job
+
+    def _check_cancelled(self):
+        if self.job.cancel_event.is_set():
+            raise gallery_dl.exception.StopExtraction("Download cancelled")
+
+    def start(self, path):
+        self._check_cancelled()
+
+    def skip(self, path):
+        self.job.report_file(path, "skipped")
+
+    def success(self, path):
+        self.job.report_file(path)
+
+    def progress(self, bytes_total, bytes_downloaded, bytes_per_second):
+        self._check_cancelled()
+
+class GalleryDLJob(gallery_dl.job.DownloadJob):
+    """In-process gallery-dl download with per-job destination, progress and log capture"""
+
+    def __init__(self, url, parent=None, options=None, on_file=None, cancel_event=None):
+        gallery_dl.job.DownloadJob.__init__(self, url, parent)
+
+        if parent:
+            # Child jobs (e.g. a Reddit post linking to an imgur album) share the root job's state
+            options, on_file, cancel_event = parent.options, parent.on_file, parent.cancel_event
+            self.files, self.items, self.error_tail = parent.files, parent.items, parent.error_tail
+        else:
+            self.files = []
+            self.items = []  # manifest of every file the job handled, across child jobs
+            self.error_tail = collections.deque(maxlen=GALLERY_DL_STDERR_TAIL_LINES)
         
-        # Get media info
-        media_info = get_reddit_info(url)
-        safe_title = sanitize_filename(media_info['title'])
-        safe_uploader = sanitize_filename(media_info['uploader'])
+        # Position of the current file among this job's URLs, the numbering "image-range" selects by
+        self.url_position = 0
+        self.current_url = None
+
+        self.options = options or {}
+        self.on_file = on_file
+        self.cancel_event = cancel_event or threading.Event()
+        self.out = GalleryDLOutput(self)
+
+        # gallery-dl's config is process-wide, so per-job settings override the extractor lookup
+        extractor_config = self.extractor.config
+        def config(key, default=None):
+            if key in self.options:
+                return self.options[key]
+            return extractor_config(key, default)
+        self.extractor.config = config
         
-        # Create organized folder structure
-        platform_dir = os.path.join(DOWNLOAD_BASE_DIR, "Reddit", safe_uploader)
-        os.makedirs(platform_dir, exist_ok=True)
+        # Extractor and downloader requests share the extractor's session, created on initialize()
+        init_session = self.extractor._init_session
+        def limited_session():
+            init_session()
+            self.extractor.session.send = rate_limited_send(self.extractor.session.send)
+        self.extractor._init_session = limited_session
+
+    def dispatch(self, msg):
+        if msg[0] == gallery_dl.extractor.message.Message.Url:
+            self.url_position += 1
+        gallery_dl.job.DownloadJob.dispatch(self, msg)
+
+    def handle_url(self, url, kwdict):
+        self.current_url = url
+        reported = len(self.items)
+        gallery_dl.job.DownloadJob.handle_url(self, url, kwdict)
+        if len(self.items) == reported:
+            # Neither saved nor skipped: gallery-dl has logged why the download failed
+            self.report_file(self.pathfmt.path or None, "failed")
+        if self.archive:
+            self.items[-1]["archive_key"] = kwdict.get("_archive_key")
+
+    def report_file(self, path, status="completed"):
+        if status == "skipped" and not (path and os.path.isfile(path)):
+            # Skipped through the download archive, but the earlier copy is no longer here
+            status = "archived"
+        self.items.append({
+            "index": len(self.items) + 1,
+            "source": self.extractor.url,
+            "position": self.url_position,
+            "url": self.current_url,
+            "path": path,
+            "status": status
+        })
+        if status in ("failed", "archived"):
+            return
         
-        # Progress update
-        await db.downloads.update_one(
-            {"id": download_id},
-            {"$set": {"progress": 30.0}}
-        )
+        self.files.append(path)
+        if self.on_file:
+            count = self.pathfmt.kwdict.get("count")
+            self.on_file(len(self.files), count if isinstance(count, int) else None)
+
+class GalleryDLLogHandler(logging.Handler):
+    """Route gallery-dl warnings and errors to the tail buffer of the job that logged them"""
+
+    def emit(self, record):
+        error_tail = getattr(getattr(record, "job", None), "error_tail", None)
+        if error_tail is not None:
+            error_tail.append(f"[{record.name}][{record.levelname.lower()}] {record.getMessage()}")
+
+class GalleryDLEngine:
+    """Long-lived pool running gallery-dl jobs through its Python API"""
+
+    def __init__(self, pool_size: int):
+        self.executor = ExtractorExecutor(pool_size, name="gallery-dl")
+        self.configured = False
+        logging.getLogger().addHandler(GalleryDLLogHandler(logging.WARNING))
+
+    def load_config(self):
+        """(Re)load gallery-dl's config files and the stored Reddit credentials"""
+        gallery_dl.config.clear()
+        gallery_dl.config.load()
         
-        # Create gallery-dl config for Reddit authentication if available
-        config_data = {}
         reddit_auth = auth_storage.get("reddit", {})
         if reddit_auth.get("client_id") and reddit_auth.get("client_secret"):
-            config_data = {
-                "extractor": {
-                    "reddit": {
-                        "client-id": reddit_auth["client_id"],
-                        "client-secret": reddit_auth["client_secret"]
-                    }
-                }
-            }
+            gallery_dl.config.set(("extractor", "reddit"), "client-id", reddit_auth["client_id"])
+            gallery_dl.config.set(("extractor", "reddit"), "client-secret", reddit_auth["client_secret"])
             
             if reddit_auth.get("username") and reddit_auth.get("password"):
-                config_data["extractor"]["reddit"].update({
-                    "username": reddit_auth["username"],
-                    "password": reddit_auth["password"]
-                })
+                gallery_dl.config.set(("extractor", "reddit"), "username", reddit_auth["username"])
+                gallery_dl.config.set(("extractor", "reddit"), "password", reddit_auth["password"])
         
-        # Use gallery-dl to download Reddit content
-        cmd = [
-            "gallery-dl",
-            "--dest", platform_dir,
-            "--filename", "{category}_{subcategory}_{id}_{num}.{extension}"
-        ]
+        self.configured = True
+
+    async def run(self, url: str, dest: str, filename: str, on_progress=None, timeout: float = GALLERY_DL_TIMEOUT,
+                  options: Optional[dict] = None) -> dict:
+        """Download url into dest, reporting (files done, total or None) to on_progress from the job thread"""
+        if not self.configured:
+            self.load_config()
         
-        # Add config if we have authentication
-        if config_data:
-            import tempfile
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as config_file:
-                json.dump(config_data, config_file)
-                cmd.extend(["--config", config_file.name])
-                
-                # Add URL and run command
-                cmd.append(url)
-                
-                # Run gallery-dl command
-                process = subprocess.run(cmd, capture_output=True, text=True)
-                
-                # Clean up temp config file
-                os.unlink(config_file.name)
+        cancel_event = threading.Event()
+        
+        def on_file(done, total):
+            if on_progress:
+                on_progress(done, total)
+        
+        def run_job():
+            job = GalleryDLJob(
+                url,
+                options={
+                    "base-directory": dest,
+                    "filename": filename,
+                    **({"archive": fetch_archive.path} if fetch_archive is not None else {}),
+                    **(options or {})
+                },
+                on_file=on_file,
+                cancel_event=cancel_event
+            )
+            returncode = job.run()
+            for item in job.items:
+                item["size"] = os.path.getsize(item["path"]) if item["path"] and os.path.isfile(item["path"]) else None
+            return {
+                "returncode": returncode,
+                "files": job.files,
+                "items": job.items,
+                "stderr": "\n".join(job.error_tail)
+            }
+        
+        try:
+            # Cancelling or timing out sets cancel_event; the job thread stops at the next file or progress callback
+            return await asyncio.wait_for(self.executor.run_cancellable(cancel_event, run_job), timeout)
+        except asyncio.TimeoutError:
+            raise Exception(f"gallery-dl timed out after {timeout:g} seconds")
+
+gallery_dl_engine = GalleryDLEngine(GALLERY_DL_POOL_SIZE)
+
+def gallery_progress_callback(download_id: str):
+    """Build a gallery_dl_engine progress callback that records file progress for a download"""
+    def on_progress(done: int, total: Optional[int]):
+        if total:
+            progress = min(done / total * 100, 99.0)
         else:
-            # Run without authentication config
-            cmd.append(url)
-            process = subprocess.run(cmd, capture_output=True, text=True)
+            # Unknown gallery size: approach 99% as files keep arriving
+            progress = 99.0 * done / (done + 10)
+        progress_aggregator.record(download_id, progress, items_done=done, items_total=total)
+    return on_progress
+
+def gallery_manifest_fields(items: List[dict]) -> dict:
+    """Record fields describing a gallery's item manifest and its primary file"""
+    files = [item["path"] for item in items if item["status"] in ("completed", "skipped")]
+    failed = sum(item["status"] == "failed" for item in items)
+    fields = {
+        "items": items,
+        "items_total": len(items),
+        "items_done": len(files),
+        "items_failed": failed,
+        "items_archived": sum(item["status"] == "archived" for item in items),
+        "archive_keys": [item["archive_key"] for item in items if item.get("archive_key")],
+        "files": files,
+        "filepath": files[0] if files else None,
+        "filename": os.path.basename(files[0]) if files else None,
+        "file_size": sum(item["size"] or 0 for item in items if item["status"] in ("completed", "skipped"))
+    }
+    if failed:
+        fields["error_message"] = f"{failed} of {len(items)} items failed to download; retry them to fetch only those"
+    return fields
+
+async def download_reddit_task(download_id: str, url: str, quality: str):
+    """Download Reddit media using gallery-dl"""
+    try:
+        await update_download(download_id, {"status": "downloading", "progress": 0.0})
         
-        # Progress update
-        await db.downloads.update_one(
-            {"id": download_id},
-            {"$set": {"progress": 80.0}}
+        # Get media info
+        media_info = await media_info_cache.get(url)
+        safe_title = sanitize_filename(media_info['title'])
+        safe_uploader = sanitize_filename(media_info['uploader'])
+        
+        # Create organized folder structure
+        platform_dir = os.path.join(DOWNLOAD_BASE_DIR, "Reddit", safe_uploader)
+        os.makedirs(platform_dir, exist_ok=True)
+        
+        # Use gallery-dl to download Reddit content (Reddit credentials are part of the engine config)
+        filename_template = "{category}_{subcategory}_{id}_{num}.{extension}"
+        process = await gallery_dl_engine.run(
+            url,
+            platform_dir,
+            filename_template,
+            gallery_progress_callback(download_id)
         )
         
-        if process.returncode == 0:
-            # Find downloaded files
-            downloaded_files = []
-            for root, dirs, files in os.walk(platform_dir):
-                for file in files:
-                    if file.endswith(('.jpg', '.png', '.gif', '.mp4', '.webm', '.jpeg')):
-                        downloaded_files.append(file)
-                        break  # Take first file found
-            
-            if downloaded_files:
-                filename = downloaded_files[0]
-                filepath = os.path.join(platform_dir, filename)
-                file_size = os.path.getsize(filepath)
-                
-                await db.downloads.update_one(
-                    {"id": download_id},
-                    {
-                        "$set": {
-                            "status": "completed",
-                            "progress": 100.0,
-                            "filename": filename,
-                            "file_size": file_size,
-                            "completed_at": datetime.utcnow(),
-                            "title": media_info['title'],
-                            "uploader": media_info['uploader']
-                        }
-                    }
-                )
-            else:
-                raise Exception("No media files found to download")
+        # The engine reports every item it saved, found already saved, or failed on
+        if process["files"]:
+            content_fields = await store_download_content(download_id, process["files"], process["items"])
+            await update_download(download_id, {
+                "status": "completed",
+                "progress": 100.0,
+                **gallery_manifest_fields(process["items"]),
+                **content_fields,
+                "gallery_options": {"dest": platform_dir, "filename": filename_template},
+                "completed_at": datetime.utcnow(),
+                "title": media_info['title'],
+                "uploader": media_info['uploader']
+            })
+        elif process["items"] and all(item["status"] == "archived" for item in process["items"]):
+            await mark_download_archived(download_id, gallery_manifest_fields(process["items"])["archive_keys"])
+        elif process["returncode"] == 0:
+            raise Exception("No media files found to download")
         else:
-            error_msg = process.stderr
-            if "403" in error_msg or "rate limit" in error_msg.lower():
+            error_msg = process["stderr"]
+            # Throttling is paced by the host limiter; a 403 means the anonymous API is refused
+            if "403" in error_msg:
                 error_msg = f"Reddit access limited. Please configure your Reddit API credentials in the Settings panel. {error_msg}"
             raise Exception(f"gallery-dl failed: {error_msg}")
             
     except Exception as e:
         error_msg = str(e)
-        await db.downloads.update_one(
-            {"id": download_id},
-            {
-                "$set": {
-                    "status": "failed",
-                    "error_message": error_msg
-                }
-            }
-        )
+        await update_download(download_id, {
+            "status": "failed",
+            "error_message": error_msg
+        })
         logging.error(f"Reddit download failed for {download_id}: {error_msg}")
 
 async def download_media_task(download_id: str, url: str, quality: str, audio_only: bool, output_format: str, platform: str):
@@ -844,127 +2729,713 @@ async def download_media_task(download_id: str, url: str, quality: str, audio_on
         try:
             await download_video_task(download_id, url, quality, audio_only, output_format)
         except Exception as e:
-            await db.downloads.update_one(
-                {"id": download_id},
-                {
-                    "$set": {
-                        "status": "failed",
-                        "error_message": f"Unsupported platform '{detected_platform}': {str(e)}"
-                    }
-                }
-            )
+            await update_download(download_id, {
+                "status": "failed",
+                "error_message": f"Unsupported platform '{detected_platform}': {str(e)}"
+            })
             logging.error(f"Unsupported platform download failed for {download_id}: {str(e)}")
 
 async def download_gallery_site_task(download_id: str, url: str, quality: str, platform: str):
     """Download from gallery sites using gallery-dl"""
     try:
-        await db.downloads.update_one(
-            {"id": download_id},
-            {"$set": {"status": "downloading", "progress": 10.0}}
-        )
+        await update_download(download_id, {"status": "downloading", "progress": 0.0})
         
         # Create organized folder structure
         platform_dir = os.path.join(DOWNLOAD_BASE_DIR, platform.title())
         os.makedirs(platform_dir, exist_ok=True)
         
-        # Progress update
-        await db.downloads.update_one(
-            {"id": download_id},
-            {"$set": {"progress": 30.0}}
-        )
-        
         # Use gallery-dl to download content
-        cmd = [
-            "gallery-dl",
-            "--dest", platform_dir,
-            "--filename", f"{platform}_" + "{category}_{title}_{num}.{extension}",
-            url
-        ]
-        
-        # Run gallery-dl command
-        process = subprocess.run(cmd, capture_output=True, text=True)
-        
-        # Progress update
-        await db.downloads.update_one(
-            {"id": download_id},
-            {"$set": {"progress": 80.0}}
-        )
-        
-        if process.returncode == 0:
-            # Find downloaded files
-            downloaded_files = []
-            for root, dirs, files in os.walk(platform_dir):
-                for file in files:
-                    if file.endswith(('.jpg', '.png', '.gif', '.mp4', '.webm', '.jpeg', '.zip')):
-                        downloaded_files.append(file)
-                        break
-            
-            if downloaded_files:
-                filename = downloaded_files[0]
-                filepath = os.path.join(platform_dir, filename)
-                file_size = os.path.getsize(filepath)
-                
-                await db.downloads.update_one(
-                    {"id": download_id},
-                    {
-                        "$set": {
-                            "status": "completed",
-                            "progress": 100.0,
-                            "filename": filename,
-                            "file_size": file_size,
-                            "completed_at": datetime.utcnow(),
-                            "title": f"{platform.title()} Gallery",
-                            "uploader": platform.title()
-                        }
-                    }
-                )
-            else:
-                raise Exception("No files found to download")
-        else:
-            raise Exception(f"gallery-dl failed: {process.stderr}")
-            
-    except Exception as e:
-        await db.downloads.update_one(
-            {"id": download_id},
-            {
-                "$set": {
-                    "status": "failed",
-                    "error_message": str(e)
-                }
-            }
+        filename_template = f"{platform}_" + "{category}_{title}_{num}.{extension}"
+        process = await gallery_dl_engine.run(
+            url,
+            platform_dir,
+            filename_template,
+            gallery_progress_callback(download_id)
         )
+        
+        # The engine reports every item it saved, found already saved, or failed on
+        if process["files"]:
+            content_fields = await store_download_content(download_id, process["files"], process["items"])
+            await update_download(download_id, {
+                "status": "completed",
+                "progress": 100.0,
+                **gallery_manifest_fields(process["items"]),
+                **content_fields,
+                "gallery_options": {"dest": platform_dir, "filename": filename_template},
+                "completed_at": datetime.utcnow(),
+                "title": f"{platform.title()} Gallery",
+                "uploader": platform.title()
+            })
+        elif process["items"] and all(item["status"] == "archived" for item in process["items"]):
+            await mark_download_archived(download_id, gallery_manifest_fields(process["items"])["archive_keys"])
+        elif process["returncode"] == 0:
+            raise Exception("No files found to download")
+        else:
+            raise Exception(f"gallery-dl failed: {process['stderr']}")
+            
+    except Exception as e:
+        await update_download(download_id, {
+            "status": "failed",
+            "error_message": str(e)
+        })
         logging.error(f"{platform} download failed for {download_id}: {str(e)}")
 
+async def retry_gallery_items_task(download_id: str):
+    """Download only the failed items of a gallery again, by their position in the source listing"""
+    try:
+        download = await db.downloads.find_one({"id": download_id})
+        if download is None:
+            logging.error(f"Gallery item retry skipped, download {download_id} no longer exists")
+            return
+        if not download.get("gallery_options"):
+            raise Exception("No gallery manifest recorded for this download")
+        items = download.get("items", [])
+        options = download["gallery_options"]
+        
+        await update_download(download_id, {"status": "downloading"})
+        
+        failed_positions = collections.defaultdict(list)
+        for item in items:
+            if item["status"] == "failed":
+                failed_positions[item["source"]].append(item["position"])
+        
+        # Child galleries (e.g. an imgur album in a Reddit post) are re-run from their own URL
+        for source, positions in failed_positions.items():
+            process = await gallery_dl_engine.run(
+                source,
+                options["dest"],
+                options["filename"],
+                options={"image-range": ",".join(str(position) for position in positions)}
+            )
+            retried = {item["position"]: item for item in process["items"] if item["source"] == source}
+            for item in items:
+                result = retried.get(item["position"])
+                if item["source"] == source and item["status"] == "failed" and result:
+                    item.update(path=result["path"], status=result["status"], size=result["size"], archive_key=result.get("archive_key"))
+        
+        fields = gallery_manifest_fields(items)
+        # Only the newly fetched items need hashing; earlier ones keep their blobs and counts
+        new_paths = [item["path"] for item in items if item["status"] in ("completed", "skipped") and "sha256" not in item]
+        content = await store_download_content(download_id, new_paths, items)
+        fields.update(
+            content_hashes=list(dict.fromkeys(item["sha256"] for item in items if item.get("sha256"))),
+            duplicate_files=download.get("duplicate_files", 0) + content["duplicate_files"],
+            duplicate_bytes=download.get("duplicate_bytes", 0) + content["duplicate_bytes"],
+            duplicate_of=list(dict.fromkeys(download.get("duplicate_of", []) + content["duplicate_of"]))
+        )
+        fields.setdefault("error_message", None)
+        await update_download(download_id, {"status": "completed", **fields})
+    
+    except Exception as e:
+        # The stored manifest keeps each item's previous status, so another retry picks up where this one stopped
+        await update_download(download_id, {
+            "status": "failed",
+            "error_message": f"Retrying failed items did not finish: {str(e)}"
+        })
+        logging.error(f"Gallery item retry failed for {download_id}: {str(e)}")
+
 async def download_spotify_task(download_id: str, url: str, quality: str):
     """Handle Spotify downloads (limited to previews due to DRM)"""
     try:
-        await db.downloads.update_one(
-            {"id": download_id},
-            {"$set": {"status": "downloading", "progress": 10.0}}
-        )
+        await update_download(download_id, {"status": "downloading", "progress": 10.0})
         
         # Note: Spotify has DRM protection, only previews can be downloaded
-        await db.downloads.update_one(
-            {"id": download_id},
-            {
-                "$set": {
-                    "status": "failed",
-                    "error_message": "Spotify downloads are not supported due to DRM protection. Only preview clips (30 seconds) are available without subscription."
-                }
-            }
-        )
+        await update_download(download_id, {
+            "status": "failed",
+            "error_message": "Spotify downloads are not supported due to DRM protection. Only preview clips (30 seconds) are available without subscription."
+        })
         
     except Exception as e:
-        await db.downloads.update_one(
-            {"id": download_id},
-            {
-                "$set": {
-                    "status": "failed",
-                    "error_message": str(e)
-                }
+        await update_download(download_id, {
+            "status": "failed",
+            "error_message": str(e)
+        })
+        logging.error(f"Spotify download failed for {download_id}: {str(e)}")
+
+GALLERY_PLATFORMS = ['nhentai', 'luscious', 'nutaku', 'cosplaytele', 'imhentai']
+
+# Concurrency groups by downloader; every other platform is in the "other" group
+PLATFORM_GROUPS = {
+    'youtube': ['youtube', 'pornhub', 'redtube'],
+    'instagram': ['instagram'],
+    'reddit': ['reddit'],
+    'gallery': GALLERY_PLATFORMS
+}
+
+def get_platform_group(platform: str) -> str:
+    """Map a platform to the concurrency group its downloader belongs to"""
+    for group, platforms in PLATFORM_GROUPS.items():
+        if platform in platforms:
+            return group
+    return 'other'
+
+# Failures that another attempt cannot fix; anything else is retried
+PERMANENT_ERROR_PATTERN = re.compile(
+    r"\bDRM\b|\b(400|401|403|404|410|451)\b|not found|unsupported|not supported|private|"
+    r"video unavailable|no (media )?files found|copyright|sign in to confirm",
+    re.IGNORECASE
+)
+# Checked first, so that e.g. "503 Service Unavailable" or a timeout on a 404 page is still retried
+RETRYABLE_ERROR_PATTERN = re.compile(
+    r"\b(429|5\d\d)\b|timed? ?out|temporar|connection (reset|refused|aborted)|rate limit|incomplete ?read|network",
+    re.IGNORECASE
+)
+
+def is_retryable_error(message: Optional[str]) -> bool:
+    if not message:
+        return True
+    if RETRYABLE_ERROR_PATTERN.search(message):
+        return True
+    return not PERMANENT_ERROR_PATTERN.search(message)
+
+def retry_delay(retry_count: int) -> float:
+    """Exponential backoff with equal jitter: between half and all of the capped delay"""
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** retry_count)
+    return random.uniform(delay / 2, delay)
+
+class CircuitBreakers:
+    """Per-platform breakers: open after consecutive retryable failures, then let one probe through after a cool-down"""
+
+    def __init__(self, threshold: int, reset_timeout: float, max_reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.breakers = {}  # platform -> state dict
+
+    def _breaker(self, platform: str) -> dict:
+        return self.breakers.setdefault(platform, {
+            "state": "closed",
+            "failures": 0,
+            "reset_timeout": self.reset_timeout,
+            "opened_until": 0.0,
+            "probing": False,
+            "trips": 0
+        })
+
+    def retry_in(self, platform: str) -> Optional[float]:
+        """Seconds until the platform accepts a job again; 0 while a probe is running, None when it is available"""
+        breaker = self.breakers.get(platform)
+        if breaker is None or breaker["state"] == "closed":
+            return None
+        if breaker["probing"]:
+            return 0.0
+        remaining = breaker["opened_until"] - time.monotonic()
+        return remaining if remaining > 0 else None
+
+    def allow(self, platform: str) -> bool:
+        """Whether a job may start now; after the cool-down the first job becomes the half-open probe"""
+        if self.retry_in(platform) is not None:
+            return False
+        breaker = self.breakers.get(platform)
+        if breaker is not None and breaker["state"] != "closed":
+            breaker["state"] = "half_open"
+            breaker["probing"] = True
+        return True
+
+    def blocked_platforms(self) -> List[str]:
+        return [platform for platform in self.breakers if self.retry_in(platform) is not None]
+
+    def record_success(self, platform: str):
+        breaker = self._breaker(platform)
+        breaker.update(state="closed", failures=0, reset_timeout=self.reset_timeout, probing=False)
+
+    def record_failure(self, platform: str):
+        breaker = self._breaker(platform)
+        breaker["failures"] += 1
+        if breaker["state"] == "half_open":
+            # The probe failed: stay open, and wait longer before the next one
+            breaker["reset_timeout"] = min(self.max_reset_timeout, breaker["reset_timeout"] * 2)
+        elif breaker["state"] == "closed" and breaker["failures"] >= self.threshold:
+            breaker["trips"] += 1
+        else:
+            return
+        breaker.update(state="open", opened_until=time.monotonic() + breaker["reset_timeout"], probing=False)
+        logging.error(f"Circuit breaker opened for {platform} for {breaker['reset_timeout']:.0f}s after {breaker['failures']} failures")
+
+    def record_neutral(self, platform: str):
+        """A job ended without telling anything about the platform (cancelled, deleted, permanent error)"""
+        breaker = self.breakers.get(platform)
+        if breaker is not None and breaker["probing"]:
+            breaker.update(state="open", probing=False, opened_until=0.0)
+
+    def snapshot(self) -> dict:
+        return {
+            platform: {
+                "state": breaker["state"],
+                "failures": breaker["failures"],
+                "trips": breaker["trips"],
+                "retry_in": round(self.retry_in(platform) or 0.0, 1)
             }
+            for platform, breaker in self.breakers.items()
+        }
+
+circuit_breakers = CircuitBreakers(CIRCUIT_BREAKER_THRESHOLD, CIRCUIT_BREAKER_RESET_TIMEOUT, CIRCUIT_BREAKER_MAX_RESET_TIMEOUT)
+
+async def settle_download(download_id: str, platform: str) -> Optional[float]:
+    """Report a finished job to its platform's breaker; returns the backoff delay when a retry was scheduled"""
+    download = await db.downloads.find_one({"id": download_id}, {"_id": 0, "status": 1, "error_message": 1, "retry_count": 1})
+    if download is None or download["status"] in ("completed", "skipped"):
+        if download is None:
+            circuit_breakers.record_neutral(platform)
+        else:
+            circuit_breakers.record_success(platform)
+        return None
+    if download["status"] != "failed" or not is_retryable_error(download.get("error_message")):
+        circuit_breakers.record_neutral(platform)
+        return None
+    
+    circuit_breakers.record_failure(platform)
+    retry_count = download.get("retry_count") or 0
+    if retry_count >= DOWNLOAD_MAX_RETRIES:
+        return None
+    
+    delay = retry_delay(retry_count)
+    await update_download(download_id, {
+        "status": "retrying",
+        "retry_count": retry_count + 1,
+        "next_retry_at": datetime.utcnow() + timedelta(seconds=delay)
+    })
+    await download_stats.record_retry(platform)
+    return delay
+
+class JobKeys:
+    """Job keys of the in-flight downloads, so that an identical request attaches to the running one"""
+
+    def __init__(self):
+        self.job_keys = {}  # job key -> download_id of the queued or running job
+        self.key_by_download = {}
+        self.coalesced = 0
+
+    def claim(self, key: tuple, download_id: str) -> Optional[str]:
+        """Reserve a job key for download_id, or return the in-flight download already holding it"""
+        existing = self.job_keys.get(key)
+        if existing is not None:
+            self.coalesced += 1
+            return existing
+        self.job_keys[key] = download_id
+        self.key_by_download[download_id] = key
+        return None
+
+    def release(self, download_id: str):
+        key = self.key_by_download.pop(download_id, None)
+        if key is not None and self.job_keys.get(key) == download_id:
+            del self.job_keys[key]
+
+class DownloadScheduler(JobKeys):
+    """FIFO download queue with a global and per-platform concurrency cap"""
+
+    def __init__(self, max_concurrent: int, platform_limits: dict):
+        super().__init__()
+        self.max_concurrent = max_concurrent
+        self.platform_limits = platform_limits
+        self.queue = []  # (download_id, group, platform, job_factory) in submission order
+        self.running = {}  # download_id -> (group, asyncio.Task)
+        self.running_per_group = {}
+        self.recovered = 0
+        self.retrying = {}  # download_id -> asyncio.Task waiting out the backoff
+        self.wakeup = None  # timer re-running dispatch when a circuit breaker's cool-down ends
+
+    async def submit(self, download_id: str, platform: str, job_factory):
+        """Queue a download; job_factory is called to create the coroutine once a slot frees up"""
+        group = get_platform_group(platform)
+        # retry_in is 0.0 while a half-open probe runs, which still rejects; only None means available
+        retry_in = circuit_breakers.retry_in(platform)
+        if CIRCUIT_BREAKER_MODE == "fail" and retry_in is not None:
+            self.release(download_id)
+            reason = f"retry in {retry_in:.0f}s" if retry_in > 0 else "a probe download is checking whether it is back"
+            await update_download(download_id, {
+                "status": "failed",
+                "error_message": f"{platform} is temporarily unavailable (circuit breaker open), {reason}"
+            })
+            return
+        self.queue.append((download_id, group, platform, job_factory))
+
+        await update_download(download_id, {"status": "queued"})
+
+        self._dispatch()
+        if download_id not in self.running:
+            self._publish_queue()
+
+    def cancel(self, download_id: str) -> bool:
+        """Drop a queued download or cancel a running one"""
+        if download_id in self.retrying:
+            self.retrying.pop(download_id).cancel()
+            self.release(download_id)
+            return True
+
+        for index, (queued_id, _, _, _) in enumerate(self.queue):
+            if queued_id == download_id:
+                del self.queue[index]
+                self.release(download_id)
+                self._publish_queue()
+                return True
+
+        if download_id in self.running:
+            self.running[download_id][1].cancel()
+            return True
+
+        return False
+
+    async def cancel_and_wait(self, download_id: str) -> bool:
+        """Cancel a download and wait until its job, download thread included, has stopped"""
+        task = self.running[download_id][1] if download_id in self.running else None
+        cancelled = self.cancel(download_id)
+        if task is not None:
+            await asyncio.wait({task})
+        return cancelled
+
+    def queue_positions(self) -> dict:
+        """Return the 1-based queue position of every waiting download"""
+        return {download_id: position for position, (download_id, _, _, _) in enumerate(self.queue, start=1)}
+
+    def queue_position(self, download_id: str) -> Optional[int]:
+        return self.queue_positions().get(download_id)
+
+    def snapshot(self) -> dict:
+        """Current load of the scheduler, per platform group"""
+        groups = {}
+        for group, limit in self.platform_limits.items():
+            groups[group] = {"limit": limit, "running": 0, "queued": 0}
+
+        for group, _ in self.running.values():
+            groups.setdefault(group, {"limit": None, "running": 0, "queued": 0})["running"] += 1
+        for _, group, _, _ in self.queue:
+            groups.setdefault(group, {"limit": None, "running": 0, "queued": 0})["queued"] += 1
+
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": len(self.running),
+            "queued": len(self.queue),
+            "retrying": len(self.retrying),
+            "coalesced": self.coalesced,
+            "recovered": self.recovered,
+            "platforms": groups
+        }
+
+    def _has_capacity(self, group: str) -> bool:
+        if len(self.running) >= self.max_concurrent:
+            return False
+        limit = self.platform_limits.get(group)
+        return limit is None or self.running_per_group.get(group, 0) < limit
+
+    def _dispatch(self):
+        """Start queued downloads while there is capacity, skipping groups that are full"""
+        index = 0
+        started = False
+        while index < len(self.queue) and len(self.running) < self.max_concurrent:
+            download_id, group, platform, job_factory = self.queue[index]
+            if not self._has_capacity(group):
+                index += 1
+                continue
+            if not circuit_breakers.allow(platform):
+                # Deferred while the platform is down; the probe finishing or the cool-down ending dispatches again
+                self._wake_after(circuit_breakers.retry_in(platform))
+                index += 1
+                continue
+
+            del self.queue[index]
+            self.running_per_group[group] = self.running_per_group.get(group, 0) + 1
+            task = asyncio.create_task(self._run(download_id, group, platform, job_factory))
+            self.running[download_id] = (group, task)
+            started = True
+
+        if started:
+            self._publish_queue()
+
+    def _wake_after(self, delay: Optional[float]):
+        if delay is None or delay <= 0:
+            # No cool-down left: a running probe dispatches again when it finishes
+            return
+        when = asyncio.get_running_loop().time() + delay
+        if self.wakeup is None or self.wakeup.when() > when:
+            if self.wakeup is not None:
+                self.wakeup.cancel()
+            self.wakeup = asyncio.get_running_loop().call_at(when, self._wake)
+
+    def _wake(self):
+        self.wakeup = None
+        self._dispatch()
+
+    def _publish_queue(self):
+        event_broker.publish({"type": "queue", "positions": self.queue_positions()})
+
+    def schedule_retry(self, download_id: str, platform: str, job_factory, delay: float):
+        """Queue the download again once its backoff delay has passed"""
+        self.retrying[download_id] = asyncio.create_task(self._retry_later(download_id, platform, job_factory, delay))
+
+    async def _retry_later(self, download_id: str, platform: str, job_factory, delay: float):
+        await asyncio.sleep(delay)
+        self.retrying.pop(download_id, None)
+        try:
+            await self.submit(download_id, platform, job_factory)
+        except Exception as e:
+            self.release(download_id)
+            logging.error(f"Failed to requeue download {download_id} for retry: {str(e)}")
+
+    async def _run(self, download_id: str, group: str, platform: str, job_factory):
+        try:
+            await job_factory()
+        except asyncio.CancelledError:
+            logging.info(f"Download {download_id} cancelled")
+        except Exception as e:
+            logging.error(f"Scheduled download {download_id} crashed: {str(e)}")
+        finally:
+            progress_aggregator.finish(download_id)
+            self.running.pop(download_id, None)
+            self.running_per_group[group] -= 1
+            try:
+                delay = await settle_download(download_id, platform)
+            except Exception as e:
+                logging.error(f"Failed to settle download {download_id}: {str(e)}")
+                delay = None
+            if delay is None:
+                self.release(download_id)
+            else:
+                # The job key stays claimed, so resubmitting the same URL attaches to the pending retry
+                self.schedule_retry(download_id, platform, job_factory, delay)
+            self._dispatch()
+
+# Downloads in these states were interrupted if no task owns them when the backend starts
+RECOVERABLE_STATUSES = ["pending", "queued", "downloading", "retrying"]
+
+class RemoteDownloadQueue(JobKeys):
+    """Scheduler used in remote mode: queued records are claimed and run by worker.py processes"""
+
+    def __init__(self):
+        super().__init__()
+        self.running = {}
+        self.recovered = 0
+
+    async def track(self, active: dict):
+        """Follow the active records polled by the event relay: workers finish jobs without telling this node"""
+        for download_id in list(self.key_by_download):
+            if download_id not in active:
+                self.release(download_id)
+        
+        # Downloads created before this node started, or released while their record was being inserted
+        untracked = [download_id for download_id in active if download_id not in self.key_by_download]
+        if untracked:
+            async for download in db.downloads.find(
+                {"id": {"$in": untracked}, "gallery_options": None},
+                {"_id": 0, "id": 1, "url": 1, "platform": 1, "quality": 1, "audio_only": 1, "output_format": 1}
+            ):
+                key = media_job_key(
+                    download["url"],
+                    download.get("platform", "auto"),
+                    download.get("quality", "best"),
+                    download.get("audio_only", False),
+                    download.get("output_format", "mp4")
+                )
+                if self.job_keys.get(key) is None:
+                    self.job_keys[key] = download["id"]
+                    self.key_by_download[download["id"]] = key
+
+    async def submit(self, download_id: str, platform: str, job_factory):
+        await update_download(download_id, {"status": "queued"})
+
+    def cancel(self, download_id: str) -> bool:
+        # The worker holding the download gives it up once its lease heartbeat no longer finds the record
+        return False
+
+    async def cancel_and_wait(self, download_id: str) -> bool:
+        """Flag the download as cancelled and wait until the worker holding it has released its lease"""
+        result = await db.downloads.update_one({"id": download_id}, {"$set": {"cancel_requested": True}})
+        while True:
+            download = await db.downloads.find_one({"id": download_id}, {"_id": 0, "lease_owner": 1, "lease_expires_at": 1})
+            # An expired lease means the worker died; nothing is writing any more
+            if not download or not download.get("lease_owner") or download["lease_expires_at"] <= datetime.utcnow():
+                return result.matched_count > 0
+            await asyncio.sleep(0.5)
+
+    def queue_positions(self) -> dict:
+        return {}
+
+    def queue_position(self, download_id: str) -> Optional[int]:
+        return None
+
+    def snapshot(self) -> dict:
+        return {"mode": "remote", "recovered": self.recovered}
+
+class WorkerEventRelay:
+    """Publish the changes that remote workers write to MongoDB as events for this API node"""
+
+    def __init__(self, interval_ms: int):
+        self.interval = interval_ms / 1000
+        self.active = {}  # download_id -> last published status fields
+        self.task = None
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def poll(self):
+        active = {}
+        async for download in db.downloads.find({"status": {"$in": RECOVERABLE_STATUSES}}, DOWNLOAD_STATUS_PROJECTION):
+            active[download["id"]] = download
+        
+        # Records that left the active set finished, failed or were deleted since the last poll
+        finished = [download_id for download_id in self.active if download_id not in active]
+        if finished:
+            async for download in db.downloads.find({"id": {"$in": finished}}, DOWNLOAD_STATUS_PROJECTION):
+                event_broker.publish({"type": "updated", **download})
+        
+        for download_id, download in active.items():
+            if self.active.get(download_id) != download:
+                event_broker.publish({"type": "updated", **download})
+        self.active = active
+        await download_scheduler.track(active)
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.poll()
+            except Exception as e:
+                logging.error(f"Failed to relay worker progress: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+if DOWNLOAD_MODE == "remote":
+    download_scheduler = RemoteDownloadQueue()
+else:
+    download_scheduler = DownloadScheduler(MAX_CONCURRENT_DOWNLOADS, PLATFORM_CONCURRENCY_LIMITS)
+
+worker_event_relay = WorkerEventRelay(PROGRESS_FLUSH_INTERVAL_MS)
+
+@app.on_event("startup")
+async def start_worker_event_relay():
+    if DOWNLOAD_MODE == "remote":
+        worker_event_relay.start()
+
+@app.on_event("shutdown")
+async def stop_worker_event_relay():
+    await worker_event_relay.stop()
+
+# Remote mode needs one download folder shared by every node: the API node serves, exports and
+# deletes the files that workers write, by the paths stored in their records
+SHARED_VOLUME_MARKER = os.path.join(DOWNLOAD_BASE_DIR, '.shared-volume')
+
+@app.on_event("startup")
+async def publish_shared_volume():
+    """Tag the download folder with a fresh token that workers must find at the same path"""
+    if DOWNLOAD_MODE != "remote":
+        return
+    token = uuid.uuid4().hex
+    
+    def write_marker():
+        with open(SHARED_VOLUME_MARKER, 'w', encoding='utf-8') as f:
+            f.write(token)
+    
+    try:
+        await asyncio.to_thread(write_marker)
+        await db.nodes.replace_one(
+            {"_id": "api"},
+            {"_id": "api", "download_dir": DOWNLOAD_BASE_DIR, "volume_token": token, "started_at": datetime.utcnow()},
+            upsert=True
         )
-        logging.error(f"Spotify download failed for {download_id}: {str(e)}")
+    except Exception as e:
+        logging.error(f"Failed to publish the shared download volume: {str(e)}")
+
+async def check_shared_volume() -> Optional[str]:
+    """Why this node does not share the API node's download folder, or None when it does"""
+    api = await db.nodes.find_one({"_id": "api"})
+    if api is None:
+        return "no API node running with DOWNLOAD_MODE=remote has published its download folder yet"
+    if api["download_dir"] != DOWNLOAD_BASE_DIR:
+        return f"DOWNLOAD_BASE_DIR is {DOWNLOAD_BASE_DIR!r} here but {api['download_dir']!r} on the API node"
+    
+    def read_marker():
+        with open(SHARED_VOLUME_MARKER, 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    
+    try:
+        token = await asyncio.to_thread(read_marker)
+    except FileNotFoundError:
+        token = None
+    if token != api["volume_token"]:
+        return f"{DOWNLOAD_BASE_DIR} is not the volume the API node serves files from; mount the same shared volume on every node"
+    return None
+
+def download_job_factory(download: dict):
+    """Build the job of a download from its stored record"""
+    if download.get("gallery_options"):
+        # Only finished galleries have gallery_options, so an unfinished one is retrying its failed items
+        return functools.partial(retry_gallery_items_task, download["id"])
+    return functools.partial(
+        download_media_task,
+        download["id"],
+        download["url"],
+        download.get("quality", "best"),
+        download.get("audio_only", False),
+        download.get("output_format", "mp4"),
+        download.get("platform", "auto")
+    )
+
+@app.on_event("startup")
+async def recover_downloads():
+    """Requeue the downloads left pending or running by the previous process, oldest first"""
+    # Workers take over queued and running downloads themselves once their lease expires
+    statuses = ["pending"] if DOWNLOAD_MODE == "remote" else RECOVERABLE_STATUSES
+    try:
+        cursor = db.downloads.find(
+            {"status": {"$in": statuses}},
+            {"_id": 0, "items": 0, "files": 0}
+        ).sort([("created_at", ASCENDING), ("id", ASCENDING)])
+        async for download in cursor:
+            if download["id"] in download_scheduler.running or download_scheduler.queue_position(download["id"]):
+                continue
+            if not download.get("gallery_options"):
+                download_scheduler.claim(
+                    media_job_key(
+                        download["url"],
+                        download.get("platform", "auto"),
+                        download.get("quality", "best"),
+                        download.get("audio_only", False),
+                        download.get("output_format", "mp4")
+                    ),
+                    download["id"]
+                )
+            download_scheduler.recovered += 1
+            if download["status"] == "retrying" and download.get("next_retry_at"):
+                # Keep waiting out the backoff that was running when the process stopped
+                delay = (download["next_retry_at"] - datetime.utcnow()).total_seconds()
+                if delay > 0:
+                    download_scheduler.schedule_retry(download["id"], download.get("platform", "unknown"), download_job_factory(download), delay)
+                    continue
+            # yt-dlp and gallery-dl pick up the .part files of the interrupted run
+            await download_scheduler.submit(download["id"], download.get("platform", "unknown"), download_job_factory(download))
+    except Exception as e:
+        logging.error(f"Failed to recover interrupted downloads: {str(e)}")
+    
+    if download_scheduler.recovered:
+        logging.info(f"Requeued {download_scheduler.recovered} interrupted downloads")
+
+@app.get("/api/events")
+async def stream_events(request: Request):
+    """Stream download state transitions, progress and queue changes as server-sent events"""
+    async def event_stream():
+        queue = event_broker.subscribe()
+        try:
+            # Clients load the current list on open, then apply events on top of it
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    data = await asyncio.wait_for(queue.get(), EVENT_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {data}\n\n"
+        finally:
+            event_broker.unsubscribe(queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/api/health")
 async def health_check():
@@ -974,10 +3445,10 @@ async def health_check():
 @app.post("/api/media/info")
 async def get_media_information(request: DownloadRequest):
     """Get media information from any supported platform"""
-    return get_media_info(request.url)
+    return await media_info_cache.get(request.url)
 
 @app.post("/api/media/download")
-async def start_media_download(request: DownloadRequest, background_tasks: BackgroundTasks):
+async def start_media_download(request: DownloadRequest):
     """Start media download process for any supported platform"""
     download_id = str(uuid.uuid4())
     
@@ -988,6 +3459,22 @@ async def start_media_download(request: DownloadRequest, background_tasks: Backg
     if platform == 'unknown':
         raise HTTPException(status_code=400, detail="Unsupported platform or invalid URL")
     
+    # Attach to an identical download that is still queued or running instead of fetching twice
+    in_flight_id = download_scheduler.claim(
+        media_job_key(request.url, platform, request.quality, request.audio_only, request.output_format),
+        download_id
+    )
+    if in_flight_id is not None:
+        # Report the stored status: the download may also be pending, waiting out a retry backoff, etc.
+        in_flight = await db.downloads.find_one({"id": in_flight_id}, {"_id": 0, "status": 1})
+        return {
+            "download_id": in_flight_id,
+            "status": in_flight["status"] if in_flight else "pending",
+            "platform": platform,
+            "queue_position": download_scheduler.queue_position(in_flight_id),
+            "coalesced": True
+        }
+    
     # Create download record
     download_record = {
         "id": download_id,
@@ -1001,20 +3488,21 @@ async def start_media_download(request: DownloadRequest, background_tasks: Backg
         "platform": platform
     }
     
-    await db.downloads.insert_one(download_record)
+    try:
+        await create_download(download_record)
+    except Exception:
+        download_scheduler.release(download_id)
+        raise
     
-    # Start background download with new universal function
-    background_tasks.add_task(
-        download_media_task,
-        download_id,
-        request.url,
-        request.quality,
-        request.audio_only,
-        request.output_format,
-        request.platform
-    )
+    # Queue the download; the record holds everything needed to run it again after a restart
+    await download_scheduler.submit(download_id, platform, download_job_factory(download_record))
     
-    return {"download_id": download_id, "status": "started", "platform": platform}
+    return {
+        "download_id": download_id,
+        "status": "queued",
+        "platform": platform,
+        "queue_position": download_scheduler.queue_position(download_id)
+    }
 
 @app.get("/api/media/status/{download_id}")
 async def get_download_status(download_id: str):
@@ -1023,25 +3511,216 @@ async def get_download_status(download_id: str):
     if not download:
         raise HTTPException(status_code=404, detail="Download not found")
     
-    return DownloadStatus(**download)
+    return DownloadStatus(**download, queue_position=download_scheduler.queue_position(download_id))
+
+def encode_download_cursor(download: dict) -> str:
+    """Opaque continuation token for the (created_at, id) position of a listed download"""
+    position = json.dumps({"created_at": download["created_at"].isoformat(), "id": download["id"]})
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+def decode_download_cursor(token: str) -> dict:
+    try:
+        position = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        return {"created_at": datetime.fromisoformat(position["created_at"]), "id": str(position["id"])}
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 @app.get("/api/media/downloads")
-async def list_downloads(limit: int = 50, status: Optional[str] = None, platform: Optional[str] = None):
-    """List all downloads with optional status and platform filter"""
+async def list_downloads(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    status: Optional[str] = None,
+    platform: Optional[str] = None,
+    cursor: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    q: Optional[str] = None,
+    format: str = "json"
+):
+    """List downloads newest first, filtered and paged by an opaque cursor (X-Next-Cursor header)"""
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="Unsupported format, use 'json' or 'ndjson'")
+    
     query = {}
     if status:
         query["status"] = status
     if platform:
         query["platform"] = platform
+    if created_after or created_before:
+        query["created_at"] = {}
+        if created_after:
+            query["created_at"]["$gte"] = created_after
+        if created_before:
+            query["created_at"]["$lt"] = created_before
+    
+    conditions = [query]
+    if q:
+        pattern = {"$regex": re.escape(q), "$options": "i"}
+        conditions.append({"$or": [{"title": pattern}, {"uploader": pattern}, {"url": pattern}]})
+    if cursor:
+        # Keyset bound: strictly after the last listed record in (created_at, id) order
+        position = decode_download_cursor(cursor)
+        conditions.append({"$or": [
+            {"created_at": {"$lt": position["created_at"]}},
+            {"created_at": position["created_at"], "id": {"$lt": position["id"]}}
+        ]})
+    if len(conditions) > 1:
+        query = {"$and": conditions}
+    
+    results = db.downloads.find(query, DOWNLOAD_STATUS_PROJECTION).sort([("created_at", -1), ("id", -1)])
+    positions = download_scheduler.queue_positions()
+    
+    if format == "ndjson":
+        # Exports stream the whole match unless limited, one record per line as the cursor yields it
+        if limit:
+            results = results.limit(limit)
+        
+        async def record_lines():
+            async for download in results:
+                record = DownloadStatus(**download, queue_position=positions.get(download["id"]))
+                yield record.model_dump_json() + "\n"
+        
+        return StreamingResponse(record_lines(), media_type="application/x-ndjson")
+    
+    limit = limit or 50
+    # One extra record tells whether another page exists
+    downloads = await results.limit(limit + 1).to_list(length=limit + 1)
+    if len(downloads) > limit:
+        downloads = downloads[:limit]
+        response.headers["X-Next-Cursor"] = encode_download_cursor(downloads[-1])
     
-    cursor = db.downloads.find(query).sort("created_at", -1).limit(limit)
-    downloads = await cursor.to_list(length=limit)
+    return [DownloadStatus(**download, queue_position=positions.get(download["id"])) for download in downloads]
+
+def download_file_paths(download: dict) -> List[str]:
+    """Output files of a download: recorded paths, or the layout older records were saved with"""
+    if download.get("files"):
+        return download["files"]
+    if download.get("filepath"):
+        return [download["filepath"]]
+    if not download.get("filename"):
+        return []
+    
+    platform = download.get("platform", "unknown")
+    uploader = sanitize_filename(download.get("uploader") or "")
+    
+    if platform in ["youtube", "pornhub", "redtube"]:
+        platform_dir = os.path.join(DOWNLOAD_BASE_DIR, uploader)
+    elif platform == "instagram":
+        platform_dir = os.path.join(DOWNLOAD_BASE_DIR, "Instagram", uploader)
+    elif platform == "reddit":
+        platform_dir = os.path.join(DOWNLOAD_BASE_DIR, "Reddit", uploader)
+    elif platform in GALLERY_PLATFORMS:
+        platform_dir = os.path.join(DOWNLOAD_BASE_DIR, platform.title())
+    else:
+        platform_dir = os.path.join(DOWNLOAD_BASE_DIR, "Other", uploader)
     
-    return [DownloadStatus(**download) for download in downloads]
+    return [os.path.join(platform_dir, download["filename"])]
+
+def read_file_chunk(file, offset: int, size: int) -> bytes:
+    """Read size bytes at offset; seek + read instead of os.pread, which Windows lacks"""
+    file.seek(offset)
+    return file.read(size)
+
+class RangeFileResponse(Response):
+    """File response honouring Range and If-Range, sent zero-copy when the server offers sendfile"""
+
+    def __init__(self, path: str, request: Request, filename: str, media_type: str = "application/octet-stream"):
+        self.path = path
+        self.media_type = media_type
+        self.background = None
+        
+        stat = os.stat(path)
+        size = stat.st_size
+        etag = '"' + hashlib.md5(f"{stat.st_mtime_ns}-{size}".encode()).hexdigest() + '"'
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+        
+        if filename.isascii():
+            disposition = f'attachment; filename="{filename}"'
+        else:
+            disposition = f"attachment; filename*=utf-8''{quote(filename)}"
+        headers = {
+            "accept-ranges": "bytes",
+            "etag": etag,
+            "last-modified": last_modified,
+            "content-disposition": disposition
+        }
+        
+        self.status_code = 200
+        self.start, self.end = 0, size - 1
+        range_header = request.headers.get("range")
+        if range_header and self._if_range_matches(request.headers.get("if-range"), etag, stat.st_mtime):
+            byte_range = self._parse_range(range_header, size)
+            if byte_range is None:
+                self.status_code = 416
+                self.start, self.end = 0, -1
+                headers["content-range"] = f"bytes */{size}"
+            elif byte_range:
+                self.status_code = 206
+                self.start, self.end = byte_range
+                headers["content-range"] = f"bytes {self.start}-{self.end}/{size}"
+        headers["content-length"] = str(self.end - self.start + 1)
+        self.init_headers(headers)
+
+    @staticmethod
+    def _if_range_matches(if_range: Optional[str], etag: str, mtime: float) -> bool:
+        """A Range only applies to the representation the client already holds part of"""
+        if not if_range:
+            return True
+        if if_range.startswith(('"', 'W/')):
+            return if_range == etag
+        try:
+            return int(parsedate_to_datetime(if_range).timestamp()) >= int(mtime)
+        except (TypeError, ValueError):
+            return False
+
+    @staticmethod
+    def _parse_range(range_header: str, size: int):
+        """(start, end) for a single byte range, False to ignore the header, None if unsatisfiable"""
+        match = re.fullmatch(r"bytes=(\d*)-(\d*)", range_header.strip())
+        if not match or match.group(1) == match.group(2) == "":
+            # Malformed or multi-range requests get the whole file
+            return False
+        if match.group(1) == "":
+            suffix = int(match.group(2))
+            if suffix == 0 or size == 0:
+                return None
+            return max(size - suffix, 0), size - 1
+        start = int(match.group(1))
+        end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+        if start >= size:
+            return None
+        if end < start:
+            return False
+        return start, end
 
-@app.get("/api/media/download/{download_id}")
-async def download_file(download_id: str):
-    """Download the completed media file"""
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        count = self.end - self.start + 1
+        if scope["method"] == "HEAD" or count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        
+        with open(self.path, "rb") as file:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                # ASGI zero-copy extension: the server hands the descriptor to sendfile()
+                await send({"type": "http.response.zerocopysend", "file": file, "offset": self.start, "count": count})
+                return
+            
+            offset = self.start
+            while count > 0:
+                chunk = await asyncio.to_thread(read_file_chunk, file, offset, min(FILE_CHUNK_SIZE, count))
+                if not chunk:
+                    break
+                offset += len(chunk)
+                count -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": count > 0})
+            if count > 0:
+                # File shrank while being sent
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+@app.api_route("/api/media/download/{download_id}", methods=["GET", "HEAD"])
+async def download_file(download_id: str, request: Request):
+    """Download the completed media file, resumable through HTTP Range requests"""
     download = await db.downloads.find_one({"id": download_id})
     if not download:
         raise HTTPException(status_code=404, detail="Download not found")
@@ -1049,32 +3728,207 @@ async def download_file(download_id: str):
     if download["status"] != "completed":
         raise HTTPException(status_code=400, detail="Download not completed")
     
-    # Find the file based on platform
-    if not download.get("filename") or not download.get("uploader"):
+    paths = download_file_paths(download)
+    if not paths:
         raise HTTPException(status_code=404, detail="File information not found")
     
-    platform = download.get("platform", "unknown")
+    filepath = paths[0]
+    if not os.path.exists(filepath):
+        raise HTTPException(status_code=404, detail="File not found on disk")
     
-    if platform == "youtube":
-        platform_dir = os.path.join(DOWNLOAD_BASE_DIR, sanitize_filename(download["uploader"]))
-    elif platform == "instagram":
-        platform_dir = os.path.join(DOWNLOAD_BASE_DIR, "Instagram", sanitize_filename(download["uploader"]))
-    elif platform == "reddit":
-        platform_dir = os.path.join(DOWNLOAD_BASE_DIR, "Reddit", sanitize_filename(download["uploader"]))
-    else:
-        platform_dir = os.path.join(DOWNLOAD_BASE_DIR, "Other", sanitize_filename(download["uploader"]))
+    return RangeFileResponse(filepath, request, download.get("filename") or os.path.basename(filepath))
+
+@app.get("/api/media/download/{download_id}/items")
+async def list_download_items(download_id: str):
+    """List the per-item manifest of a gallery download"""
+    download = await db.downloads.find_one(
+        {"id": download_id},
+        {"_id": 0, "items": 1, "items_total": 1, "items_done": 1, "items_failed": 1, "files": 1, "filepath": 1}
+    )
+    if not download:
+        raise HTTPException(status_code=404, detail="Download not found")
     
-    filepath = os.path.join(platform_dir, download["filename"])
+    items = download.get("items")
+    if items is None:
+        # Single-file downloads are a one-item manifest
+        items = [
+            {"index": index, "path": path, "status": "completed", "size": os.path.getsize(path) if os.path.isfile(path) else None}
+            for index, path in enumerate(download.get("files") or ([download["filepath"]] if download.get("filepath") else []), start=1)
+        ]
     
-    if not os.path.exists(filepath):
+    return {
+        "download_id": download_id,
+        "items_total": len(items),
+        "items_done": sum(item["status"] in ("completed", "skipped") for item in items),
+        "items_failed": sum(item["status"] == "failed" for item in items),
+        "items": [
+            {
+                "index": item["index"],
+                "filename": os.path.basename(item["path"]) if item.get("path") else None,
+                "size": item.get("size"),
+                "status": item["status"]
+            }
+            for item in items
+        ]
+    }
+
+@app.api_route("/api/media/download/{download_id}/items/{index}", methods=["GET", "HEAD"])
+async def download_item_file(download_id: str, index: int, request: Request):
+    """Download one item of a gallery, resumable through HTTP Range requests"""
+    download = await db.downloads.find_one({"id": download_id}, {"_id": 0, "items": 1, "files": 1, "filepath": 1})
+    if not download:
+        raise HTTPException(status_code=404, detail="Download not found")
+    
+    if download.get("items") is not None:
+        item = next((item for item in download["items"] if item["index"] == index), None)
+        path = item["path"] if item and item["status"] in ("completed", "skipped") else None
+    else:
+        paths = download_file_paths(download)
+        path = paths[index - 1] if 0 < index <= len(paths) else None
+    
+    if not path:
+        raise HTTPException(status_code=404, detail="Item not found")
+    if not os.path.exists(path):
         raise HTTPException(status_code=404, detail="File not found on disk")
     
-    return FileResponse(
-        filepath,
-        media_type='application/octet-stream',
-        filename=download["filename"]
+    return RangeFileResponse(path, request, os.path.basename(path))
+
+@app.post("/api/media/download/{download_id}/retry")
+async def retry_download_items(download_id: str):
+    """Queue the failed items of a gallery download for another attempt"""
+    download = await db.downloads.find_one({"id": download_id}, {"_id": 0, "id": 1, "status": 1, "platform": 1, "items": 1, "gallery_options": 1})
+    if not download:
+        raise HTTPException(status_code=404, detail="Download not found")
+    
+    if not download.get("gallery_options"):
+        raise HTTPException(status_code=400, detail="Only gallery downloads can retry individual items")
+    # A retry that broke off leaves the gallery failed, with its earlier item statuses intact
+    if download["status"] not in ("completed", "failed"):
+        raise HTTPException(status_code=400, detail="Download is still in progress")
+    
+    failed = sum(item["status"] == "failed" for item in download.get("items", []))
+    if not failed:
+        raise HTTPException(status_code=400, detail="No failed items to retry")
+    
+    await download_scheduler.submit(download_id, download.get("platform", "unknown"), download_job_factory(download))
+    
+    return {
+        "download_id": download_id,
+        "status": "queued",
+        "retrying": failed,
+        "queue_position": download_scheduler.queue_position(download_id)
+    }
+
+class ArchiveStream(io.RawIOBase):
+    """Unseekable sink that collects zipfile output for the response generator to hand out"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def archive_entries(downloads: List[dict], archive_format: str) -> List[tuple]:
+    """(archive name, file path) pairs for the completed files of the given downloads"""
+    entries = []
+    used_names = set()
+    for download in downloads:
+        folder = sanitize_filename(download.get("title") or download["id"]) or download["id"]
+        for path in download_file_paths(download):
+            if not os.path.isfile(path):
+                continue
+            if archive_format == "cbz":
+                if not path.lower().endswith(CBZ_IMAGE_EXTENSIONS):
+                    continue
+                # Readers page through a CBZ in name order
+                name = f"{len(entries) + 1:05d}{os.path.splitext(path)[1].lower()}"
+            else:
+                name = f"{folder}/{os.path.basename(path)}"
+                if len(downloads) == 1:
+                    name = os.path.basename(path)
+            base, extension = os.path.splitext(name)
+            suffix = 1
+            while name in used_names:
+                suffix += 1
+                name = f"{base} ({suffix}){extension}"
+            used_names.add(name)
+            entries.append((name, path))
+    return entries
+
+def archive_response(downloads: List[dict], archive_format: str, name: str) -> StreamingResponse:
+    """Stream a ZIP/CBZ of the downloads' files, built while it is sent and never stored"""
+    if archive_format not in ("zip", "cbz"):
+        raise HTTPException(status_code=400, detail="Unsupported archive format, use 'zip' or 'cbz'")
+    
+    entries = archive_entries(downloads, archive_format)
+    if not entries:
+        raise HTTPException(status_code=404, detail="No completed files to export")
+    
+    def generate():
+        # A plain generator: the response runs it in a worker thread, so file reads never block the loop
+        stream = ArchiveStream()
+        with zipfile.ZipFile(stream, mode="w", allowZip64=True) as archive:
+            for entry_name, path in entries:
+                stat = os.stat(path)
+                info = zipfile.ZipInfo(entry_name, date_time=time.localtime(stat.st_mtime)[:6])
+                info.compress_type = zipfile.ZIP_STORED if path.lower().endswith(ARCHIVE_STORED_EXTENSIONS) else zipfile.ZIP_DEFLATED
+                info.file_size = stat.st_size  # lets zipfile pick ZIP64 headers up front for huge files
+                with open(path, "rb") as source, archive.open(info, mode="w") as target:
+                    while True:
+                        chunk = source.read(FILE_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        target.write(chunk)
+                        yield stream.drain()
+                yield stream.drain()
+        yield stream.drain()
+    
+    filename = f"{sanitize_filename(name) or 'export'}.{archive_format}"
+    return StreamingResponse(
+        generate(),
+        media_type="application/vnd.comicbook+zip" if archive_format == "cbz" else "application/zip",
+        headers={"Content-Disposition": f"attachment; filename*=utf-8''{quote(filename)}"}
     )
 
+@app.get("/api/media/download/{download_id}/archive")
+async def download_archive(download_id: str, format: str = "zip"):
+    """Stream every file of a completed download as a ZIP or CBZ archive"""
+    download = await db.downloads.find_one({"id": download_id})
+    if not download:
+        raise HTTPException(status_code=404, detail="Download not found")
+    
+    if download["status"] != "completed":
+        raise HTTPException(status_code=400, detail="Download not completed")
+    
+    return archive_response([download], format, download.get("title") or download_id)
+
+@app.post("/api/media/export")
+async def export_downloads(request: ExportRequest):
+    """Stream the files of several downloads, or of a cosplay download batch, as one archive"""
+    if request.batch_id:
+        query = {"cosplay_batch_id": request.batch_id, "status": "completed"}
+        name = f"cosplay-{request.batch_id[:8]}"
+    elif request.download_ids:
+        query = {"id": {"$in": request.download_ids}, "status": "completed"}
+        name = f"downloads-{len(request.download_ids)}"
+    else:
+        raise HTTPException(status_code=400, detail="Provide download_ids or a batch_id")
+    
+    downloads = await db.downloads.find(query).sort([("created_at", 1), ("id", 1)]).to_list(length=None)
+    if len(downloads) == 1:
+        name = downloads[0].get("title") or name
+    
+    return archive_response(downloads, request.format, name)
+
 @app.delete("/api/media/download/{download_id}")
 async def delete_download(download_id: str):
     """Delete download record and file"""
@@ -1082,29 +3936,26 @@ async def delete_download(download_id: str):
     if not download:
         raise HTTPException(status_code=404, detail="Download not found")
     
-    # Delete file if exists
-    if download.get("filename") and download.get("uploader"):
-        platform = download.get("platform", "unknown")
-        
-        if platform == "youtube":
-            platform_dir = os.path.join(DOWNLOAD_BASE_DIR, sanitize_filename(download["uploader"]))
-        elif platform == "instagram":
-            platform_dir = os.path.join(DOWNLOAD_BASE_DIR, "Instagram", sanitize_filename(download["uploader"]))
-        elif platform == "reddit":
-            platform_dir = os.path.join(DOWNLOAD_BASE_DIR, "Reddit", sanitize_filename(download["uploader"]))
-        else:
-            platform_dir = os.path.join(DOWNLOAD_BASE_DIR, "Other", sanitize_filename(download["uploader"]))
-        
-        filepath = os.path.join(platform_dir, download["filename"])
-        
+    # Stop the download if it is still queued or running, and wait for its thread so no file is written after this
+    if download["status"] in RECOVERABLE_STATUSES:
+        await download_scheduler.cancel_and_wait(download_id)
+        download = await db.downloads.find_one({"id": download_id}) or download
+    
+    # Delete the files it produced, and their blobs once nothing else links to them
+    for filepath in download_file_paths(download):
         if os.path.exists(filepath):
             try:
                 os.remove(filepath)
             except Exception as e:
                 logging.error(f"Failed to delete file {filepath}: {str(e)}")
+    for sha256 in download.get("content_hashes", []):
+        blob_store.release(sha256)
+    # Let the same items be downloaded again later
+    if fetch_archive is not None and download.get("archive_keys"):
+        await asyncio.to_thread(fetch_archive.remove, download["archive_keys"])
     
     # Delete database record
-    await db.downloads.delete_one({"id": download_id})
+    await remove_download(download_id)
     
     return {"message": "Download deleted successfully"}
 
@@ -1114,22 +3965,29 @@ async def configure_auth(auth_config: AuthConfig):
     try:
         platform = auth_config.platform.lower()
         
-        # Store auth config in memory (in production, use encrypted database)
+        # Store auth config in memory and in MongoDB for the worker nodes (in production, use encrypted database)
         auth_storage[platform] = {
             "username": auth_config.username,
             "password": auth_config.password,
             "client_id": auth_config.client_id,
             "client_secret": auth_config.client_secret,
-            "additional_data": auth_config.additional_data or {}
+            "additional_data": auth_config.additional_data or {},
+            # Lets worker nodes tell that the credentials changed without comparing them
+            "revision": uuid.uuid4().hex
         }
+        auth_revisions[platform] = auth_storage[platform]["revision"]
+        await db.auth.replace_one({"_id": platform}, auth_storage[platform], upsert=True)
         
         # Test the authentication
         test_result = {"status": "stored", "message": "Authentication stored successfully"}
         
+        if platform == "instagram":
+            # Pooled sessions belong to the previous credentials
+            instagram_sessions.reset()
+        
         if platform == "instagram" and auth_config.username and auth_config.password:
             try:
-                L = instaloader.Instaloader()
-                L.login(auth_config.username, auth_config.password)
+                await instagram_sessions.verify()
                 test_result["message"] = "Instagram authentication verified and stored"
                 test_result["status"] = "verified"
             except Exception as e:
@@ -1137,6 +3995,9 @@ async def configure_auth(auth_config: AuthConfig):
                 test_result["status"] = "stored_unverified"
         
         elif platform == "reddit" and auth_config.client_id and auth_config.client_secret:
+            # gallery-dl reads the Reddit credentials from its engine config
+            gallery_dl_engine.load_config()
+            
             try:
                 # Test Reddit API connection
                 import praw
@@ -1146,7 +4007,7 @@ async def configure_auth(auth_config: AuthConfig):
                     user_agent="MediaDownloader/1.0"
                 )
                 # Try a simple API call
-                reddit.subreddit("test").id
+                await extractor_executor.run(lambda: reddit.subreddit("test").id)
                 test_result["message"] = "Reddit authentication verified and stored"
                 test_result["status"] = "verified"
             except Exception as e:
@@ -1167,7 +4028,8 @@ async def get_auth_status():
     return {
         "instagram": {
             "configured": bool(instagram_auth.get("username") and instagram_auth.get("password")),
-            "username": instagram_auth.get("username") if instagram_auth.get("username") else None
+            "username": instagram_auth.get("username") if instagram_auth.get("username") else None,
+            "session": instagram_sessions.health()
         },
         "reddit": {
             "configured": bool(reddit_auth.get("client_id") and reddit_auth.get("client_secret")),
@@ -1186,6 +4048,12 @@ async def delete_auth(platform: str):
     platform = platform.lower()
     if platform in auth_storage:
         del auth_storage[platform]
+        auth_revisions.pop(platform, None)
+        await db.auth.delete_one({"_id": platform})
+        if platform == "reddit":
+            gallery_dl_engine.load_config()
+        elif platform == "instagram":
+            instagram_sessions.reset()
         return {"message": f"Authentication for {platform} deleted successfully"}
     else:
         raise HTTPException(status_code=404, detail=f"No authentication found for {platform}")
@@ -1194,16 +4062,19 @@ async def delete_auth(platform: str):
 async def search_cosplay(request: CosplaySearchRequest):
     """Search for cosplay galleries across platforms"""
     try:
-        results = await search_cosplay_galleries(
+        search = await search_cosplay_galleries(
             query=request.query,
             platforms=request.platforms,
             limit=request.limit
         )
         
         return {
+            "search_id": search["search_id"],
             "query": request.query,
-            "results": [result.dict() for result in results],
-            "total_found": len(results)
+            "results": [result.dict() for result in search["results"]],
+            "total_found": len(search["results"]),
+            "platforms": search["platforms"],
+            "cache": search["cache"]
         }
         
     except Exception as e:
@@ -1213,13 +4084,17 @@ async def search_cosplay(request: CosplaySearchRequest):
 async def download_cosplay(request: CosplayDownloadRequest):
     """Download selected cosplay galleries"""
     try:
+        batch_id = str(uuid.uuid4())
         downloads = await download_cosplay_galleries(
             result_ids=request.cosplay_results,
-            quality=request.quality
+            quality=request.quality,
+            search_id=request.search_id,
+            batch_id=batch_id
         )
         
         return {
             "message": f"Started downloading {len(downloads)} cosplay galleries",
+            "batch_id": batch_id,
             "downloads": downloads
         }
         
@@ -1229,20 +4104,7 @@ async def download_cosplay(request: CosplayDownloadRequest):
 @app.get("/api/cosplay/suggestions/{query}")
 async def get_cosplay_suggestions(query: str):
     """Get cosplay name suggestions"""
-    # Popular cosplay characters/series for autocomplete
-    suggestions = [
-        "Dva Overwatch", "Harley Quinn", "Chun Li", "Tifa Lockheart", 
-        "Power Chainsaw Man", "Makima", "Nezuko", "Marin Kitagawa",
-        "Ahri League of Legends", "Jinx Arcane", "Widowmaker", "Mercy",
-        "Hinata Naruto", "Sakura", "Tsunade", "Boa Hancock",
-        "Android 18", "Bulma", "Chi Chi", "Videl",
-        "Rem Re Zero", "Ram", "Emilia", "Aqua Konosuba"
-    ]
-    
-    # Filter suggestions based on query
-    filtered = [s for s in suggestions if query.lower() in s.lower()]
-    
-    return {"suggestions": filtered[:10]}
+    return {"suggestions": suggestion_index.lookup(query, 10)}
 
 @app.get("/api/platforms")
 async def get_supported_platforms():
@@ -1267,17 +4129,49 @@ async def get_supported_platforms():
 @app.get("/api/stats")
 async def get_stats():
     """Get download statistics"""
-    total_downloads = await db.downloads.count_documents({})
-    completed_downloads = await db.downloads.count_documents({"status": "completed"})
-    failed_downloads = await db.downloads.count_documents({"status": "failed"})
-    downloading = await db.downloads.count_documents({"status": "downloading"})
+    counters = await download_stats.read()
+    status_counts = counters.get("status", {})
+    total_downloads = max(counters.get("total", 0), 0)
+    completed_downloads = max(status_counts.get("completed", 0), 0)
+    failed_downloads = max(status_counts.get("failed", 0), 0)
+    downloading = max(status_counts.get("downloading", 0), 0)
+    queued = max(status_counts.get("queued", 0), 0)
+    retrying = max(status_counts.get("retrying", 0), 0)
     
     return {
         "total_downloads": total_downloads,
         "completed_downloads": completed_downloads,
         "failed_downloads": failed_downloads,
         "currently_downloading": downloading,
-        "success_rate": (completed_downloads / total_downloads * 100) if total_downloads > 0 else 0
+        "queued_downloads": queued,
+        "retrying_downloads": retrying,
+        "total_retries": max(counters.get("retries", 0), 0),
+        "success_rate": (completed_downloads / total_downloads * 100) if total_downloads > 0 else 0,
+        "platforms": {
+            platform: {status: count for status, count in platform_counts.items() if count > 0 or status == "total"}
+            for platform, platform_counts in counters.get("platforms", {}).items()
+        },
+        "scheduler": download_scheduler.snapshot(),
+        "circuit_breakers": circuit_breakers.snapshot()
+    }
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """Get internal load metrics for the download pipeline"""
+    return {
+        "scheduler": download_scheduler.snapshot(),
+        "extractor_executor": extractor_executor.snapshot(),
+        "gallery_dl_executor": gallery_dl_engine.executor.snapshot(),
+        "media_info_cache": media_info_cache.snapshot(),
+        "cosplay_search_cache": cosplay_search_cache.snapshot(),
+        "search_query_cache": search_query_cache.snapshot(),
+        "suggestion_index": suggestion_index.snapshot(),
+        "progress": progress_aggregator.snapshot(),
+        "events": event_broker.snapshot(),
+        "blob_store": blob_store.snapshot(),
+        "rate_limits": host_rate_limiter.snapshot(),
+        "circuit_breakers": circuit_breakers.snapshot(),
+        "fetch_archive": fetch_archive.snapshot() if fetch_archive is not None else None
     }
 
 if __name__ == "__main__":
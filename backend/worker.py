@@ -0,0 +1,195 @@
+from pymongo import ASCENDING, ReturnDocument
+from datetime import datetime, timedelta
+import os
+import asyncio
+import contextlib
+import logging
+import signal
+import socket
+
+from server import (
+    db,
+    MAX_CONCURRENT_DOWNLOADS,
+    PLATFORM_CONCURRENCY_LIMITS,
+    PLATFORM_GROUPS,
+    check_shared_volume,
+    circuit_breakers,
+    download_job_factory,
+    get_platform_group,
+    progress_aggregator,
+    refresh_auth_storage,
+    settle_download
+)
+
+# Worker settings
+WORKER_ID = os.environ.get('WORKER_ID', f"{socket.gethostname()}-{os.getpid()}")
+WORKER_CONCURRENCY = int(os.environ.get('WORKER_CONCURRENCY', str(MAX_CONCURRENT_DOWNLOADS)))
+WORKER_LEASE_SECONDS = float(os.environ.get('WORKER_LEASE_SECONDS', '60'))
+WORKER_POLL_INTERVAL = float(os.environ.get('WORKER_POLL_INTERVAL', '2'))
+
+class DownloadWorker:
+    """Claims queued downloads from MongoDB under a time-limited lease and runs them"""
+
+    def __init__(self, worker_id: str, concurrency: int, platform_limits: dict, lease_seconds: float, poll_interval: float):
+        self.worker_id = worker_id
+        self.concurrency = concurrency
+        self.platform_limits = platform_limits
+        self.lease = timedelta(seconds=lease_seconds)
+        self.poll_interval = poll_interval
+        self.jobs = {}  # download_id -> (group, asyncio.Task)
+        self.stopping = asyncio.Event()
+
+    def claim_filter(self) -> dict:
+        """Queued or due downloads, or running ones whose worker stopped renewing its lease, on platforms with a free slot"""
+        now = datetime.utcnow()
+        query = {
+            "status": {"$in": ["queued", "downloading", "retrying"]},
+            "cancel_requested": {"$ne": True},
+            "$and": [
+                {"$or": [{"lease_expires_at": None}, {"lease_expires_at": {"$lt": now}}]},
+                {"$or": [{"next_retry_at": None}, {"next_retry_at": {"$lte": now}}]}
+            ]
+        }
+
+        running = {}
+        for group, _ in self.jobs.values():
+            running[group] = running.get(group, 0) + 1
+        full = {group for group, limit in self.platform_limits.items() if running.get(group, 0) >= limit}
+        excluded = [platform for group in full if group in PLATFORM_GROUPS for platform in PLATFORM_GROUPS[group]]
+        # Platforms whose circuit breaker is open wait here until their cool-down ends
+        excluded += circuit_breakers.blocked_platforms()
+        if excluded:
+            query["platform"] = {"$nin": excluded}
+        return query
+
+    async def claim(self) -> dict:
+        now = datetime.utcnow()
+        return await db.downloads.find_one_and_update(
+            self.claim_filter(),
+            {
+                "$set": {"lease_owner": self.worker_id, "lease_expires_at": now + self.lease, "worker": self.worker_id},
+                "$inc": {"lease_count": 1}
+            },
+            sort=[("created_at", ASCENDING), ("id", ASCENDING)],
+            projection={"_id": 0, "items": 0, "files": 0},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def wait_for_shared_volume(self) -> bool:
+        """Hold off claiming until the download folder is the one the API node serves; False when stopped first"""
+        reported = None
+        while not self.stopping.is_set():
+            try:
+                problem = await check_shared_volume()
+            except Exception as e:
+                problem = f"shared volume check failed: {str(e)}"
+            if problem is None:
+                return True
+            if problem != reported:
+                logging.error(f"Worker {self.worker_id} is waiting for the shared download volume: {problem}")
+                reported = problem
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.stopping.wait(), self.poll_interval)
+        return False
+
+    async def run(self):
+        if not await self.wait_for_shared_volume():
+            return
+        logging.info(f"Worker {self.worker_id} started with {self.concurrency} slots")
+        while not self.stopping.is_set():
+            if len(self.jobs) >= self.concurrency:
+                stopping = asyncio.ensure_future(self.stopping.wait())
+                await asyncio.wait([stopping, *(task for _, task in self.jobs.values())], return_when=asyncio.FIRST_COMPLETED)
+                stopping.cancel()
+                continue
+
+            try:
+                # Credentials configured through the API node since the last claim apply to the next job
+                await refresh_auth_storage()
+                download = await self.claim()
+            except Exception as e:
+                logging.error(f"Worker {self.worker_id} failed to claim a download: {str(e)}")
+                download = None
+
+            if download is None:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self.stopping.wait(), self.poll_interval)
+                continue
+
+            download_id = download["id"]
+            group = get_platform_group(download.get("platform", "unknown"))
+            circuit_breakers.allow(download.get("platform", "unknown"))
+            self.jobs[download_id] = (group, asyncio.create_task(self._run(download)))
+
+        # Running downloads go back to the queue; their lease is released so another worker resumes them right away
+        for _, task in self.jobs.values():
+            task.cancel()
+        if self.jobs:
+            await asyncio.wait([task for _, task in self.jobs.values()])
+
+    def stop(self):
+        self.stopping.set()
+
+    async def _run(self, download: dict):
+        download_id = download["id"]
+        # Cancelling the job sets its download thread's cancel event; the job finishes once that thread has stopped
+        job = asyncio.create_task(download_job_factory(download)())
+        lost = False
+        try:
+            while True:
+                # Renewing often also notices a deletion from the API node quickly
+                done, _ = await asyncio.wait({job}, timeout=min(self.lease.total_seconds() / 3, self.poll_interval))
+                if done:
+                    break
+                if lost:
+                    continue
+                # Renew the lease; losing it means the record is being deleted or another worker reclaimed it
+                renewed = await db.downloads.update_one(
+                    {"id": download_id, "lease_owner": self.worker_id, "cancel_requested": {"$ne": True}},
+                    {"$set": {"lease_expires_at": datetime.utcnow() + self.lease}}
+                )
+                if renewed.matched_count == 0:
+                    logging.error(f"Worker {self.worker_id} lost the lease on download {download_id}")
+                    lost = True
+                    job.cancel()
+            await job
+        except asyncio.CancelledError:
+            job.cancel()
+            # Keep the lease until the download thread has stopped writing, so no other worker resumes it meanwhile
+            await asyncio.wait({job})
+            logging.info(f"Download {download_id} released by worker {self.worker_id}")
+        except Exception as e:
+            logging.error(f"Download {download_id} crashed on worker {self.worker_id}: {str(e)}")
+        finally:
+            progress_aggregator.finish(download_id)
+            self.jobs.pop(download_id, None)
+            try:
+                # A retryable failure goes back to "retrying" with next_retry_at; any worker claims it when due
+                await settle_download(download_id, download.get("platform", "unknown"))
+                await db.downloads.update_one(
+                    {"id": download_id, "lease_owner": self.worker_id},
+                    {"$unset": {"lease_owner": "", "lease_expires_at": ""}}
+                )
+            except Exception as e:
+                logging.error(f"Failed to settle download {download_id} and release its lease: {str(e)}")
+
+async def main():
+    logging.basicConfig(level=logging.INFO)
+    worker = DownloadWorker(WORKER_ID, WORKER_CONCURRENCY, PLATFORM_CONCURRENCY_LIMITS, WORKER_LEASE_SECONDS, WORKER_POLL_INTERVAL)
+
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, worker.stop)
+        except NotImplementedError:
+            # Windows has no loop signal handlers; Ctrl+C still interrupts the process
+            pass
+
+    progress_aggregator.start()
+    try:
+        await worker.run()
+    finally:
+        await progress_aggregator.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,6 +4,7 @@ import time
 import os
 import json
 from typing import Dict, Any, Optional
+from pymongo import MongoClient
 
 # Get the backend URL from the frontend .env file
 with open('/app/frontend/.env', 'r') as f:
@@ -12,6 +13,9 @@ with open('/app/frontend/.env', 'r') as f:
             BACKEND_URL = line.strip().split('=')[1].strip('"\'')
             break
 
+# MongoDB used by the backend, for checking query plans directly
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+
 # Test URLs for different platforms
 TEST_YOUTUBE_URL = "https://youtu.be/jNQXAC9IVRw"  # First YouTube video
 TEST_INSTAGRAM_URL = "https://www.instagram.com/p/CuM7GMPMnMe/"  # Sample Instagram post
@@ -35,7 +39,8 @@ class MediaDownloaderTest:
             "downloads_list": {"status": "Not tested", "details": ""},
             "platform_filter": {"status": "Not tested", "details": ""},
             "supported_platforms": {"status": "Not tested", "details": ""},
-            "stats": {"status": "Not tested", "details": ""}
+            "stats": {"status": "Not tested", "details": ""},
+            "index_usage": {"status": "Not tested", "details": ""}
         }
     
     def run_all_tests(self):
@@ -52,6 +57,7 @@ class MediaDownloaderTest:
         self.test_downloads_list()
         self.test_supported_platforms()
         self.test_stats()
+        self.test_index_usage()
         
         # Print summary
         self.print_summary()
@@ -276,7 +282,7 @@ class MediaDownloaderTest:
             if response.status_code == 200:
                 data = response.json()
                 
-                if data.get("download_id") and data.get("status") == "started" and data.get("platform") == "youtube":
+                if data.get("download_id") and data.get("status") == "queued" and data.get("platform") == "youtube":
                     self.download_ids["youtube"] = data["download_id"]
                     self.results["youtube_download"] = {
                         "status": "Passed",
@@ -317,7 +323,7 @@ class MediaDownloaderTest:
             if response.status_code == 200:
                 data = response.json()
                 
-                if data.get("download_id") and data.get("status") == "started" and data.get("platform") == "instagram":
+                if data.get("download_id") and data.get("status") == "queued" and data.get("platform") == "instagram":
                     self.download_ids["instagram"] = data["download_id"]
                     self.results["instagram_download"] = {
                         "status": "Passed",
@@ -358,7 +364,7 @@ class MediaDownloaderTest:
             if response.status_code == 200:
                 data = response.json()
                 
-                if data.get("download_id") and data.get("status") == "started" and data.get("platform") == "reddit":
+                if data.get("download_id") and data.get("status") == "queued" and data.get("platform") == "reddit":
                     self.download_ids["reddit"] = data["download_id"]
                     self.results["reddit_download"] = {
                         "status": "Passed",
@@ -621,6 +627,53 @@ class MediaDownloaderTest:
             }
             print(f"❌ Stats endpoint failed: {str(e)}")
     
+    def test_index_usage(self):
+        """Test that the hot downloads queries are served by indexes"""
+        print("\n9. Testing downloads index usage...")
+        try:
+            downloads = MongoClient(MONGO_URL, serverSelectionTimeoutMS=5000).youtube_downloader.downloads
+            
+            def plan_stages(plan):
+                stages = [plan.get("stage")]
+                for key in ("inputStage", "queryPlan"):
+                    if key in plan:
+                        stages += plan_stages(plan[key])
+                for child in plan.get("inputStages", []):
+                    stages += plan_stages(child)
+                return stages
+            
+            queries = {
+                "lookup by id": downloads.find({"id": "index-check"}),
+                "list by status": downloads.find({"status": "completed"}).sort("created_at", -1).limit(50),
+                "list by platform": downloads.find({"platform": "youtube"}).sort("created_at", -1).limit(50),
+                "list all": downloads.find({}).sort("created_at", -1).limit(50)
+            }
+            
+            scans = []
+            for name, cursor in queries.items():
+                stages = plan_stages(cursor.explain()["queryPlanner"]["winningPlan"])
+                if "COLLSCAN" in stages or "IXSCAN" not in stages:
+                    scans.append(f"{name}: {stages}")
+            
+            if not scans:
+                self.results["index_usage"] = {
+                    "status": "Passed",
+                    "details": f"All {len(queries)} queries use an index scan"
+                }
+                print("✅ Downloads queries use indexes")
+            else:
+                self.results["index_usage"] = {
+                    "status": "Failed",
+                    "details": f"Queries not using an index: {scans}"
+                }
+                print(f"❌ Downloads index usage failed: {scans}")
+        except Exception as e:
+            self.results["index_usage"] = {
+                "status": "Failed",
+                "details": f"Index usage check failed: {str(e)}"
+            }
+            print(f"❌ Downloads index usage failed: {str(e)}")
+    
     def print_summary(self):
         """Print a summary of all test results"""
         print("\n=== TEST SUMMARY ===")
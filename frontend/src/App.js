@@ -17,6 +17,7 @@ const App = () => {
   // Cosplay search states
   const [cosplayQuery, setCosplayQuery] = useState('');
   const [cosplayResults, setCosplayResults] = useState([]);
+  const [cosplaySearchId, setCosplaySearchId] = useState(null);
   const [selectedCosplays, setSelectedCosplays] = useState([]);
   const [cosplaySuggestions, setCosplaySuggestions] = useState([]);
   const [showSuggestions, setShowSuggestions] = useState(false);
@@ -87,6 +88,7 @@ const App = () => {
       });
       
       setCosplayResults(response.data.results);
+      setCosplaySearchId(response.data.search_id);
       setShowSuggestions(false);
     } catch (error) {
       alert('Échec de recherche cosplay: ' + (error.response?.data?.detail || error.message));
@@ -116,7 +118,8 @@ const App = () => {
     try {
       const response = await axios.post(`${BACKEND_URL}/api/cosplay/download`, {
         cosplay_results: selectedCosplays,
-        quality: downloadOptions.quality
+        quality: downloadOptions.quality,
+        search_id: cosplaySearchId
       });
       
       alert(`${selectedCosplays.length} galleries de cosplay ajoutées au téléchargement !`);
@@ -210,7 +213,11 @@ const App = () => {
         ...downloadOptions
       });
       
-      alert(`Téléchargement commencé! Plateforme: ${response.data.platform}, ID: ${response.data.download_id}`);
+      if (response.data.coalesced) {
+        alert(`Ce téléchargement est déjà en cours. ID: ${response.data.download_id}`);
+      } else {
+        alert(`Téléchargement commencé! Plateforme: ${response.data.platform}, ID: ${response.data.download_id}`);
+      }
       fetchDownloads();
       setUrl('');
       setMediaInfo(null);
@@ -283,17 +290,87 @@ const App = () => {
     }
   };
 
-  // Auto-refresh downloads and stats
+  // Apply a pushed event to the downloads list
+  const applyDownloadEvent = (event) => {
+    setDownloads(prev => {
+      switch (event.type) {
+        case 'created':
+          if (prev.some(download => download.id === event.download.id)) return prev;
+          return [event.download, ...prev];
+        case 'updated':
+        case 'progress': {
+          const { type, id, ...fields } = event;
+          return prev.map(download => download.id === id ? { ...download, ...fields } : download);
+        }
+        case 'queue':
+          return prev.map(download => ({ ...download, queue_position: event.positions[download.id] || null }));
+        case 'deleted':
+          return prev.filter(download => download.id !== event.id);
+        default:
+          return prev;
+      }
+    });
+  };
+
+  // Live updates: load once, then follow the event stream (polling only while it is down)
   useEffect(() => {
     fetchDownloads();
     fetchStats();
     fetchPlatforms();
     fetchAuthStatus();
-    const interval = setInterval(() => {
+
+    let interval = null;
+    let statsTimer = null;
+    const startPolling = () => {
+      if (interval) return;
+      interval = setInterval(() => {
+        fetchDownloads();
+        fetchStats();
+      }, 5000);
+    };
+    const stopPolling = () => {
+      clearInterval(interval);
+      interval = null;
+    };
+    const refreshStatsSoon = () => {
+      if (statsTimer) return;
+      statsTimer = setTimeout(() => {
+        statsTimer = null;
+        fetchStats();
+      }, 1000);
+    };
+
+    if (!window.EventSource) {
+      startPolling();
+      return stopPolling;
+    }
+
+    const source = new EventSource(`${BACKEND_URL}/api/events`);
+    source.onopen = () => {
+      // Catch up on anything missed while disconnected
+      stopPolling();
       fetchDownloads();
       fetchStats();
-    }, 5000);
-    return () => clearInterval(interval);
+    };
+    source.onerror = startPolling;
+    source.onmessage = (message) => {
+      const event = JSON.parse(message.data);
+      if (event.type === 'resync') {
+        fetchDownloads();
+        fetchStats();
+        return;
+      }
+      applyDownloadEvent(event);
+      if (event.type !== 'progress' && event.type !== 'queue') {
+        refreshStatsSoon();
+      }
+    };
+
+    return () => {
+      source.close();
+      stopPolling();
+      clearTimeout(statsTimer);
+    };
   }, []);
 
   // Debounced suggestions
@@ -328,8 +405,11 @@ const App = () => {
   const getStatusColor = (status) => {
     switch (status) {
       case 'completed': return 'text-green-300 bg-green-900 bg-opacity-30';
+      case 'skipped': return 'text-teal-300 bg-teal-900 bg-opacity-30';
       case 'failed': return 'text-red-300 bg-red-900 bg-opacity-30';
       case 'downloading': return 'text-yellow-300 bg-yellow-900 bg-opacity-30';
+      case 'queued': return 'text-indigo-300 bg-indigo-900 bg-opacity-30';
+      case 'retrying': return 'text-orange-300 bg-orange-900 bg-opacity-30';
       case 'pending': return 'text-blue-300 bg-blue-900 bg-opacity-30';
       default: return 'text-gray-300 bg-gray-900 bg-opacity-30';
     }
@@ -338,8 +418,11 @@ const App = () => {
   const getStatusText = (status) => {
     switch (status) {
       case 'completed': return 'Terminé';
+      case 'skipped': return 'Déjà téléchargé';
       case 'failed': return 'Échec';
       case 'downloading': return 'Téléchargement';
+      case 'queued': return 'Dans la file';
+      case 'retrying': return 'Nouvelle tentative';
       case 'pending': return 'En attente';
       default: return status;
     }
@@ -905,6 +988,26 @@ const App = () => {
                             {download.progress.toFixed(1)}%
                           </span>
                         )}
+                        {download.status === 'downloading' && download.speed > 0 && (
+                          <span className="text-sm text-gray-500">
+                            {formatFileSize(download.speed)}/s
+                          </span>
+                        )}
+                        {download.status === 'downloading' && download.eta > 0 && (
+                          <span className="text-sm text-gray-500">
+                            ~{formatDuration(download.eta)}
+                          </span>
+                        )}
+                        {download.status === 'queued' && download.queue_position && (
+                          <span className="text-sm text-gray-400">
+                            #{download.queue_position}
+                          </span>
+                        )}
+                        {download.retry_count > 0 && (
+                          <span className="text-sm text-gray-400" title={download.next_retry_at && download.status === 'retrying' ? `Prochaine tentative à ${new Date(download.next_retry_at + 'Z').toLocaleTimeString()}` : undefined}>
+                            Tentative {download.retry_count + 1}
+                          </span>
+                        )}
                         {download.file_size && (
                           <span className="text-sm text-gray-500">
                             {formatFileSize(download.file_size)}
@@ -915,6 +1018,11 @@ const App = () => {
                             👘 Cosplay
                           </span>
                         )}
+                        {download.duplicate_files > 0 && (
+                          <span className="px-2 py-1 text-xs bg-gray-600 text-white rounded-full" title={`${formatFileSize(download.duplicate_bytes)} déjà stockés`}>
+                            ♻️ Doublon
+                          </span>
+                        )}
                       </div>
                       
                       <h4 className="font-medium text-white mb-1 truncate">
@@ -957,7 +1065,16 @@ const App = () => {
                           ⬇️
                         </button>
                       )}
-                      <button 
+                      {download.status === 'completed' && download.items_total > 1 && (
+                        <a
+                          href={`${BACKEND_URL}/api/media/download/${download.id}/archive`}
+                          className="px-3 py-1 btn-gradient text-white text-sm rounded transition-all duration-200 transform hover:scale-105"
+                          title="Télécharger la galerie (ZIP)"
+                        >
+                          🗜️
+                        </a>
+                      )}
+                      <button
                         onClick={() => deleteDownload(download.id)}
                         className="px-3 py-1 bg-gradient-to-r from-red-500 to-red-600 hover:from-red-600 hover:to-red-700 text-white text-sm rounded transition-all duration-200 transform hover:scale-105"
                         title="Supprimer"
@@ -0,0 +1,60 @@
+import http.server
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+# The server module reads its settings and creates its folders at import time
+TEST_DIR = tempfile.mkdtemp(prefix='media-downloader-tests-')
+os.environ.setdefault('DOWNLOAD_BASE_DIR', os.path.join(TEST_DIR, 'downloads'))
+os.environ.setdefault('INSTAGRAM_SESSION_DIR', os.path.join(TEST_DIR, 'sessions'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import server
+
+@pytest.fixture
+def db(monkeypatch):
+    """In-memory stand-in for the MongoDB database, fresh for every test"""
+    database = AsyncMongoMockClient()['media_downloader_test']
+    monkeypatch.setattr(server, 'db', database)
+    return database
+
+@pytest.fixture
+def api_client(db):
+    """Client calling the FastAPI app in-process; open it with `async with` inside the test's event loop"""
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url='http://testserver')
+
+class MediaHandler(http.server.BaseHTTPRequestHandler):
+    """Fake media host: /video.mp4 is small, /slow.mp4 is large and trickles out"""
+
+    def do_GET(self):
+        slow = self.path.startswith('/slow')
+        size = 4 * 1024 * 1024 if slow else 65536
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(size))
+        self.end_headers()
+        chunk = b'\0' * 16384
+        try:
+            for _ in range(size // len(chunk)):
+                self.wfile.write(chunk)
+                if slow:
+                    time.sleep(0.01)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def media_server():
+    """Base URL of a local HTTP server serving fake media files"""
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), MediaHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
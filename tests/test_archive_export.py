@@ -0,0 +1,56 @@
+import asyncio
+import io
+import zipfile
+from datetime import datetime
+
+def test_exports_stream_valid_zip_and_cbz_archives(db, api_client, tmp_path):
+    gallery = tmp_path / 'gallery'
+    gallery.mkdir()
+    pages = {'b.png': b'\x89PNG' + b'\1' * 5000, 'a.jpg': b'\xff\xd8' + b'\2' * 70000, 'notes.txt': b'caption ' * 2000}
+    for name, content in pages.items():
+        (gallery / name).write_bytes(content)
+    video = tmp_path / 'clip.mp4'
+    video.write_bytes(b'\0' * 300000)
+
+    async def scenario():
+        await db.downloads.insert_many([
+            {'id': 'gallery', 'title': 'Makima set', 'status': 'completed', 'created_at': datetime(2024, 1, 1),
+             'files': [str(gallery / name) for name in ('b.png', 'a.jpg', 'notes.txt')] + [str(tmp_path / 'missing.jpg')]},
+            {'id': 'video', 'title': 'Makima set', 'status': 'completed', 'created_at': datetime(2024, 1, 2), 'files': [str(video)]},
+            {'id': 'running', 'title': 'Running', 'status': 'downloading', 'created_at': datetime(2024, 1, 3), 'files': [str(video)]}
+        ])
+        async with api_client as client:
+            single = await client.get('/api/media/download/gallery/archive')
+            cbz = await client.get('/api/media/download/gallery/archive', params={'format': 'cbz'})
+            export = await client.post('/api/media/export', json={'download_ids': ['gallery', 'video', 'running']})
+            errors = [
+                (await client.get('/api/media/download/running/archive')).status_code,
+                (await client.get('/api/media/download/gallery/archive', params={'format': 'rar'})).status_code,
+                (await client.post('/api/media/export', json={'download_ids': ['running']})).status_code
+            ]
+        return single, cbz, export, errors
+
+    single, cbz, export, errors = asyncio.run(scenario())
+
+    assert single.headers['content-type'] == 'application/zip'
+    assert "filename*=utf-8''Makima%20set.zip" in single.headers['content-disposition']
+    with zipfile.ZipFile(io.BytesIO(single.content)) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == ['b.png', 'a.jpg', 'notes.txt']
+        assert archive.read('a.jpg') == pages['a.jpg']
+        # Already-compressed media is stored, everything else deflated
+        assert archive.getinfo('a.jpg').compress_type == zipfile.ZIP_STORED
+        assert archive.getinfo('notes.txt').compress_type == zipfile.ZIP_DEFLATED
+
+    # Comic readers get only the images, numbered in reading order
+    with zipfile.ZipFile(io.BytesIO(cbz.content)) as archive:
+        assert archive.namelist() == ['00001.png', '00002.jpg']
+        assert archive.read('00001.png') == pages['b.png']
+
+    # Each download gets a folder named after its title; unfinished ones are left out
+    with zipfile.ZipFile(io.BytesIO(export.content)) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == ['Makima set/b.png', 'Makima set/a.jpg', 'Makima set/notes.txt', 'Makima set/clip.mp4']
+        assert archive.read('Makima set/clip.mp4') == video.read_bytes()
+
+    assert errors == [400, 400, 404]
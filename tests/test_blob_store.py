@@ -0,0 +1,42 @@
+import asyncio
+import os
+from datetime import datetime
+
+import server
+
+def test_identical_files_share_one_blob_until_the_last_download_is_deleted(db, api_client, monkeypatch, tmp_path):
+    store = server.BlobStore(str(tmp_path / 'blobs'))
+    monkeypatch.setattr(server, 'blob_store', store)
+    content = os.urandom(200000)
+    first_path, second_path, other_path = tmp_path / 'first.mp4', tmp_path / 'second.mp4', tmp_path / 'other.mp4'
+    first_path.write_bytes(content)
+    second_path.write_bytes(content)
+    other_path.write_bytes(content[::-1])
+
+    async def scenario():
+        first = await server.store_download_content('first', [str(first_path)])
+        await db.downloads.insert_one({'id': 'first', 'status': 'completed', 'created_at': datetime.utcnow(),
+                                       'files': [str(first_path)], **first})
+        second = await server.store_download_content('second', [str(second_path), str(other_path)])
+        await db.downloads.insert_one({'id': 'second', 'status': 'completed', 'created_at': datetime.utcnow(),
+                                       'files': [str(second_path), str(other_path)], **second})
+        blob = store.blob_path(first['content_hashes'][0])
+        linked = os.path.samefile(first_path, second_path) and os.path.samefile(first_path, blob)
+
+        async with api_client as client:
+            await client.delete('/api/media/download/first')
+            after_first = os.path.exists(blob), second_path.read_bytes() == content
+            await client.delete('/api/media/download/second')
+        return first, second, linked, after_first, blob
+
+    first, second, linked, after_first, blob = asyncio.run(scenario())
+    assert first['duplicate_files'] == 0
+    assert second['duplicate_files'] == 1 and second['duplicate_bytes'] == len(content)
+    assert second['duplicate_of'] == ['first']
+    assert second['content_hashes'][0] == first['content_hashes'][0] and len(second['content_hashes']) == 2
+    assert linked
+    # The blob outlives the first download because the second still links to it
+    assert after_first == (True, True)
+    assert not os.path.exists(blob)
+    assert not os.path.exists(store.blob_path(second['content_hashes'][1]))
+    assert store.snapshot()['stored'] == 2 and store.snapshot()['bytes_saved'] == len(content)
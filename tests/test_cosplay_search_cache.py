@@ -0,0 +1,42 @@
+import time
+
+import server
+from server import CosplayResult, CosplaySearchCache
+
+def result(result_id: str) -> CosplayResult:
+    return CosplayResult(id=result_id, name=f"Gallery {result_id}", platform='reddit', url=f"https://example.com/{result_id}")
+
+def test_results_resolve_by_id_until_their_searches_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(server.time, 'monotonic', lambda: now[0])
+    cache = CosplaySearchCache(ttl=60, max_bytes=1 << 20)
+    cache.put('s1', 'makima', [result('a'), result('shared')])
+    cache.put('s2', 'power', [result('b'), result('shared')])
+
+    now[0] += 40
+    # Looking a result up through its search slides that search's TTL
+    assert cache.get_result('a', 's1').name == 'Gallery a'
+    now[0] += 30
+    assert cache.get_search('s2') is None
+    assert cache.get_result('b') is None
+    # Still referenced by the live search
+    assert cache.get_result('shared') is not None
+
+    now[0] += 60
+    assert cache.get_result('a') is None and cache.get_result('shared') is None
+    snapshot = cache.snapshot()
+    assert snapshot['searches'] == 0 and snapshot['results'] == 0 and snapshot['approx_bytes'] == 0
+    assert snapshot['expirations'] == 2
+
+def test_least_recently_used_search_is_evicted_over_the_memory_cap():
+    one_search = sum(CosplaySearchCache._estimate_size(result(f"{name}1")) for name in 'ab')
+    cache = CosplaySearchCache(ttl=60, max_bytes=2 * one_search)
+    cache.put('s1', 'one', [result('a1'), result('b1')])
+    cache.put('s2', 'two', [result('a2'), result('b2')])
+    cache.get_search('s1')
+    cache.put('s3', 'three', [result('a3'), result('b3')])
+
+    assert cache.get_search('s2') is None
+    assert cache.get_search('s1') is not None and cache.get_search('s3') is not None
+    assert cache.get_result('a2') is None
+    assert cache.snapshot()['evictions'] == 1
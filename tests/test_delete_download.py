@@ -0,0 +1,34 @@
+import asyncio
+import os
+
+import server
+
+def files_under(directory: str) -> dict:
+    sizes = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            sizes[path] = os.path.getsize(path)
+    return sizes
+
+def test_delete_waits_for_running_download(db, api_client, media_server, monkeypatch, tmp_path):
+    monkeypatch.setattr(server, 'DOWNLOAD_BASE_DIR', str(tmp_path))
+
+    async def scenario():
+        async with api_client as client:
+            started = await client.post('/api/media/download', json={'url': f'{media_server}/slow.mp4', 'platform': 'youtube'})
+            download_id = started.json()['download_id']
+            while not files_under(str(tmp_path)):
+                await asyncio.sleep(0.05)
+
+            deleted = await client.delete(f'/api/media/download/{download_id}')
+            remaining = files_under(str(tmp_path))
+            await asyncio.sleep(0.5)
+            return deleted, download_id, remaining, files_under(str(tmp_path))
+
+    deleted, download_id, remaining, later = asyncio.run(scenario())
+    assert deleted.status_code == 200
+    assert download_id not in server.download_scheduler.running
+    # The download thread stopped before the delete returned, so nothing reappears afterwards
+    assert later == remaining
+    assert asyncio.run(db.downloads.find_one({'id': download_id})) is None
@@ -0,0 +1,52 @@
+import http.server
+import os
+import threading
+
+import yt_dlp
+
+from server import ArchiveVariant, DownloadArchive, video_archive_variant
+
+class VideoHandler(http.server.BaseHTTPRequestHandler):
+    """Serves a small fake video"""
+
+    def do_GET(self):
+        body = b'\0' * 65536
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def test_archive_keeps_formats_apart(tmp_path):
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), VideoHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/video.mp4"
+    archive = DownloadArchive(str(tmp_path / 'archive.sqlite3'))
+
+    def download(quality: str, audio_only: bool, output_format: str) -> list:
+        downloaded_files = []
+        ydl_opts = {
+            'outtmpl': os.path.join(str(tmp_path), f'{quality}-{audio_only}.%(ext)s'),
+            'post_hooks': [downloaded_files.append],
+            'download_archive': ArchiveVariant(archive, video_archive_variant(quality, audio_only, output_format)),
+            'quiet': True,
+            'noprogress': True
+        }
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            ydl.extract_info(url, download=True)
+        return downloaded_files
+
+    try:
+        assert download('best', False, 'mp4')
+        # Same URL with another quality or as audio is a different download, not an archived one
+        assert download('worst', False, 'mp4')
+        assert download('best', True, 'mp4')
+        # Repeating an archived request is skipped
+        assert download('best', False, 'mp4') == []
+    finally:
+        httpd.shutdown()
+
+    assert archive.snapshot()['entries'] == 3
@@ -0,0 +1,75 @@
+import asyncio
+import http.server
+import os
+import threading
+import time
+
+import yt_dlp
+
+from server import extractor_executor, progress_aggregator
+
+VIDEO_SIZE = 4 * 1024 * 1024
+
+class SlowVideoHandler(http.server.BaseHTTPRequestHandler):
+    """Serves a large fake video in small, slow chunks so a download stays in progress"""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(VIDEO_SIZE))
+        self.end_headers()
+        chunk = b'\0' * 16384
+        try:
+            for _ in range(VIDEO_SIZE // len(chunk)):
+                self.wfile.write(chunk)
+                time.sleep(0.01)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+def part_size(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+def test_cancel_stops_download_thread(tmp_path):
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), SlowVideoHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/video.mp4"
+
+    async def scenario():
+        cancel_event = threading.Event()
+        ydl_opts = {
+            'outtmpl': os.path.join(str(tmp_path), 'video.%(ext)s'),
+            'progress_hooks': [progress_aggregator.yt_dlp_hook('cancel-test', cancel_event)],
+            'quiet': True,
+            'noprogress': True
+        }
+
+        def run_ydl():
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                ydl.extract_info(url, download=True)
+
+        task = asyncio.create_task(extractor_executor.run_cancellable(cancel_event, run_ydl))
+        while part_size(str(tmp_path)) == 0:
+            await asyncio.sleep(0.05)
+
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        # The thread has returned by the time cancellation completes, so nothing else reaches the disk
+        assert cancel_event.is_set()
+        written = part_size(str(tmp_path))
+        await asyncio.sleep(0.5)
+        return written, part_size(str(tmp_path))
+
+    try:
+        written, later = asyncio.run(scenario())
+    finally:
+        httpd.shutdown()
+        progress_aggregator.finish('cancel-test')
+
+    assert 0 < written < VIDEO_SIZE
+    assert later == written
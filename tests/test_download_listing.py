@@ -0,0 +1,38 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+def test_cursor_pages_list_every_download_once_newest_first(db, api_client):
+    start = datetime(2024, 1, 1)
+    # d2 and d3 share a timestamp, so the id breaks the tie across a page boundary
+    created = {'d0': 0, 'd1': 1, 'd2': 2, 'd3': 2, 'd4': 3, 'd5': 4, 'd6': 5}
+    expected = sorted(created, key=lambda download_id: (created[download_id], download_id), reverse=True)
+
+    async def scenario():
+        await db.downloads.insert_many([
+            {'id': download_id, 'url': f"https://example.com/{download_id}", 'status': 'completed' if minutes % 2 else 'failed',
+             'platform': 'youtube', 'progress': 100.0, 'created_at': start + timedelta(minutes=minutes)}
+            for download_id, minutes in created.items()
+        ])
+        async with api_client as client:
+            pages = []
+            params = {'limit': 3}
+            while True:
+                response = await client.get('/api/media/downloads', params=params)
+                pages.append([download['id'] for download in response.json()])
+                if 'x-next-cursor' not in response.headers:
+                    break
+                params = {'limit': 3, 'cursor': response.headers['x-next-cursor']}
+            filtered = (await client.get('/api/media/downloads', params={'status': 'failed', 'limit': 2})).json()
+            ndjson = (await client.get('/api/media/downloads', params={'format': 'ndjson'})).text
+            bounds = [(await client.get('/api/media/downloads', params={'limit': limit})).status_code for limit in (0, 501, 500)]
+            bad_cursor = (await client.get('/api/media/downloads', params={'cursor': 'not-a-cursor'})).status_code
+        return pages, filtered, ndjson, bounds, bad_cursor
+
+    pages, filtered, ndjson, bounds, bad_cursor = asyncio.run(scenario())
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert sum(pages, []) == expected
+    assert [download['id'] for download in filtered] == ['d5', 'd3']
+    assert [json.loads(line)['id'] for line in ndjson.splitlines()] == expected
+    assert bounds == [422, 422, 200]
+    assert bad_cursor == 400
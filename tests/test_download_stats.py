@@ -0,0 +1,40 @@
+import asyncio
+
+import server
+
+def counters_without_metadata(counters: dict) -> dict:
+    """Counters as compared between the incremental and rebuilt documents, zeroed entries dropped"""
+    def clean(value):
+        if isinstance(value, dict):
+            cleaned = {key: clean(item) for key, item in value.items()}
+            return {key: item for key, item in cleaned.items() if item not in (0, {})}
+        return value
+    return clean({key: value for key, value in counters.items() if key not in ('_id', 'reconciled_at')})
+
+def test_incremental_counters_match_a_reconcile(db, api_client):
+    async def scenario():
+        for number, platform in enumerate(['youtube', 'youtube', 'reddit', 'instagram']):
+            await server.create_download({'id': f"d{number}", 'platform': platform, 'status': 'pending'})
+        await server.update_download('d0', {'status': 'downloading'})
+        await server.update_download('d0', {'status': 'completed'})
+        await server.update_download('d1', {'status': 'failed', 'error_message': 'HTTP Error 503'})
+        await server.update_download('d1', {'status': 'retrying', 'retry_count': 1})
+        await server.download_stats.record_retry('youtube')
+        await server.update_download('d2', {'status': 'queued'})
+        # Progress-only updates leave the counters alone
+        await server.update_download('d2', {'progress': 50.0})
+        await server.remove_download('d3')
+
+        incremental = await db.stats.find_one({'_id': 'downloads'})
+        rebuilt = await server.download_stats.reconcile()
+        async with api_client as client:
+            stats = (await client.get('/api/stats')).json()
+        return incremental, rebuilt, stats
+
+    incremental, rebuilt, stats = asyncio.run(scenario())
+    assert counters_without_metadata(incremental) == counters_without_metadata(rebuilt)
+    assert incremental['total'] == 3 and incremental['retries'] == 1
+    assert incremental['status'] == {'pending': 0, 'downloading': 0, 'completed': 1, 'failed': 0, 'retrying': 1, 'queued': 1}
+    assert stats['total_downloads'] == 3 and stats['completed_downloads'] == 1
+    assert stats['retrying_downloads'] == 1 and stats['queued_downloads'] == 1
+    assert stats['platforms']['youtube'] == {'total': 2, 'completed': 1, 'retrying': 1, 'retries': 1}
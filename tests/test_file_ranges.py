@@ -0,0 +1,53 @@
+import asyncio
+import os
+
+import server
+
+def test_range_request_returns_partial_content(db, api_client, tmp_path):
+    content = bytes(range(256)) * 64
+    path = tmp_path / 'clip.mp4'
+    path.write_bytes(content)
+
+    async def scenario():
+        await db.downloads.insert_one({
+            'id': 'ranged',
+            'url': 'https://example.com/clip.mp4',
+            'status': 'completed',
+            'platform': 'generic',
+            'filename': 'clip.mp4',
+            'filepath': str(path),
+            'files': [str(path)]
+        })
+        async with api_client as client:
+            whole = await client.get('/api/media/download/ranged')
+            partial = await client.get('/api/media/download/ranged', headers={'Range': 'bytes=100-1123'})
+            suffix = await client.get('/api/media/download/ranged', headers={'Range': 'bytes=-10'})
+            outside = await client.get('/api/media/download/ranged', headers={'Range': f'bytes={len(content)}-'})
+        return whole, partial, suffix, outside
+
+    whole, partial, suffix, outside = asyncio.run(scenario())
+
+    assert whole.status_code == 200
+    assert whole.content == content
+    assert whole.headers['accept-ranges'] == 'bytes'
+
+    assert partial.status_code == 206
+    assert partial.content == content[100:1124]
+    assert partial.headers['content-range'] == f'bytes 100-1123/{len(content)}'
+    assert partial.headers['content-length'] == '1024'
+    assert partial.headers['etag'] == whole.headers['etag']
+
+    assert suffix.status_code == 206
+    assert suffix.content == content[-10:]
+
+    assert outside.status_code == 416
+    assert outside.headers['content-range'] == f'bytes */{len(content)}'
+
+def test_chunks_are_read_without_pread(tmp_path, monkeypatch):
+    # Windows builds have no os.pread; the fallback must not depend on it
+    monkeypatch.delattr(os, 'pread', raising=False)
+    path = tmp_path / 'data.bin'
+    path.write_bytes(b'0123456789')
+    with open(path, 'rb') as file:
+        assert server.read_file_chunk(file, 3, 4) == b'3456'
+        assert server.read_file_chunk(file, 8, 4) == b'89'
@@ -0,0 +1,45 @@
+import asyncio
+
+import server
+
+def gallery_record(download_id: str) -> dict:
+    return {
+        'id': download_id,
+        'url': 'https://example.com/gallery/1',
+        'status': 'completed',
+        'platform': 'cosplaytele',
+        'gallery_options': {'dest': 'unused', 'filename': '{num}.{extension}'},
+        'items': [
+            {'source': 'https://example.com/gallery/1', 'position': 1, 'status': 'completed', 'path': 'a.jpg'},
+            {'source': 'https://example.com/gallery/1', 'position': 2, 'status': 'failed', 'path': None}
+        ]
+    }
+
+def test_crashed_retry_is_reported_as_failed(db, monkeypatch):
+    async def broken_run(*args, **kwargs):
+        raise Exception('connection reset')
+
+    monkeypatch.setattr(server.gallery_dl_engine, 'run', broken_run)
+
+    async def scenario():
+        await db.downloads.insert_one(gallery_record('gallery'))
+        await server.retry_gallery_items_task('gallery')
+        return await db.downloads.find_one({'id': 'gallery'})
+
+    download = asyncio.run(scenario())
+    assert download['status'] == 'failed'
+    assert 'connection reset' in download['error_message']
+    # Items keep their previous statuses for the next retry
+    assert [item['status'] for item in download['items']] == ['completed', 'failed']
+
+def test_retry_of_missing_or_unmanifested_download(db):
+    async def scenario():
+        await server.retry_gallery_items_task('deleted')
+        await db.downloads.insert_one({'id': 'plain', 'url': 'https://example.com/v', 'status': 'completed', 'platform': 'youtube'})
+        await server.retry_gallery_items_task('plain')
+        return await db.downloads.find_one({'id': 'deleted'}), await db.downloads.find_one({'id': 'plain'})
+
+    deleted, plain = asyncio.run(scenario())
+    assert deleted is None
+    assert plain['status'] == 'failed'
+    assert 'manifest' in plain['error_message']
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+import time
+
+import server
+
+class FakeLoader:
+    pool_generation = 0
+
+    def close(self):
+        pass
+
+def test_pool_waits_for_loaders_on_the_event_loop(tmp_path):
+    pool = server.InstagramSessionPool(1, str(tmp_path))
+    pool._new_loader = FakeLoader
+    active = []
+    overlaps = []
+    lock = threading.Lock()
+
+    def fetch(L):
+        with lock:
+            active.append(L)
+            overlaps.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.remove(L)
+        return 'ok'
+
+    async def scenario():
+        calls = asyncio.gather(*[pool.run(fetch) for _ in range(3)])
+        await asyncio.sleep(0.01)
+        # Waiting callers hold no extractor thread
+        in_flight = server.extractor_executor.in_flight
+        return await calls, in_flight
+
+    # Each asyncio.run uses a new loop, as the server's loop differs from the one at import time
+    for _ in range(2):
+        results, in_flight = asyncio.run(scenario())
+        assert results == ['ok', 'ok', 'ok']
+        assert in_flight == 1
+    assert max(overlaps) == 1
+    assert pool.health()['idle'] == 1
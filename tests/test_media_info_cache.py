@@ -0,0 +1,54 @@
+import asyncio
+
+import server
+
+def test_concurrent_lookups_share_one_extraction(media_server, monkeypatch, tmp_path):
+    extractions = []
+    get_media_info = server.get_media_info
+
+    async def counting_get_media_info(url):
+        extractions.append(url)
+        return await get_media_info(url)
+
+    monkeypatch.setattr(server, 'get_media_info', counting_get_media_info)
+    url = f"{media_server}/video.mp4"
+
+    async def scenario():
+        cache = server.MediaInfoCache(8, 60, str(tmp_path))
+        concurrent = await asyncio.gather(*(cache.get(url) for _ in range(5)))
+        # Tracking parameters do not make a different cache entry
+        cached = await cache.get(f"{url}?utm_source=share")
+        # A fresh process finds the entry in the disk tier
+        restarted = server.MediaInfoCache(8, 60, str(tmp_path))
+        from_disk = await restarted.get(url)
+        return concurrent, cached, from_disk, cache.snapshot(), restarted.snapshot()
+
+    concurrent, cached, from_disk, snapshot, restarted = asyncio.run(scenario())
+    assert len(extractions) == 1
+    assert all(info == concurrent[0] for info in concurrent + [cached, from_disk])
+    assert snapshot['misses'] == 1 and snapshot['coalesced'] == 4 and snapshot['hits'] == 1
+    assert snapshot['in_flight'] == 0
+    assert restarted['disk_hits'] == 1 and restarted['misses'] == 0
+
+def test_failed_extraction_is_not_cached(monkeypatch):
+    calls = []
+
+    async def failing_get_media_info(url):
+        calls.append(url)
+        raise ValueError('extractor failed')
+
+    monkeypatch.setattr(server, 'get_media_info', failing_get_media_info)
+
+    async def scenario():
+        cache = server.MediaInfoCache(8, 60)
+        results = []
+        for _ in range(2):
+            try:
+                await cache.get('https://example.com/video')
+            except ValueError as e:
+                results.append(str(e))
+        return results, cache.snapshot()
+
+    results, snapshot = asyncio.run(scenario())
+    assert results == ['extractor failed', 'extractor failed']
+    assert len(calls) == 2 and snapshot['entries'] == 0
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+
+from server import ProgressAggregator
+
+def test_flush_writes_latest_progress_only_to_downloading_rows(db):
+    aggregator = ProgressAggregator(250)
+
+    def report(download_id):
+        for done in range(1, 101):
+            aggregator.record(download_id, done, downloaded_bytes=done * 1000, total_bytes=100000)
+
+    async def scenario():
+        await db.downloads.insert_many([
+            {'id': 'active', 'status': 'downloading', 'progress': 0.0},
+            {'id': 'finished', 'status': 'completed', 'progress': 100.0, 'total_bytes': 5}
+        ])
+        # Download threads report concurrently; only the latest value per download is kept
+        threads = [threading.Thread(target=report, args=(download_id,)) for download_id in ('active', 'finished')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        await aggregator.flush()
+        # Nothing changed since, so there is nothing to write
+        await aggregator.flush()
+        return {download['id']: download async for download in db.downloads.find({}, {'_id': 0})}
+
+    downloads = asyncio.run(scenario())
+    assert downloads['active']['progress'] == 100.0
+    assert downloads['active']['downloaded_bytes'] == 100000 and downloads['active']['total_bytes'] == 100000
+    # A late flush does not touch a record that already left the downloading state
+    assert downloads['finished'] == {'id': 'finished', 'status': 'completed', 'progress': 100.0, 'total_bytes': 5}
+    snapshot = aggregator.snapshot()
+    assert snapshot['records'] == 200 and snapshot['flushes'] == 1 and snapshot['writes'] == 2
+
+def test_finished_downloads_are_no_longer_flushed(db):
+    aggregator = ProgressAggregator(250)
+
+    async def scenario():
+        await db.downloads.insert_one({'id': 'cancelled', 'status': 'downloading', 'progress': 0.0})
+        aggregator.record('cancelled', 40.0)
+        aggregator.finish('cancelled')
+        await aggregator.flush()
+        return await db.downloads.find_one({'id': 'cancelled'})
+
+    assert asyncio.run(scenario())['progress'] == 0.0
+    assert aggregator.snapshot()['tracked'] == 0 and aggregator.snapshot()['writes'] == 0
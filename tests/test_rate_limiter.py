@@ -0,0 +1,94 @@
+import asyncio
+import http.server
+import threading
+import time
+
+import httpx
+import pytest
+
+import server
+from server import HostRateLimiter, RateLimitExceeded
+
+class ThrottlingHandler(http.server.BaseHTTPRequestHandler):
+    """Answers 429 with the Retry-After given in the path (/throttle/<seconds>), 200 otherwise"""
+
+    def do_GET(self):
+        if self.path.startswith('/throttle/'):
+            self.send_response(429)
+            self.send_header('Retry-After', self.path.rsplit('/', 1)[1])
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def throttling_server():
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), ThrottlingHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+def test_429_halves_the_budget_and_successes_restore_it(throttling_server, monkeypatch):
+    limiter = HostRateLimiter(rate=20, burst=4, max_concurrency=8, host_rates={}, decrease=0.5, max_wait=0.5)
+    monkeypatch.setattr(server, 'host_rate_limiter', limiter)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=server.RateLimitedTransport(httpx.AsyncHTTPTransport())) as client:
+            await client.get(f"{throttling_server}/ok")
+            await client.get(f"{throttling_server}/throttle/0.3")
+            throttled = limiter.snapshot()['127.0.0.1']
+            # The next request waits out Retry-After
+            started = time.monotonic()
+            await client.get(f"{throttling_server}/ok")
+            waited = time.monotonic() - started
+            for _ in range(30):
+                await client.get(f"{throttling_server}/ok")
+            recovered = limiter.snapshot()['127.0.0.1']
+            # A host asking for longer than max_wait fails the request instead of stalling it
+            await client.get(f"{throttling_server}/throttle/30")
+            with pytest.raises(RateLimitExceeded):
+                await client.get(f"{throttling_server}/ok")
+        return throttled, waited, recovered
+
+    throttled, waited, recovered = asyncio.run(scenario())
+    assert throttled['rate'] == 10 and throttled['concurrency'] == 4 and throttled['throttled'] == 1
+    assert throttled['in_flight'] == 0
+    assert waited >= 0.25
+    # Additive increase: back to the configured rate and concurrency after a run of successes
+    assert recovered['rate'] == 20 and recovered['concurrency'] == 8
+    assert recovered['requests'] == 33
+
+def test_subdomains_share_a_budget_and_configured_hosts_get_their_own_rate():
+    limiter = HostRateLimiter(rate=8, burst=16, max_concurrency=8, host_rates={'reddit.com': 1}, decrease=0.5, max_wait=0)
+    assert server.rate_limit_host('https://old.reddit.com/r/cosplay') == 'reddit.com'
+    assert server.rate_limit_host('https://www.bbc.co.uk/video') == 'bbc.co.uk'
+
+    assert limiter.acquire_sync('https://www.reddit.com/a') == 'reddit.com'
+    limiter.release('reddit.com', 200)
+    # The burst of a 1 request/s host is a few requests, not the global 16
+    for _ in range(3):
+        limiter.release(limiter.acquire_sync('https://oauth.reddit.com/b'), 200)
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire_sync('https://reddit.com/c')
+
+def test_media_cdns_skip_the_budget_but_still_back_off():
+    limiter = HostRateLimiter(rate=1, burst=1, max_concurrency=1, host_rates={}, decrease=0.5, max_wait=0,
+                              exempt_hosts=HostRateLimiter.parse_hosts('googlevideo.com, redd.it'))
+    # Fragments of several downloads in flight at once, far beyond 1 request/s
+    hosts = [limiter.acquire_sync(f"https://rr{number}---sn-abc.googlevideo.com/videoplayback?range={number}") for number in range(50)]
+    assert set(hosts) == {'googlevideo.com'}
+    snapshot = limiter.snapshot()['googlevideo.com']
+    assert snapshot['in_flight'] == 50 and snapshot['requests'] == 50 and snapshot['exempt']
+    for host in hosts:
+        limiter.release(host, 200)
+
+    limiter.release(limiter.acquire_sync('https://i.redd.it/a.jpg'), 429, '30')
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire_sync('https://v.redd.it/b.mp4')
+    # Other hosts keep their budget
+    limiter.acquire_sync('https://www.youtube.com/watch?v=a')
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire_sync('https://www.youtube.com/watch?v=b')
@@ -0,0 +1,44 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import server
+
+def test_startup_requeues_interrupted_downloads_oldest_first(db, api_client, monkeypatch):
+    # No free slot, so recovered downloads stay visible in the queue
+    scheduler = server.DownloadScheduler(0, {})
+    monkeypatch.setattr(server, 'download_scheduler', scheduler)
+    monkeypatch.setattr(server, 'DOWNLOAD_MODE', 'local')
+    start = datetime.utcnow() - timedelta(hours=1)
+
+    def record(download_id, status, minutes, **fields):
+        return {'id': download_id, 'url': f"https://www.youtube.com/watch?v={download_id}", 'platform': 'youtube',
+                'status': status, 'progress': 0.0, 'quality': 'best', 'audio_only': False, 'output_format': 'mp4',
+                'created_at': start + timedelta(minutes=minutes), **fields}
+
+    async def scenario():
+        await db.downloads.insert_many([
+            record('running', 'downloading', 2, progress=40.0),
+            record('waiting', 'queued', 1),
+            record('new', 'pending', 3),
+            record('done', 'completed', 0),
+            record('backoff', 'retrying', 4, retry_count=1, next_retry_at=datetime.utcnow() + timedelta(minutes=5)),
+            record('overdue', 'retrying', 5, retry_count=1, next_retry_at=datetime.utcnow() - timedelta(minutes=5))
+        ])
+        await server.recover_downloads()
+        statuses = {download['id']: download['status'] async for download in db.downloads.find()}
+        async with api_client as client:
+            duplicate = (await client.post('/api/media/download', json={'url': 'https://youtu.be/running'})).json()
+        positions = scheduler.queue_positions()
+        retrying = set(scheduler.retrying)
+        for task in scheduler.retrying.values():
+            task.cancel()
+        return statuses, duplicate, positions, retrying
+
+    statuses, duplicate, positions, retrying = asyncio.run(scenario())
+    assert positions == {'waiting': 1, 'running': 2, 'new': 3, 'overdue': 4}
+    assert retrying == {'backoff'}
+    assert scheduler.recovered == 5
+    assert statuses == {'running': 'queued', 'waiting': 'queued', 'new': 'queued', 'done': 'completed',
+                        'backoff': 'retrying', 'overdue': 'queued'}
+    # A recovered download still owns its job key
+    assert duplicate['coalesced'] and duplicate['download_id'] == 'running' and duplicate['queue_position'] == 2
@@ -0,0 +1,66 @@
+import asyncio
+
+import server
+
+def test_remote_queue_coalesces_until_workers_finish(db, api_client, monkeypatch):
+    queue = server.RemoteDownloadQueue()
+    monkeypatch.setattr(server, 'download_scheduler', queue)
+    relay = server.WorkerEventRelay(1000)
+    request = {'url': 'https://www.youtube.com/watch?v=abc123', 'quality': 'best'}
+
+    async def scenario():
+        async with api_client as client:
+            first = (await client.post('/api/media/download', json=request)).json()
+            second = (await client.post('/api/media/download', json={**request, 'url': 'https://youtu.be/abc123'})).json()
+            await relay.poll()
+            still_running = (await client.post('/api/media/download', json=request)).json()
+
+            # A worker finishes the download; the relay notices on its next poll
+            await db.downloads.update_one({'id': first['download_id']}, {'$set': {'status': 'completed'}})
+            await relay.poll()
+            after = (await client.post('/api/media/download', json=request)).json()
+
+            # A restarted API node learns the in-flight downloads from the relay
+            restarted = server.RemoteDownloadQueue()
+            monkeypatch.setattr(server, 'download_scheduler', restarted)
+            await relay.poll()
+            after_restart = (await client.post('/api/media/download', json=request)).json()
+        return first, second, still_running, after, after_restart
+
+    first, second, still_running, after, after_restart = asyncio.run(scenario())
+    assert first['status'] == 'queued'
+    assert second['coalesced'] and second['download_id'] == first['download_id']
+    assert still_running['download_id'] == first['download_id']
+    assert 'coalesced' not in after and after['download_id'] != first['download_id']
+    assert after_restart['coalesced'] and after_restart['download_id'] == after['download_id']
+
+def test_workers_reload_credentials_only_when_they_change(db, monkeypatch):
+    loads = []
+    load_auth_storage = server.load_auth_storage
+
+    async def counting_load():
+        loads.append(1)
+        await load_auth_storage()
+
+    monkeypatch.setattr(server, 'load_auth_storage', counting_load)
+    monkeypatch.setattr(server, 'auth_storage', {})
+    monkeypatch.setattr(server, 'auth_revisions', {})
+
+    async def scenario():
+        await db.auth.insert_one({'_id': 'youtube', 'username': 'a', 'revision': 'r1'})
+        await server.refresh_auth_storage()
+        await server.refresh_auth_storage()
+        first = dict(server.auth_storage)
+        await db.auth.replace_one({'_id': 'youtube'}, {'username': 'b', 'revision': 'r2'})
+        await server.refresh_auth_storage()
+        await server.refresh_auth_storage()
+        second = dict(server.auth_storage)
+        await db.auth.delete_one({'_id': 'youtube'})
+        await server.refresh_auth_storage()
+        return first, second, dict(server.auth_storage)
+
+    first, second, third = asyncio.run(scenario())
+    assert first['youtube']['username'] == 'a'
+    assert second['youtube']['username'] == 'b'
+    assert third == {}
+    assert len(loads) == 3
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import server
+from server import CircuitBreakers
+
+def test_breaker_opens_lets_one_probe_through_and_closes_on_success():
+    breakers = CircuitBreakers(threshold=2, reset_timeout=0.2, max_reset_timeout=1)
+    breakers.record_failure('reddit')
+    assert breakers.allow('reddit')
+    breakers.record_failure('reddit')
+    assert not breakers.allow('reddit') and 0 < breakers.retry_in('reddit') <= 0.2
+    assert breakers.blocked_platforms() == ['reddit'] and breakers.allow('youtube')
+
+    time.sleep(0.25)
+    # Half-open: the first job is the probe, the others wait for its outcome
+    assert breakers.allow('reddit')
+    assert breakers.retry_in('reddit') == 0.0 and not breakers.allow('reddit')
+    breakers.record_failure('reddit')
+    # A failed probe doubles the cool-down
+    assert breakers.snapshot()['reddit']['state'] == 'open' and 0.2 < breakers.retry_in('reddit') <= 0.4
+
+    time.sleep(0.45)
+    assert breakers.allow('reddit')
+    breakers.record_success('reddit')
+    assert breakers.snapshot()['reddit'] == {'state': 'closed', 'failures': 0, 'trips': 1, 'retry_in': 0.0}
+    assert breakers.retry_in('reddit') is None
+
+def test_transient_failures_are_retried_with_backoff_and_permanent_ones_are_not(db, monkeypatch):
+    monkeypatch.setattr(server, 'circuit_breakers', CircuitBreakers(10, 60, 60))
+    monkeypatch.setattr(server, 'RETRY_BASE_DELAY', 0.05)
+    monkeypatch.setattr(server, 'DOWNLOAD_MAX_RETRIES', 2)
+    attempts = {'flaky': 0, 'gone': 0, 'down': 0}
+
+    def job(download_id, errors):
+        async def run():
+            attempts[download_id] += 1
+            if attempts[download_id] <= len(errors):
+                await server.update_download(download_id, {'status': 'failed', 'error_message': errors[attempts[download_id] - 1]})
+            else:
+                await server.update_download(download_id, {'status': 'completed'})
+        return run
+
+    async def scenario():
+        scheduler = server.DownloadScheduler(4, {})
+        jobs = {
+            'flaky': job('flaky', ['HTTP Error 503: Service Unavailable', 'Read timed out']),
+            'gone': job('gone', ['HTTP Error 404: Not Found']),
+            'down': job('down', ['HTTP Error 503'] * 5)
+        }
+        for download_id, factory in jobs.items():
+            await server.create_download({'id': download_id, 'platform': 'youtube', 'status': 'pending'})
+            await scheduler.submit(download_id, 'youtube', factory)
+        await asyncio.sleep(0.02)
+        waiting = set(scheduler.retrying)
+        while scheduler.running or scheduler.retrying or scheduler.queue:
+            await asyncio.sleep(0.02)
+        return waiting, {download['id']: download async for download in db.downloads.find({}, {'_id': 0})}
+
+    waiting, downloads = asyncio.run(scenario())
+    assert waiting == {'flaky', 'down'}
+    assert attempts == {'flaky': 3, 'gone': 1, 'down': 3}
+    assert downloads['flaky']['status'] == 'completed' and downloads['flaky']['retry_count'] == 2
+    assert downloads['gone']['status'] == 'failed' and 'retry_count' not in downloads['gone']
+    # Out of retries: the last failure stands
+    assert downloads['down']['status'] == 'failed' and downloads['down']['retry_count'] == 2
+
+def test_fail_mode_rejects_downloads_while_the_breaker_is_open(db, monkeypatch):
+    breakers = CircuitBreakers(1, 60, 60)
+    breakers.record_failure('instagram')
+    monkeypatch.setattr(server, 'circuit_breakers', breakers)
+    monkeypatch.setattr(server, 'CIRCUIT_BREAKER_MODE', 'fail')
+
+    async def scenario():
+        scheduler = server.DownloadScheduler(4, {})
+        await server.create_download({'id': 'blocked', 'platform': 'instagram', 'status': 'pending'})
+        await scheduler.submit('blocked', 'instagram', None)
+        return scheduler.queue_positions(), await db.downloads.find_one({'id': 'blocked'})
+
+    positions, download = asyncio.run(scenario())
+    assert positions == {}
+    assert download['status'] == 'failed' and 'circuit breaker open' in download['error_message']
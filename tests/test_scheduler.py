@@ -0,0 +1,43 @@
+import asyncio
+
+import server
+
+def test_scheduler_respects_group_limits_and_reports_positions(db):
+    async def scenario():
+        scheduler = server.DownloadScheduler(2, {'instagram': 1})
+        gates = {}
+
+        def job(download_id):
+            gates[download_id] = asyncio.Event()
+
+            async def run():
+                await gates[download_id].wait()
+                await server.update_download(download_id, {'status': 'completed'})
+            return run
+
+        for download_id, platform in [('ig-1', 'instagram'), ('ig-2', 'instagram'), ('yt-1', 'youtube'), ('yt-2', 'youtube')]:
+            await server.create_download({'id': download_id, 'platform': platform, 'status': 'pending'})
+            await scheduler.submit(download_id, platform, job(download_id))
+
+        # ig-2 waits for the instagram slot, yt-1 takes the second global slot
+        first = (set(scheduler.running), scheduler.queue_positions(), scheduler.snapshot()['platforms']['instagram'])
+
+        gates['ig-1'].set()
+        await asyncio.wait({scheduler.running['ig-1'][1]})
+        # The freed slot goes to the oldest queued download whose group has room
+        second = (set(scheduler.running), scheduler.queue_positions())
+
+        for gate in gates.values():
+            gate.set()
+        while scheduler.running:
+            await asyncio.wait({task for _, task in scheduler.running.values()})
+        statuses = {download['id']: download['status'] async for download in db.downloads.find()}
+        return first, second, statuses
+
+    first, second, statuses = asyncio.run(scenario())
+    assert first[0] == {'ig-1', 'yt-1'}
+    assert first[1] == {'ig-2': 1, 'yt-2': 2}
+    assert first[2] == {'limit': 1, 'running': 1, 'queued': 1}
+    assert second[0] == {'yt-1', 'ig-2'}
+    assert second[1] == {'yt-2': 1}
+    assert set(statuses.values()) == {'completed'}
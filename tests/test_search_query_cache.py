@@ -0,0 +1,49 @@
+import asyncio
+
+import server
+from server import CosplayResult, SearchQueryCache
+
+def test_equivalent_queries_share_one_entry_and_expire(monkeypatch):
+    searched = []
+
+    async def fake_search(query, platform, limit):
+        searched.append(platform)
+        return [CosplayResult(id=f"{platform}-{len(searched)}", name=query, platform=platform, url=f"https://example.com/{platform}")]
+
+    monkeypatch.setattr(server, 'search_platform_cosplay', fake_search)
+    monkeypatch.setattr(server, 'cosplay_search_cache', server.CosplaySearchCache(60, 1 << 20))
+
+    def age(cache: SearchQueryCache, seconds: float):
+        for entry in cache.entries.values():
+            entry['fetched_at'] -= seconds
+
+    async def scenario():
+        cache = SearchQueryCache(8, fresh_ttl=60, stale_ttl=600)
+        first = await cache.get('Makima', ['all'], 10)
+        searched_first = sorted(searched)
+        # "all" anywhere in the list, letter case and spacing all land on the same entry
+        hit = await cache.get('  makima ', ['reddit', 'all'], 10)
+
+        age(cache, 120)
+        stale = await cache.get('makima', ['all'], 10)
+        await asyncio.gather(*cache.refreshing.values())
+        refreshed = await cache.get('makima', ['all'], 10)
+
+        age(cache, 1200)
+        expired = await cache.get('makima', ['all'], 10)
+        # Unknown platforms are dropped, so this is the reddit-only search
+        reddit = await cache.get('makima', ['reddit', 'unknown'], 10)
+        # The fetched outcome matches its key even when "all" is not the only entry
+        mixed = await SearchQueryCache(8, fresh_ttl=60, stale_ttl=600).get('makima', ['reddit', 'all'], 10)
+        return first, searched_first, hit, stale, refreshed, expired, reddit, mixed, cache
+
+    first, searched_first, hit, stale, refreshed, expired, reddit, mixed, cache = asyncio.run(scenario())
+    assert searched_first == sorted(server.COSPLAY_PLATFORMS)
+    assert set(first['platforms']) == set(server.COSPLAY_PLATFORMS)
+    assert (first['cache'], hit['cache'], stale['cache'], refreshed['cache'], expired['cache']) == ('miss', 'hit', 'stale', 'hit', 'miss')
+    assert hit['search_id'] == first['search_id'] == stale['search_id']
+    assert refreshed['search_id'] != stale['search_id']
+    assert list(reddit['platforms']) == ['reddit'] and reddit['cache'] == 'miss'
+    assert set(mixed['platforms']) == set(server.COSPLAY_PLATFORMS)
+    assert len(cache.entries) == 2
+    assert SearchQueryCache.make_key('Makima', ['all', 'reddit'], 10) == SearchQueryCache.make_key('makima', ['all'], 10)
@@ -0,0 +1,39 @@
+import asyncio
+
+from server import SuggestionIndex
+
+def test_prefix_typo_and_mid_phrase_suggestions_ranked_by_popularity():
+    index = SuggestionIndex(top_k=5, half_life=3600, max_terms=100)
+    for term, weight in [('Marin Kitagawa', 1), ('Makima', 3), ('Mercy', 2), ('Jinx Arcane', 1), ('Pokémon Trainer', 1)]:
+        index.record(term, weight)
+
+    assert index.lookup('ma') == ['Makima', 'Marin Kitagawa']
+    assert index.lookup('m', limit=2) == ['Makima', 'Mercy']
+    # Any word of a term matches, and accents are ignored
+    assert index.lookup('arca') == ['Jinx Arcane']
+    assert index.lookup('pokemon') == ['Pokémon Trainer']
+    # One typo is tolerated once the query is long enough
+    assert index.lookup('makina') == ['Makima']
+    assert index.lookup('mkima') == ['Makima']
+    assert index.lookup('mkma') == []
+    assert index.lookup('  ') == []
+
+    # Searches make a term more popular than the seeds it was tied with
+    index.record('Marin Kitagawa', 5)
+    assert index.lookup('ma') == ['Marin Kitagawa', 'Makima']
+
+def test_vocabulary_is_pruned_to_the_most_popular_terms():
+    index = SuggestionIndex(top_k=5, half_life=3600, max_terms=10)
+    for number in range(11):
+        index.record(f"character {number}", number + 1)
+
+    assert index.snapshot()['terms'] == 9
+    assert index.lookup('character', limit=3) == ['character 10', 'character 9', 'character 8']
+    assert 'character 0' not in index.lookup('character', limit=10)
+
+def test_suggestions_endpoint(api_client):
+    async def scenario():
+        async with api_client as client:
+            return (await client.get('/api/cosplay/suggestions/tifa')).json()
+
+    assert 'Tifa Lockheart' in asyncio.run(scenario())['suggestions']